@@ -29,22 +29,18 @@ from tqdm import tqdm
 import functools
 import seaborn as sns
 
-MAJOR_CONFERENCES_ABBREVIATION_DICT = {
-    "Annual Meeting of the Association for Computational Linguistics": "ACL",
-    "Conference on Empirical Methods in Natural Language Processing": "EMNLP",
-    # "European Chapter of the Association for Computational Linguistics": "EACL",
-    "North American Chapter of the Association for Computational Linguistics": "NAACL",
-    # "International Joint Conference on Natural Language Processing": "IJCNLP",
-    "International Conference on Computational Linguistics": "COLING",
-    "Language Resources and Evaluation": "LREC",
-    "Findings of the Association for Computational Linguistics: ACL": "ACL",
-    "Findings of the Association for Computational Linguistics: EMNLP": "EMNLP",
-}
+from anthology_io import load_entries
+from cohort_filters import EntryTable, get_cohort_masks, load_cohorts
+from confidence_intervals import CI_METHODS, draw_interval_bands, ratio_interval
+from venues import MAJOR_CONFERENCES_ABBREVIATION_DICT
+
+MAJOR_CONFERENCES_COHORT = "year>{year} & venue in {{" + \
+                           ",".join(sorted(set(MAJOR_CONFERENCES_ABBREVIATION_DICT.values()))) + \
+                           "}} & !workshop & !tutorial"
 
 
 def load_anthology(file_name):
-    with open(file_name) as f:
-        acl_anthology_data = json.load(f)
+    acl_anthology_data = load_entries(file_name)
     return acl_anthology_data
 
 
@@ -52,50 +48,44 @@ def has_code(acl_entry_dict):
     return "Code" in acl_entry_dict.keys()
 
 
-def newer_than(acl_entry_dict, year):
-    return acl_entry_dict["year"] > year
-
-
-def is_major_conference(acl_entry_dict):
-    # ACL, EMNLP, EACL, NAACL, IJCNLP, COLING
-    major_conferences_list = list(MAJOR_CONFERENCES_ABBREVIATION_DICT.keys())
-
-    is_workshop = "booktitle" in acl_entry_dict and "workshop" in acl_entry_dict["booktitle"].lower()
-    is_tutorial = "booktitle" in acl_entry_dict and "tutorial" in acl_entry_dict["booktitle"].lower()
-    is_major_conference = any([conference in acl_entry_dict["booktitle"]
-                               for conference in major_conferences_list
-                               if "booktitle" in acl_entry_dict])
-    # emnlp_title = "Proceedings of the 2021 Conference on Empirical Methods in Natural Language Processing"
-    # r = acl_entry_dict["booktitle"] == emnlp_title
-    return is_major_conference and not is_workshop and not is_tutorial
-
-
-def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir):
-    file_name = os.path.join(plot_dir, "major_conferences_code_submission_ratio_from_2016")
-
-    filtered_data = acl_data
-
-    filter_fn_list = [
-        functools.partial(newer_than, year=2015),
-        # has_code,
-        is_major_conference
-    ]
+def filter_major_conference_papers(acl_data, year=2015):
     # 10081 papers newer than 2016 and from major conferences
-    for filter_fn in filter_fn_list:
-        filtered_data = filter(filter_fn, filtered_data)
-
-    filtered_data = list(filtered_data)
-    pd.DataFrame(filtered_data).to_csv(file_name + "_full.csv", index=False)
-
-    filtered_data_with_code = list(filter(has_code, filtered_data))
-
-    filtered_data = [{"year": entry["year"],
-                      "has_code": "Code" in entry,
-                      "has_software": "Software" in entry or "Optional supplementary material" in entry,
-                      "conference": entry["conference"] if "conference" in entry else entry["booktitle"]}
-                     for entry in filtered_data
-                     if "booktitle" in entry]
-    papers_df = pd.DataFrame(filtered_data, columns=["year", "has_code", "has_software", "conference"])
+    major_conference_mask = get_cohort_masks(acl_data, {"major": MAJOR_CONFERENCES_COHORT.format(year=year)})["major"]
+    return [acl_entry for acl_entry, is_selected in zip(acl_data, major_conference_mask) if is_selected]
+
+
+def aggregate_cohorts(acl_data, cohorts, ci_method="wilson", confidence=0.95, n_resamples=2000, seed=0):
+    entry_table = EntryTable(acl_data)
+    cohort_masks = entry_table.evaluate_all(cohorts)
+    code_mask = entry_table.evaluate("has:Code")
+    cohort_df = pd.DataFrame({"cohort": list(cohorts.keys()),
+                              "filter": list(cohorts.values()),
+                              "total_submissions": [int(cohort_masks[name].sum()) for name in cohorts],
+                              "submissions_with_code": [int((cohort_masks[name] & code_mask).sum())
+                                                        for name in cohorts]})
+    cohort_df["code_ratio"] = cohort_df["submissions_with_code"] / cohort_df["total_submissions"] * 100
+    code_ratio_lower, code_ratio_upper = ratio_interval(cohort_df["submissions_with_code"].to_numpy(),
+                                                        cohort_df["total_submissions"].to_numpy(),
+                                                        method=ci_method,
+                                                        confidence=confidence,
+                                                        n_resamples=n_resamples,
+                                                        seed=seed)
+    cohort_df["code_ratio_lower"] = code_ratio_lower * 100
+    cohort_df["code_ratio_upper"] = code_ratio_upper * 100
+    return cohort_df
+
+
+def get_paper_rows(filtered_data):
+    return [{"year": entry["year"],
+             "has_code": "Code" in entry,
+             "has_software": "Software" in entry or "Optional supplementary material" in entry,
+             "conference": entry["conference"] if "conference" in entry else entry["booktitle"]}
+            for entry in filtered_data
+            if "booktitle" in entry]
+
+
+def aggregate_code_submissions(paper_rows, ci_method="wilson", confidence=0.95, n_resamples=2000, seed=0):
+    papers_df = pd.DataFrame(paper_rows, columns=["year", "has_code", "has_software", "conference"])
 
     agg_result = papers_df.groupby(["year", "conference"]).agg(
         submissions_with_code=('has_code', 'sum'),
@@ -103,15 +93,51 @@ def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir):
         total_submissions=('has_code', 'count')).reset_index()
     agg_result["code_ratio"] = agg_result["submissions_with_code"] / agg_result["total_submissions"] * 100
     agg_result["software_ratio"] = agg_result["submissions_with_software"] / agg_result["total_submissions"]
-    year_set = list(sorted(set([entry["year"] for entry in filtered_data])))
-
-    yearly_total_papers = {year: sum([entry["year"] == year for entry in filtered_data]) for year in year_set}
+    code_ratio_lower, code_ratio_upper = ratio_interval(agg_result["submissions_with_code"].to_numpy(),
+                                                        agg_result["total_submissions"].to_numpy(),
+                                                        method=ci_method,
+                                                        confidence=confidence,
+                                                        n_resamples=n_resamples,
+                                                        seed=seed)
+    agg_result["code_ratio_lower"] = code_ratio_lower * 100
+    agg_result["code_ratio_upper"] = code_ratio_upper * 100
+    agg_result["submissions_with_code_lower"] = code_ratio_lower * agg_result["total_submissions"]
+    agg_result["submissions_with_code_upper"] = code_ratio_upper * agg_result["total_submissions"]
+    return agg_result
+
+
+def get_yearly_code_ratio(paper_rows, filtered_data_with_code):
+    year_set = list(sorted(set([entry["year"] for entry in paper_rows])))
+
+    yearly_total_papers = {year: sum([entry["year"] == year for entry in paper_rows]) for year in year_set}
     yearly_total_papers_with_code = {year: sum([entry["year"] == year for entry in filtered_data_with_code]) for year in
                                      year_set}
 
     yearly_ratio = {year: yearly_total_papers_with_code[year] / yearly_total_papers[year] for year in year_set}
 
-    plt_data = pd.DataFrame(yearly_ratio.items(), columns=["Year", "Ratio"])
+    return pd.DataFrame(yearly_ratio.items(), columns=["Year", "Ratio"])
+
+
+def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir, ci_method="wilson", confidence=0.95,
+                                                           n_resamples=2000, seed=0):
+    file_name = os.path.join(plot_dir, "major_conferences_code_submission_ratio_from_2016")
+
+    filtered_data = filter_major_conference_papers(acl_data)
+    pd.DataFrame(filtered_data).to_csv(file_name + "_full.csv", index=False)
+
+    filtered_data_with_code = list(filter(has_code, filtered_data))
+
+    paper_rows = get_paper_rows(filtered_data)
+    agg_result = aggregate_code_submissions(paper_rows,
+                                            ci_method=ci_method,
+                                            confidence=confidence,
+                                            n_resamples=n_resamples,
+                                            seed=seed)
+    agg_result.to_csv(file_name + "_agg.csv", index=False)
+    conference_order = list(sorted(agg_result["conference"].unique()))
+    conference_palette = dict(zip(conference_order, sns.color_palette(n_colors=len(conference_order))))
+
+    plt_data = get_yearly_code_ratio(paper_rows, filtered_data_with_code)
 
     cat_plot = sns.catplot(data=plt_data, x="Year", y="Ratio", kind="bar")
     # cat_plot.set_title("Title test")
@@ -122,11 +148,20 @@ def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir):
                                              x="year",
                                              y="submissions_with_code",
                                              hue="conference",
+                                             hue_order=conference_order,
+                                             palette=conference_palette,
                                              style="conference",
                                              markers=True,
                                              kind="line",
                                              facet_kws={'legend_out': True}) \
         .set(xlabel="Year", ylabel="# Published Papers with Code")
+    draw_interval_bands(submissions_with_code_plot, agg_result,
+                        x="year",
+                        lower="submissions_with_code_lower",
+                        upper="submissions_with_code_upper",
+                        hue="conference",
+                        hue_order=conference_order,
+                        palette=conference_palette)
     submissions_with_code_plot._legend.set_title('Conference')
     # submissions_with_code_plot_legend = submissions_with_code_plot._legend
     # submissions_with_code_plot_legend.set_title('Conference')
@@ -137,11 +172,20 @@ def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir):
                                                    x="year",
                                                    y="code_ratio",
                                                    hue="conference",
+                                                   hue_order=conference_order,
+                                                   palette=conference_palette,
                                                    style="conference",
                                                    markers=True,
                                                    kind="line",
                                                    facet_kws={'legend_out': True}) \
         .set(xlabel="Year", ylabel="% Published Papers with Code")
+    draw_interval_bands(submission_with_code_ration_plot, agg_result,
+                        x="year",
+                        lower="code_ratio_lower",
+                        upper="code_ratio_upper",
+                        hue="conference",
+                        hue_order=conference_order,
+                        palette=conference_palette)
     submission_with_code_ration_plot._legend.set_title('Conference')
     submission_with_code_ration_plot.savefig(file_name + "_2.svg")
 
@@ -228,6 +272,14 @@ def main():
     parser = argparse.ArgumentParser(description='Downloading reproducibility data for ACL Anthology')
     parser.add_argument("--anthology_json_path", type=str)
     parser.add_argument("--plot_dir", type=str)
+    parser.add_argument("--ci_method", type=str, choices=CI_METHODS, default="wilson")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--n_resamples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cohorts_path", type=str, default="",
+                        help="JSON object of cohort names to filters, e.g. "
+                             "{\"acl_emnlp_code\": \"year>2015 & venue in {ACL,EMNLP} & !workshop & has:Code\"}, "
+                             "their code ratios are written to cohorts.csv")
     sns.set_theme()
     sns.set_style("darkgrid")
 
@@ -238,7 +290,18 @@ def main():
     acl_anthology = load_anthology(anthology_json_path)
     preprocess_acl_data(acl_anthology)
 
-    plot_major_conferences_code_submission_ratio_from_2014(acl_anthology, plot_dir)
+    plot_major_conferences_code_submission_ratio_from_2014(acl_anthology, plot_dir,
+                                                           ci_method=args.ci_method,
+                                                           confidence=args.confidence,
+                                                           n_resamples=args.n_resamples,
+                                                           seed=args.seed)
+    if args.cohorts_path != "":
+        cohort_df = aggregate_cohorts(acl_anthology, load_cohorts(args.cohorts_path),
+                                      ci_method=args.ci_method,
+                                      confidence=args.confidence,
+                                      n_resamples=args.n_resamples,
+                                      seed=args.seed)
+        cohort_df.to_csv(os.path.join(plot_dir, "cohorts.csv"), index=False)
 
     # plot_conferences_code_submission_ratio_from_2018(acl_anthology, plot_dir)
 
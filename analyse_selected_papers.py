@@ -29,22 +29,24 @@ from tqdm import tqdm
 import functools
 import seaborn as sns
 
-MAJOR_CONFERENCES_ABBREVIATION_DICT = {
-    "Annual Meeting of the Association for Computational Linguistics": "ACL",
-    "Conference on Empirical Methods in Natural Language Processing": "EMNLP",
-    # "European Chapter of the Association for Computational Linguistics": "EACL",
-    "North American Chapter of the Association for Computational Linguistics": "NAACL",
-    # "International Joint Conference on Natural Language Processing": "IJCNLP",
-    "International Conference on Computational Linguistics": "COLING",
-    "Language Resources and Evaluation": "LREC",
-    "Findings of the Association for Computational Linguistics: ACL": "ACL",
-    "Findings of the Association for Computational Linguistics: EMNLP": "EMNLP",
+from anthology_io import load_entries
+from cohort_filters import get_cohort_masks
+from repo_activity import DEFAULT_AS_OF_DATE, add_repo_activity_features
+from search_index import SearchIndex, get_search_index_dir
+from venues import MAJOR_CONFERENCES_ABBREVIATION_DICT, is_major_conference, newer_than
+
+EMNLP_2021_COHORT = "venue==EMNLP & year==2021 & github_status==success"
+SELECTED_PAPERS_AGG_DICT = {
+    "conference": ['count'],
+    'stargazers_count': ['mean', 'std'],
+    'forks_count': ['mean', 'std'],
+    'open_issues_count': ['mean', 'std'],
+    'days_since_last_update': ['mean', 'std']
 }
 
 
 def load_anthology(file_name):
-    with open(file_name) as f:
-        acl_anthology_data = json.load(f)
+    acl_anthology_data = load_entries(file_name)
     return acl_anthology_data
 
 
@@ -52,24 +54,6 @@ def has_code(acl_entry_dict):
     return "Code" in acl_entry_dict.keys()
 
 
-def newer_than(acl_entry_dict, year):
-    return acl_entry_dict["year"] > year
-
-
-def is_major_conference(acl_entry_dict):
-    # ACL, EMNLP, EACL, NAACL, IJCNLP, COLING
-    major_conferences_list = list(MAJOR_CONFERENCES_ABBREVIATION_DICT.keys())
-
-    is_workshop = "booktitle" in acl_entry_dict and "workshop" in acl_entry_dict["booktitle"].lower()
-    is_tutorial = "booktitle" in acl_entry_dict and "tutorial" in acl_entry_dict["booktitle"].lower()
-    is_major_conference = any([conference in acl_entry_dict["booktitle"]
-                               for conference in major_conferences_list
-                               if "booktitle" in acl_entry_dict])
-    # emnlp_title = "Proceedings of the 2021 Conference on Empirical Methods in Natural Language Processing"
-    # r = acl_entry_dict["booktitle"] == emnlp_title
-    return is_major_conference and not is_workshop and not is_tutorial
-
-
 def plot_major_conferences_code_submission_ratio_from_2014(acl_data, plot_dir):
     file_name = os.path.join(plot_dir, "major_conferences_code_submission_ratio_from_2016")
 
@@ -211,11 +195,27 @@ def preprocess_acl_data(acl_anthology_data):
         acl_entry["year"] = int(acl_entry["year"])
 
 
+def get_selected_papers_info(acl_anthology_df, selected_papers_id_df, as_of_date=DEFAULT_AS_OF_DATE):
+    emnlp_2021_mask = get_cohort_masks(acl_anthology_df, {"emnlp_2021": EMNLP_2021_COHORT})["emnlp_2021"]
+    emnlp_2021_df = acl_anthology_df[emnlp_2021_mask]
+    emnlp_2021_df = add_repo_activity_features(emnlp_2021_df.copy(), as_of_date=as_of_date)
+
+    selected_papers_info_df = selected_papers_id_df.merge(emnlp_2021_df, on=["ID"], how="left")
+    return selected_papers_info_df, emnlp_2021_df
+
+
 def main():
     parser = argparse.ArgumentParser(description='Downloading reproducibility data for ACL Anthology')
     parser.add_argument("--anthology_json_path", type=str)
     parser.add_argument("--plot_dir", type=str)
     parser.add_argument("--selected_papers", type=str)
+    parser.add_argument("--query", type=str, default="",
+                        help="select the papers with a search index query instead of --selected_papers, "
+                             "e.g. 'reproducib* AND venue:EMNLP year:2021'")
+    parser.add_argument("--search_index_dir", type=str, default="",
+                        help="search_index next to the anthology export by default")
+    parser.add_argument("--query_limit", type=int, default=None)
+    parser.add_argument("--as_of_date", type=str, default=DEFAULT_AS_OF_DATE)
     sns.set_theme()
     sns.set_style("darkgrid")
 
@@ -223,46 +223,42 @@ def main():
     anthology_json_path = args.anthology_json_path
     plot_dir = args.plot_dir
     selected_papers = args.selected_papers
+    as_of_date = args.as_of_date
 
     acl_anthology = load_anthology(anthology_json_path)
     preprocess_acl_data(acl_anthology)
 
     acl_anthology_df = pd.DataFrame(acl_anthology)
-    selected_papers_id_df = pd.read_csv(selected_papers)
-
-    emnlp_2021_df = acl_anthology_df[
-        np.logical_and(
-            np.logical_and(acl_anthology_df["conference"] == "EMNLP",
-                           acl_anthology_df["year"] == 2021),
-            acl_anthology_df["github_status"] == "success")
-    ]
-    emnlp_2021_df["days_since_last_update"] = emnlp_2021_df['updated_at'].apply(lambda x:
-                                                                                (datetime.datetime(2022, 6, 15) -
-                                                                                 datetime.datetime.strptime(x,
-                                                                                                            "%Y-%m-%dT%H:%M:%SZ")).days)
-
-    selected_papers_info_df = selected_papers_id_df.merge(emnlp_2021_df, on=["ID"], how="left")
-
-    agg_dict = {
-        "conference": ['count'],
-        'stargazers_count': ['mean', 'std'],
-        'forks_count': ['mean', 'std'],
-        'open_issues_count': ['mean', 'std'],
-        'days_since_last_update': ['mean', 'std']
-    }
-    emnlp_agg_df = emnlp_2021_df.groupby("conference").agg(agg_dict).reset_index()
+    if args.query != "":
+        search_index_dir = args.search_index_dir if args.search_index_dir != "" else \
+            get_search_index_dir(anthology_json_path)
+        selected_papers_id_df = pd.DataFrame({"ID": SearchIndex(search_index_dir).search_ids(args.query)})
+    else:
+        selected_papers_id_df = pd.read_csv(selected_papers)
+
+    selected_papers_info_df, emnlp_2021_df = get_selected_papers_info(acl_anthology_df, selected_papers_id_df,
+                                                                      as_of_date=as_of_date)
+    if args.query != "":
+        # matches without a GitHub repository are not part of the comparison, the best ranked remaining ones are
+        selected_papers_info_df = selected_papers_info_df[selected_papers_info_df["ID"].isin(emnlp_2021_df["ID"])]
+        if args.query_limit is not None:
+            selected_papers_info_df = selected_papers_info_df.head(args.query_limit)
+        logging.info("{} papers match the query".format(len(selected_papers_info_df)))
+    emnlp_agg_df = emnlp_2021_df.groupby("conference").agg(SELECTED_PAPERS_AGG_DICT).reset_index()
 
     final_result = selected_papers_info_df[
         ["title", "stargazers_count", "forks_count", "open_issues_count", "days_since_last_update"]]
 
     emnlp_dict = {"title": "EMNLP"}
-    for key in agg_dict.keys():
+    for key in SELECTED_PAPERS_AGG_DICT.keys():
         if key == "conference":
             continue
         emnlp_dict[key] = str(round(emnlp_agg_df[(key, "mean")][0], 2)) + " +- " + str(round(emnlp_agg_df[(key, "std")][0]))
-    final_result = final_result.append(emnlp_dict, ignore_index=True)
+    final_result = pd.concat([final_result, pd.DataFrame([emnlp_dict])], ignore_index=True)
     final_result["title"] = final_result["title"].apply(lambda x: x.replace("{", "").replace("}", ""))
 
+    final_result.to_csv(os.path.join(plot_dir, "selected_papers_comparison.csv"), index=False)
+
     pd.set_option('display.max_colwidth', None)
     print(final_result.to_latex(index=False))
     # plot_conferences_code_submission_ratio_from_2018(acl_anthology, plot_dir)
@@ -0,0 +1,102 @@
+import collections.abc
+import sys
+
+BIB_KEYS = ("ENTRYTYPE", "ID", "title", "author", "editor", "booktitle", "journal", "month", "year", "address",
+            "publisher", "url", "doi", "pages", "abstract", "language", "isbn", "volume", "number", "note")
+ACL_KEYS = ("PDF", "Code", "Software", "Data", "acl_status")
+GITHUB_ENTRY_KEYS = ("stargazers_count", "forks_count", "open_issues_count", "updated_at", "created_at",
+                     "pushed_at", "github_status")
+ENTRY_SLOT_KEYS = BIB_KEYS + ACL_KEYS + GITHUB_ENTRY_KEYS
+ENTRY_SLOT_KEY_SET = frozenset(ENTRY_SLOT_KEYS)
+
+# values shared by many entries are stored once
+INTERNED_KEYS = frozenset(["ENTRYTYPE", "booktitle", "journal", "month", "year", "address", "publisher", "language",
+                           "editor", "volume", "acl_status", "github_status"])
+# key orders are shared by the entries with the same keys, e.g. every bib entry of a proceedings volume
+KEY_ORDERS = {}
+
+
+def get_key_order(keys):
+    return KEY_ORDERS.setdefault(keys, keys)
+
+
+class AnthologyEntry(collections.abc.MutableMapping):
+    """A dict-like anthology entry with a slot for every known bib, ACL and GitHub key.
+
+    Unset slots take no memory, keys that are not known (e.g. the Code_1 suffixed ones) go to an
+    overflow dict that is only created when needed. Keys are iterated in insertion order like a dict.
+    Updates happen in place, convert with to_dict() when exporting.
+    """
+
+    __slots__ = ENTRY_SLOT_KEYS + ("_extra", "_keys")
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        self._keys = ()
+        self.update(*args, **kwargs)
+
+    @classmethod
+    def from_dict(cls, entry_dict):
+        return cls(entry_dict)
+
+    def __getitem__(self, key):
+        if key in ENTRY_SLOT_KEY_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in INTERNED_KEYS and type(value) is str:
+            value = sys.intern(value)
+        if key not in self:
+            self._keys = get_key_order(self._keys + (key,))
+        if key in ENTRY_SLOT_KEY_SET:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in ENTRY_SLOT_KEY_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+        self._keys = get_key_order(tuple(entry_key for entry_key in self._keys if entry_key != key))
+
+    def __contains__(self, key):
+        if key in ENTRY_SLOT_KEY_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return "AnthologyEntry({!r})".format(self.to_dict())
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self._extra = None
+        self._keys = ()
+        self.update(state)
+
+    def copy(self):
+        return AnthologyEntry(self)
+
+    def to_dict(self):
+        return dict(self.items())
@@ -0,0 +1,155 @@
+import contextlib
+import csv
+import gzip
+import json
+import os
+import tempfile
+
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESSIONS = ["none"] + list(COMPRESSION_EXTENSIONS.keys())
+EXPORT_FORMATS = ["json", "jsonl"]
+READ_BLOCK_SIZE = 1 << 20
+
+
+def get_compression(file_path):
+    for compression, extension in COMPRESSION_EXTENSIONS.items():
+        if file_path.endswith(extension):
+            return compression
+    return "none"
+
+
+def strip_compression_extension(file_path):
+    compression = get_compression(file_path)
+    if compression == "none":
+        return file_path
+    return file_path[:-len(COMPRESSION_EXTENSIONS[compression])]
+
+
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compressed files require the zstandard package")
+    return zstandard
+
+
+def open_text_file(file_path, mode="r", compression=None):
+    # text mode handle of a plain, gzip or zstd file, the compression defaults to the file extension
+    compression = compression if compression is not None else get_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, mode + "t", compresslevel=6)
+    if compression == "zstd":
+        zstandard = import_zstandard()
+        return zstandard.open(file_path, mode + "t")
+    return open(file_path, mode)
+
+
+@contextlib.contextmanager
+def atomic_write(file_path, compression=None):
+    # the content goes to a temporary file next to the target that replaces it only once fully written,
+    # a crash leaves the previous file (or no file) instead of a truncated one
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(file_path),
+                                                       suffix=".tmp")
+    os.close(file_descriptor)
+    try:
+        with open_text_file(temporary_path, "w", compression=compression or get_compression(file_path)) as f:
+            yield f
+        with open(temporary_path, "rb+") as f:
+            os.fsync(f.fileno())
+        # mkstemp creates the file readable by the owner only, use the permissions open() would have used
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary_path, 0o666 & ~umask)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def iter_json_entries(file_path, object_hook=None):
+    # yields the objects of a top level JSON array (or a JSON lines file) without loading the whole file
+    decoder = json.JSONDecoder(object_hook=object_hook)
+    with open_text_file(file_path) as f:
+        buffer = ""
+        position = 0
+        end_of_file = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                position += 1
+            if position == len(buffer):
+                if end_of_file:
+                    return
+                buffer, position = f.read(READ_BLOCK_SIZE), 0
+                end_of_file = buffer == ""
+                continue
+            try:
+                entry, next_position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+                block = f.read(READ_BLOCK_SIZE)
+                end_of_file = block == ""
+                buffer, position = buffer[position:] + block, 0
+                continue
+            yield entry
+            position = next_position
+
+
+def load_entries(file_path, object_hook=None):
+    return list(iter_json_entries(file_path, object_hook=object_hook))
+
+
+def get_export_file_name(export_dir, name, extension, compression="none"):
+    file_name = os.path.join(export_dir, name + "." + extension)
+    if compression != "none":
+        file_name = file_name + COMPRESSION_EXTENSIONS[compression]
+    return file_name
+
+
+def get_export_file_names(export_dir, name="anthology", extensions=EXPORT_FORMATS):
+    return [get_export_file_name(export_dir, name, extension, compression)
+            for extension in extensions for compression in COMPRESSIONS]
+
+
+def find_export_file(export_dir, name="anthology", export_format=None, compression=None):
+    # the export in the requested format and compression if it exists, otherwise the most recently written one
+    if export_format is not None:
+        file_name = get_export_file_name(export_dir, name, export_format, compression or "none")
+        if os.path.isfile(file_name):
+            return file_name
+    file_names = [file_name for file_name in get_export_file_names(export_dir, name) if os.path.isfile(file_name)]
+    return max(file_names, key=os.path.getmtime, default=None)
+
+
+def remove_other_exports(export_dir, file_names, name="anthology"):
+    # exports of the same data in other formats or compressions would be stale after this one
+    for file_name in get_export_file_names(export_dir, name, extensions=EXPORT_FORMATS + ["csv"]):
+        if file_name not in file_names and os.path.isfile(file_name):
+            os.remove(file_name)
+
+
+def dump_entries(file_path, entries, export_format="json", compression=None):
+    with atomic_write(file_path, compression=compression) as f:
+        if export_format == "jsonl":
+            for entry in entries:
+                json.dump(dict(entry), f)
+                f.write("\n")
+        else:
+            # same output as json.dump of the list, one entry is converted to a dict at a time
+            f.write("[")
+            for i, entry in enumerate(entries):
+                if i > 0:
+                    f.write(", ")
+                json.dump(dict(entry), f)
+            f.write("]")
+
+
+def dump_entries_csv(file_path, entries, keys, compression=None):
+    with atomic_write(file_path, compression=compression) as output_file:
+        dict_writer = csv.DictWriter(output_file, keys,
+                                     quoting=csv.QUOTE_ALL,
+                                     doublequote=True)
+        dict_writer.writeheader()
+        dict_writer.writerows(entries)
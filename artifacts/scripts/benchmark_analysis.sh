@@ -0,0 +1,4 @@
+#!/etc/bash!
+
+python synthetic_anthology.py --export_path data/synthetic_anthology.json --size 100000
+python benchmark_analysis.py --sizes 10000 100000 1000000 --data_dir data/benchmark --results_path plots/benchmark_results.csv
\ No newline at end of file
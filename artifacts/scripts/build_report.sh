@@ -0,0 +1,3 @@
+#!/etc/bash!
+
+python build_report.py --code_ratio_path plots/major_conferences_code_submission_ratio_from_2016_agg.csv --report_dir report
\ No newline at end of file
@@ -0,0 +1,3 @@
+#!/etc/bash!
+
+python entry_memory.py --size 100000 --baseline_ref 7419b10~1 --results_path entry_memory.csv
@@ -0,0 +1,3 @@
+#!/etc/bash!
+
+python parallel_bib.py --anthology_path "data/anthology.bib" --workers 1 2 4 8 16 --results_path bib_parsing.csv
\ No newline at end of file
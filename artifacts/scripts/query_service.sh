@@ -0,0 +1,3 @@
+#!/etc/bash!
+
+python query_service.py --anthology_json_path data/anthology.json --port 8050
\ No newline at end of file
@@ -0,0 +1,3 @@
+#!/etc/bash!
+
+python venue_counts.py --data_dir data --plot_dir plots
\ No newline at end of file
@@ -0,0 +1,256 @@
+import argparse
+import array
+import json
+import logging
+import os
+import re
+import shutil
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from anthology_io import atomic_write, iter_json_entries
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+# \"u -> u + combining diaeresis, composed to ü by NFC
+LATEX_ACCENTS = {'"': "\u0308", "'": "\u0301", "`": "\u0300", "^": "\u0302", "~": "\u0303", "=": "\u0304",
+                 ".": "\u0307", "c": "\u0327", "v": "\u030c", "u": "\u0306", "H": "\u030b", "k": "\u0328",
+                 "r": "\u030a", "d": "\u0323"}
+LATEX_LETTERS = {"ss": "ß", "o": "ø", "O": "Ø", "l": "ł", "L": "Ł", "ae": "æ", "AE": "Æ", "oe": "œ", "OE": "Œ",
+                 "aa": "å", "AA": "Å", "i": "ı", "j": "ȷ"}
+LATEX_ACCENT_PATTERN = re.compile(r"\\([\"'`^~=.])\s*\{?\s*(\\?[A-Za-z])\s*\}?|"
+                                  r"\\([cvuHkrd])(?:\s+|\s*\{\s*)(\\?[A-Za-z])\}?")
+LATEX_LETTER_PATTERN = re.compile(r"\\(ss|ae|AE|oe|OE|aa|AA|[oOlLij])(?![A-Za-z])\s*")
+# papers with more authors than this (consortium papers) are left out of the coauthor pairs
+MAX_PAIR_AUTHORS = 20
+
+
+def replace_latex_accents(name):
+    def replace_accent(match):
+        accent, letter = (match.group(1), match.group(2)) if match.group(1) is not None else \
+            (match.group(3), match.group(4))
+        # accents on a dotless \i or \j go on the plain letter, \'{\i} is í
+        letter = letter[1:] if letter.startswith("\\") else letter
+        return letter + LATEX_ACCENTS[accent]
+
+    name = LATEX_ACCENT_PATTERN.sub(replace_accent, name)
+    name = LATEX_LETTER_PATTERN.sub(lambda match: LATEX_LETTERS[match.group(1)], name)
+    return unicodedata.normalize("NFC", name.replace("{", "").replace("}", "").replace("~", " "))
+
+
+def split_authors(author_field):
+    # BibTeX separates names with "and" outside of braces, {Barnes and Noble} is a single name
+    authors, depth, start = [], 0, 0
+    for match in re.finditer(r"[{}]|\s+and\s+", author_field, re.IGNORECASE):
+        token = match.group(0)
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            authors.append(author_field[start:match.start()])
+            start = match.end()
+    authors.append(author_field[start:])
+    return [author.strip() for author in authors if author.strip() != ""]
+
+
+def canonicalize_author_name(name):
+    # "Last, First", "Last, Jr., First" and "First Last" all become "First Last"
+    name = " ".join(replace_latex_accents(name).split())
+    parts = [part.strip() for part in name.split(",")]
+    if len(parts) == 2:
+        name = "{} {}".format(parts[1], parts[0])
+    elif len(parts) >= 3:
+        name = "{} {} {}".format(parts[2], parts[0], parts[1])
+    return " ".join(name.split())
+
+
+def get_author_key(canonical_name):
+    # spelling variants that only differ in case or periods after initials share a key
+    return " ".join(canonical_name.replace(".", " ").casefold().split())
+
+
+def get_author_index_dir(anthology_json_path):
+    return os.path.join(os.path.dirname(anthology_json_path), "author_index")
+
+
+def build_author_index(acl_entries, index_dir):
+    author_ids, author_names = {}, []
+    paper_ids = []
+    paper_years, paper_has_code = array.array("i"), array.array("b")
+    paper_offsets, paper_authors = array.array("q", [0]), array.array("i")
+
+    for entry in acl_entries:
+        entry_authors = []
+        for author in split_authors(entry.get("author", "")):
+            canonical_name = canonicalize_author_name(author)
+            author_key = get_author_key(canonical_name)
+            if author_key not in author_ids:
+                author_ids[author_key] = len(author_names)
+                author_names.append(canonical_name)
+            # an author listed twice on a paper is counted once
+            if author_ids[author_key] not in entry_authors:
+                entry_authors.append(author_ids[author_key])
+        paper_authors.extend(entry_authors)
+        paper_offsets.append(len(paper_authors))
+        paper_ids.append(entry["ID"])
+        paper_years.append(int(entry.get("year", 0)))
+        paper_has_code.append("Code" in entry)
+
+    paper_offsets = np.frombuffer(paper_offsets, dtype=np.int64)
+    paper_authors = np.frombuffer(paper_authors, dtype=np.int32)
+    # the same (author, paper) pairs sorted by author give the author -> papers CSR arrays
+    pair_papers = np.repeat(np.arange(len(paper_ids), dtype=np.int32), np.diff(paper_offsets))
+    author_order = np.argsort(paper_authors, kind="stable")
+    arrays = {
+        "paper_offsets": paper_offsets,
+        "paper_authors": paper_authors,
+        "author_offsets": np.searchsorted(paper_authors[author_order],
+                                          np.arange(len(author_names) + 1)).astype(np.int64),
+        "author_papers": pair_papers[author_order],
+        "paper_years": np.frombuffer(paper_years, dtype=np.int32),
+        "paper_has_code": np.frombuffer(paper_has_code, dtype=np.int8).astype(bool),
+    }
+
+    temporary_dir = index_dir.rstrip("/") + ".tmp"
+    if os.path.isdir(temporary_dir):
+        shutil.rmtree(temporary_dir)
+    os.makedirs(temporary_dir)
+    np.savez(os.path.join(temporary_dir, "arrays.npz"), **arrays)
+    with atomic_write(os.path.join(temporary_dir, "vocabulary.json")) as f:
+        json.dump({"authors": author_names, "ids": paper_ids}, f)
+    if os.path.isdir(index_dir):
+        shutil.rmtree(index_dir)
+    os.replace(temporary_dir, index_dir)
+    logging.info("Indexed {} authors of {} papers".format(len(author_names), len(paper_ids)))
+    return index_dir
+
+
+class AuthorIndex:
+    """An author index written by build_author_index.
+
+    paper_offsets/paper_authors list the authors of every paper, author_offsets/author_papers the papers of
+    every author, both as CSR integer arrays.
+    """
+
+    def __init__(self, index_dir):
+        with np.load(os.path.join(index_dir, "arrays.npz")) as arrays:
+            for name in arrays.files:
+                setattr(self, name, arrays[name])
+        with open(os.path.join(index_dir, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        self.author_names = vocabulary["authors"]
+        self.ids = vocabulary["ids"]
+        self.author_ids = {get_author_key(name): i for i, name in enumerate(self.author_names)}
+        self.pair_papers = np.repeat(np.arange(len(self.ids), dtype=np.int32), np.diff(self.paper_offsets))
+
+    def get_author_id(self, name):
+        return self.author_ids.get(get_author_key(canonicalize_author_name(name)))
+
+    def get_author_history(self, name):
+        author_id = self.get_author_id(name)
+        if author_id is None:
+            raise KeyError("unknown author {}".format(name))
+        papers = self.author_papers[self.author_offsets[author_id]:self.author_offsets[author_id + 1]]
+        return pd.DataFrame({"ID": [self.ids[paper] for paper in papers],
+                             "year": self.paper_years[papers],
+                             "has_code": self.paper_has_code[papers]}).sort_values("year", kind="stable")
+
+    def get_author_rates(self, by_year=False, min_papers=1):
+        # one bincount over (author, year) keys instead of a loop over authors and their papers, years are
+        # factorized, a missing year (0) next to 2022 does not make a table of 2023 years per author
+        year_values, year_codes = np.unique(self.paper_years[self.pair_papers], return_inverse=True)
+        number_of_years = len(year_values) if by_year and len(year_values) > 0 else 1
+        keys = self.paper_authors.astype(np.int64) * number_of_years + (year_codes.ravel() if by_year else 0)
+        length = len(self.author_names) * number_of_years
+        papers = np.bincount(keys, minlength=length)
+        papers_with_code = np.bincount(keys, weights=self.paper_has_code[self.pair_papers], minlength=length)
+        keys = np.flatnonzero(papers >= max(min_papers, 1))
+
+        rates_df = pd.DataFrame({"author": np.array(self.author_names, dtype=object)[keys // number_of_years]})
+        if by_year:
+            rates_df["year"] = year_values[keys % number_of_years]
+        rates_df["papers"] = papers[keys]
+        rates_df["papers_with_code"] = papers_with_code[keys].astype(np.int64)
+        rates_df["code_ratio"] = rates_df["papers_with_code"] / rates_df["papers"]
+        return rates_df
+
+    def get_coauthor_pairs(self):
+        # every pair of authors of a paper, papers with k authors are handled together with triu_indices
+        author_counts = np.diff(self.paper_offsets)
+        pair_first, pair_second, pair_papers = [], [], []
+        for author_count in np.unique(author_counts[(author_counts >= 2) & (author_counts <= MAX_PAIR_AUTHORS)]):
+            papers = np.flatnonzero(author_counts == author_count)
+            paper_authors = self.paper_authors[self.paper_offsets[papers][:, None] + np.arange(author_count)]
+            first, second = np.triu_indices(author_count, k=1)
+            pair_first.append(np.minimum(paper_authors[:, first], paper_authors[:, second]).ravel())
+            pair_second.append(np.maximum(paper_authors[:, first], paper_authors[:, second]).ravel())
+            pair_papers.append(np.repeat(papers, len(first)))
+        if len(pair_first) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(pair_first), np.concatenate(pair_second), np.concatenate(pair_papers)
+
+    def get_coauthor_rates(self, by_year=False, min_papers=2):
+        pair_first, pair_second, pair_papers = self.get_coauthor_pairs()
+        keys = pair_first.astype(np.int64) * len(self.author_names) + pair_second
+        if by_year:
+            keys = np.stack([keys, self.paper_years[pair_papers]], axis=1)
+        unique_keys, inverse = np.unique(keys, axis=0 if by_year else None, return_inverse=True)
+        inverse = inverse.ravel()
+        papers = np.bincount(inverse, minlength=len(unique_keys))
+        papers_with_code = np.bincount(inverse, weights=self.paper_has_code[pair_papers], minlength=len(unique_keys))
+        selected = np.flatnonzero(papers >= min_papers)
+
+        pair_keys = unique_keys[selected, 0] if by_year else unique_keys[selected]
+        author_names = np.array(self.author_names, dtype=object)
+        rates_df = pd.DataFrame({"author": author_names[pair_keys // len(self.author_names)],
+                                 "coauthor": author_names[pair_keys % len(self.author_names)]})
+        if by_year:
+            rates_df["year"] = unique_keys[selected, 1]
+        rates_df["papers"] = papers[selected]
+        rates_df["papers_with_code"] = papers_with_code[selected].astype(np.int64)
+        rates_df["code_ratio"] = rates_df["papers_with_code"] / rates_df["papers"]
+        return rates_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Author index and per-author code release rates')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--index_dir", type=str, default="",
+                        help="author_index next to the anthology export by default")
+    parser.add_argument("--build", action="store_true", help="(re)build the index from the export")
+    parser.add_argument("--author", type=str, default="", help="print the papers of one author")
+    parser.add_argument("--export_dir", type=str, default="",
+                        help="write per-author and per-coauthor-pair code release rates by year")
+    parser.add_argument("--min_papers", type=int, default=3)
+
+    args = parser.parse_args()
+    index_dir = args.index_dir if args.index_dir != "" else get_author_index_dir(args.anthology_json_path)
+
+    if args.build:
+        logging.info("Building Author Index")
+        build_author_index(iter_json_entries(args.anthology_json_path), index_dir)
+
+    author_index = AuthorIndex(index_dir)
+    if args.author != "":
+        print(author_index.get_author_history(args.author).to_string(index=False))
+
+    if args.export_dir != "":
+        logging.info("Exporting Author Rates")
+        author_index.get_author_rates(min_papers=args.min_papers) \
+            .to_csv(os.path.join(args.export_dir, "author_code_rates.csv"), index=False)
+        author_index.get_author_rates(by_year=True) \
+            .to_csv(os.path.join(args.export_dir, "author_year_code_rates.csv"), index=False)
+        author_index.get_coauthor_rates(min_papers=args.min_papers) \
+            .to_csv(os.path.join(args.export_dir, "coauthor_code_rates.csv"), index=False)
+        author_index.get_coauthor_rates(by_year=True, min_papers=args.min_papers) \
+            .to_csv(os.path.join(args.export_dir, "coauthor_year_code_rates.csv"), index=False)
+
+
+if __name__ == '__main__':
+    main()
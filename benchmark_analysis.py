@@ -0,0 +1,158 @@
+import argparse
+import logging
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+from analyse_anthology import aggregate_code_submissions, filter_major_conference_papers, get_paper_rows, \
+    get_yearly_code_ratio, has_code, load_anthology, preprocess_acl_data
+from analyse_selected_papers import SELECTED_PAPERS_AGG_DICT, get_selected_papers_info
+from anthology_io import iter_json_entries
+from synthetic_anthology import generate_synthetic_anthology
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+BENCHMARK_COLUMNS = ["size", "stage", "seconds", "peak_mb"]
+
+
+def run_load(state):
+    state["acl_anthology"] = load_anthology(state["anthology_json_path"])
+
+
+def run_preprocess(state):
+    preprocess_acl_data(state["acl_anthology"])
+
+
+def run_filter(state):
+    state["filtered_data"] = filter_major_conference_papers(state["acl_anthology"])
+    state["filtered_data_with_code"] = list(filter(has_code, state["filtered_data"]))
+
+
+def run_paper_rows(state):
+    state["paper_rows"] = get_paper_rows(state["filtered_data"])
+
+
+def run_aggregate(state):
+    state["agg_result"] = aggregate_code_submissions(state["paper_rows"])
+
+
+def run_yearly_ratio(state):
+    state["yearly_ratio"] = get_yearly_code_ratio(state["paper_rows"], state["filtered_data_with_code"])
+
+
+def run_dataframe(state):
+    state["acl_anthology_df"] = pd.DataFrame(state["acl_anthology"])
+
+
+def run_selected_papers_merge(state):
+    _, emnlp_2021_df = get_selected_papers_info(state["acl_anthology_df"], state["selected_papers_id_df"])
+    state["emnlp_agg_df"] = emnlp_2021_df.groupby("conference").agg(SELECTED_PAPERS_AGG_DICT).reset_index()
+
+
+# in the order of analyse_anthology.py and analyse_selected_papers.py, each stage uses the state of the previous ones
+BENCHMARK_STAGES = [
+    ("load", run_load),
+    ("preprocess", run_preprocess),
+    ("filter", run_filter),
+    ("paper_rows", run_paper_rows),
+    ("aggregate", run_aggregate),
+    ("yearly_ratio", run_yearly_ratio),
+    ("dataframe", run_dataframe),
+    ("selected_papers_merge", run_selected_papers_merge),
+]
+
+
+def run_stages(anthology_json_path, selected_papers_id_df, trace_memory=False):
+    state = {"anthology_json_path": anthology_json_path, "selected_papers_id_df": selected_papers_id_df}
+    results = {}
+    for stage_name, stage_function in BENCHMARK_STAGES:
+        if trace_memory:
+            # only allocations made during the stage are traced, the peak is the stage's own working memory
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        stage_function(state)
+        seconds = time.perf_counter() - start_time
+        peak_bytes = None
+        if trace_memory:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results[stage_name] = (seconds, peak_bytes)
+    return results
+
+
+def get_selected_papers_id_df(anthology_json_path, number_of_papers=10):
+    # selected papers are EMNLP 2021 papers with a GitHub repository, like data/selected_papers.csv
+    selected_ids = []
+    for entry in iter_json_entries(anthology_json_path):
+        if entry.get("github_status") == "success" and entry["year"] == "2021" and \
+                "Empirical Methods in Natural Language Processing" in entry.get("booktitle", "") and \
+                "Findings" not in entry.get("booktitle", ""):
+            selected_ids.append(entry["ID"])
+            if len(selected_ids) == number_of_papers:
+                break
+    return pd.DataFrame({"ID": selected_ids})
+
+
+def benchmark_size(anthology_json_path, size, repeats=3):
+    selected_papers_id_df = get_selected_papers_id_df(anthology_json_path)
+    # timings come from untraced runs, tracemalloc slows allocation heavy code down considerably
+    timings = [run_stages(anthology_json_path, selected_papers_id_df) for _ in range(repeats)]
+    memory = run_stages(anthology_json_path, selected_papers_id_df, trace_memory=True)
+    return [{"size": size,
+             "stage": stage_name,
+             "seconds": min(timing[stage_name][0] for timing in timings),
+             "peak_mb": memory[stage_name][1] / 2 ** 20}
+            for stage_name, _ in BENCHMARK_STAGES]
+
+
+def get_synthetic_anthology_path(data_dir, size, seed):
+    return os.path.join(data_dir, "synthetic_anthology_{}_seed_{}.json".format(size, seed))
+
+
+def compare_to_baseline(results_df, baseline_df):
+    comparison_df = results_df.merge(baseline_df[BENCHMARK_COLUMNS], on=["size", "stage"], how="left",
+                                     suffixes=("", "_baseline"))
+    comparison_df["seconds_ratio"] = comparison_df["seconds"] / comparison_df["seconds_baseline"]
+    comparison_df["peak_mb_ratio"] = comparison_df["peak_mb"] / comparison_df["peak_mb_baseline"]
+    return comparison_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Timing and peak memory of the analysis stages on synthetic data')
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--data_dir", type=str, default="data/benchmark",
+                        help="synthetic anthology files are generated here once and reused")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3, help="the fastest of the repeated runs is reported")
+    parser.add_argument("--results_path", type=str, default="benchmark_results.csv")
+    parser.add_argument("--baseline_path", type=str, default="",
+                        help="results of an earlier run, e.g. on the main branch, to compare against")
+
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    rows = []
+    for size in args.sizes:
+        anthology_json_path = get_synthetic_anthology_path(args.data_dir, size, args.seed)
+        if not os.path.isfile(anthology_json_path):
+            logging.info("Generating {} synthetic entries".format(size))
+            generate_synthetic_anthology(anthology_json_path, size, seed=args.seed)
+        logging.info("Benchmarking {} entries".format(size))
+        rows.extend(benchmark_size(anthology_json_path, size, repeats=args.repeats))
+
+    results_df = pd.DataFrame(rows, columns=BENCHMARK_COLUMNS)
+    results_df.to_csv(args.results_path, index=False)
+
+    if args.baseline_path != "":
+        results_df = compare_to_baseline(results_df, pd.read_csv(args.baseline_path))
+    pd.set_option('display.width', 200)
+    print(results_df.to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == '__main__':
+    main()
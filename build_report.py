@@ -0,0 +1,213 @@
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime
+
+import jinja2
+import pandas as pd
+
+from anthology_io import atomic_write
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "report")
+CODE_RATIO_COLUMNS = ["year", "total_submissions", "submissions_with_code", "code_ratio", "code_ratio_lower",
+                      "code_ratio_upper"]
+CHART_WIDTH, CHART_HEIGHT, CHART_MARGIN = 480, 220, 40
+
+
+def get_template_environment(template_dir=TEMPLATE_DIR):
+    return jinja2.Environment(loader=jinja2.FileSystemLoader(template_dir),
+                              autoescape=jinja2.select_autoescape(["html"]))
+
+
+def get_slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return "" if pd.isna(value) else "{:.2f}".format(value)
+    # numpy integers are not JSON serializable
+    return value.item() if hasattr(value, "item") else value
+
+
+def get_table_rows(table_df):
+    return [[format_value(value) for value in row] for row in table_df.itertuples(index=False)]
+
+
+def get_section_hash(template_source, data):
+    # a section is re-rendered when its template or the data it is rendered from changes
+    section_hash = hashlib.sha256(template_source.encode("utf-8"))
+    section_hash.update(data.encode("utf-8"))
+    return section_hash.hexdigest()
+
+
+def get_chart(venue_df):
+    # coordinates of the code ratio line and its interval band, drawn by the template as inline SVG
+    years = venue_df["year"].tolist()
+    left, right = CHART_MARGIN, CHART_WIDTH - CHART_MARGIN / 2
+    top, bottom = CHART_MARGIN / 2, CHART_HEIGHT - CHART_MARGIN
+    y_max = max(float(venue_df["code_ratio_upper"].max()), 1.0)
+
+    def get_x(year):
+        return left + (right - left) * ((year - years[0]) / (years[-1] - years[0]) if len(years) > 1 else 0.5)
+
+    def get_y(value):
+        return bottom - (bottom - top) * value / y_max
+
+    def get_points(pairs):
+        return " ".join("{:.1f},{:.1f}".format(get_x(year), get_y(value)) for year, value in pairs)
+
+    upper = list(zip(years, venue_df["code_ratio_upper"]))
+    lower = list(zip(years, venue_df["code_ratio_lower"]))
+    return {"width": CHART_WIDTH, "height": CHART_HEIGHT, "left": left, "right": right, "top": top, "bottom": bottom,
+            "line": get_points(zip(years, venue_df["code_ratio"])),
+            "band": get_points(upper + lower[::-1]),
+            "x_ticks": [{"x": round(get_x(year), 1), "label": year} for year in years],
+            "y_ticks": [{"y": round(get_y(y_max * i / 4), 1), "label": "{:.0f}%".format(y_max * i / 4)} for i in range(5)]}
+
+
+def get_code_ratio_sections(code_ratio_path):
+    if not os.path.isfile(code_ratio_path):
+        return []
+    agg_df = pd.read_csv(code_ratio_path).sort_values(["conference", "year"])
+    sections = []
+
+    overview_rows = []
+    for conference, venue_df in agg_df.groupby("conference", sort=True):
+        last_year = venue_df.iloc[-1]
+        overview_rows.append([str(conference), int(last_year["year"]), int(venue_df["total_submissions"].sum()),
+                              int(venue_df["submissions_with_code"].sum()),
+                              "{:.1f}% [{:.1f}, {:.1f}]".format(last_year["code_ratio"], last_year["code_ratio_lower"],
+                                                               last_year["code_ratio_upper"])])
+        venue_df = venue_df[CODE_RATIO_COLUMNS]
+        venue_rows = get_table_rows(venue_df)
+        # the per venue sections only depend on their own rows as displayed, a change to another venue, or below
+        # the displayed precision, keeps them
+        sections.append({"id": "code_ratio_" + get_slug(conference),
+                         "title": "{} papers with code".format(conference),
+                         "template": "venue_section.html",
+                         "data": json.dumps(venue_rows),
+                         "get_context": lambda venue_df=venue_df, venue_rows=venue_rows: {
+                             "columns": ["Year", "Papers", "With code", "% with code", "Lower", "Upper"],
+                             "rows": venue_rows,
+                             "chart": get_chart(venue_df)}})
+
+    sections.insert(0, {"id": "code_ratio_overview",
+                        "title": "Overview",
+                        "template": "table_section.html",
+                        "data": json.dumps(overview_rows),
+                        "get_context": lambda: {
+                            "description": "Papers with a code link per venue, the last column is the latest year "
+                                           "with its confidence interval.",
+                            "columns": ["Venue", "Latest year", "Papers", "With code", "% with code (latest year)"],
+                            "rows": overview_rows}})
+    return sections
+
+
+def get_table_sections(paths, kind, title):
+    sections = []
+    for path in sorted(paths):
+        with open(path) as f:
+            data = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        sections.append({"id": "{}_{}".format(kind, get_slug(name)),
+                         "title": "{} ({})".format(title, name),
+                         "template": "table_section.html",
+                         "data": data,
+                         "get_context": lambda path=path: {
+                             "columns": list(pd.read_csv(path).columns),
+                             "rows": get_table_rows(pd.read_csv(path))}})
+    return sections
+
+
+def load_manifest(report_dir):
+    manifest_path = os.path.join(report_dir, "manifest.json")
+    if not os.path.isfile(manifest_path):
+        return {"sections": {}, "layout": None}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def build_report(sections, report_dir, title="ACL Anthology reproducibility report", force=False):
+    environment = get_template_environment()
+    section_dir = os.path.join(report_dir, "sections")
+    os.makedirs(section_dir, exist_ok=True)
+    manifest = load_manifest(report_dir)
+    template_sources = {}
+
+    section_hashes = {}
+    rendered_count = 0
+    for section in sections:
+        if section["template"] not in template_sources:
+            template_sources[section["template"]] = environment.loader.get_source(environment,
+                                                                                  section["template"])[0]
+        section_hash = get_section_hash(template_sources[section["template"]], section["title"] + section["data"])
+        section_hashes[section["id"]] = section_hash
+        fragment_path = os.path.join(section_dir, section["id"] + ".html")
+        if not force and manifest["sections"].get(section["id"]) == section_hash and os.path.isfile(fragment_path):
+            continue
+        context = section["get_context"]()
+        context.update({"section_id": section["id"], "title": section["title"]})
+        with atomic_write(fragment_path) as f:
+            f.write(environment.get_template(section["template"]).render(**context))
+        rendered_count += 1
+
+    for section_id in set(manifest["sections"]) - set(section_hashes):
+        fragment_path = os.path.join(section_dir, section_id + ".html")
+        if os.path.isfile(fragment_path):
+            os.remove(fragment_path)
+
+    # the page itself only changes when a section or the section list does
+    layout_source = environment.loader.get_source(environment, "layout.html")[0]
+    layout_hash = get_section_hash(layout_source, title + json.dumps([[section["id"], section_hashes[section["id"]]]
+                                                                      for section in sections]))
+    index_path = os.path.join(report_dir, "index.html")
+    if force or manifest.get("layout") != layout_hash or not os.path.isfile(index_path):
+        page_sections = []
+        for section in sections:
+            with open(os.path.join(section_dir, section["id"] + ".html")) as f:
+                page_sections.append({"id": section["id"], "title": section["title"], "html": f.read()})
+        with atomic_write(index_path) as f:
+            f.write(environment.get_template("layout.html").render(
+                title=title, generated_at=datetime.now().strftime("%Y-%m-%d %H:%M"), sections=page_sections))
+
+    with atomic_write(os.path.join(report_dir, "manifest.json")) as f:
+        json.dump({"sections": section_hashes, "layout": layout_hash}, f, indent=1)
+    logging.info("Rendered {} of {} sections".format(rendered_count, len(sections)))
+    return rendered_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Building the HTML report from the precomputed aggregates')
+    parser.add_argument("--code_ratio_path", type=str,
+                        default="plots/major_conferences_code_submission_ratio_from_2016_agg.csv")
+    parser.add_argument("--comparison_paths", type=str, nargs="*", default=None,
+                        help="selected paper comparison tables, plots/*comparison*.csv by default")
+    parser.add_argument("--cv_paths", type=str, nargs="*", default=None,
+                        help="CV* results of cv.py --output, plots/cv*.csv by default")
+    parser.add_argument("--report_dir", type=str, default="report")
+    parser.add_argument("--force", action="store_true", help="re-render every section")
+
+    args = parser.parse_args()
+    plot_dir = os.path.dirname(args.code_ratio_path)
+    comparison_paths = args.comparison_paths if args.comparison_paths is not None else \
+        glob.glob(os.path.join(plot_dir, "*comparison*.csv"))
+    cv_paths = args.cv_paths if args.cv_paths is not None else glob.glob(os.path.join(plot_dir, "cv*.csv"))
+
+    sections = get_code_ratio_sections(args.code_ratio_path) + \
+        get_table_sections(comparison_paths, "comparison", "Selected papers") + \
+        get_table_sections(cv_paths, "cv", "CV*")
+    build_report(sections, args.report_dir, force=args.force)
+
+
+if __name__ == '__main__':
+    main()
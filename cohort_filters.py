@@ -0,0 +1,328 @@
+import argparse
+import json
+import logging
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from venues import get_entry_venue
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+FILTER_TOKEN_PATTERN = re.compile(r'[A-Za-z_]+:"[^"]*"|"[^"]*"|>=|<=|==|!=|[(){},&|!<>~]|[^\s(){},&|!<>=~"]+')
+COMPARISON_OPERATORS = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal}
+KEYWORD_NODES = {
+    "workshop": ("match", "booktitle", "workshop"),
+    "tutorial": ("match", "booktitle", "tutorial"),
+}
+# entry keys of the columns with a name of their own
+FIELD_KEYS = {"type": "ENTRYTYPE", "id": "ID"}
+
+
+def tokenize_filter(expression):
+    return FILTER_TOKEN_PATTERN.findall(expression)
+
+
+def get_value(filter_token):
+    return filter_token[1:-1] if filter_token.startswith('"') else filter_token
+
+
+def get_and_node(clauses):
+    # operands are flattened and sorted, a & b and b & (a) compile to the same cached mask
+    flat_clauses = set()
+    for clause in clauses:
+        flat_clauses.update(clause[1] if clause[0] == "and" else [clause])
+    return next(iter(flat_clauses)) if len(flat_clauses) == 1 else ("and", tuple(sorted(flat_clauses, key=repr)))
+
+
+def get_or_node(clauses):
+    flat_clauses = set()
+    for clause in clauses:
+        flat_clauses.update(clause[1] if clause[0] == "or" else [clause])
+    return next(iter(flat_clauses)) if len(flat_clauses) == 1 else ("or", tuple(sorted(flat_clauses, key=repr)))
+
+
+def get_not_node(clause):
+    return clause[1] if clause[0] == "not" else ("not", clause)
+
+
+def parse_filter(expression):
+    """Parses a cohort filter into nested, hashable tuples.
+
+    Clauses are field comparisons (year>2015, year<=2021, type==inproceedings, venue!=LREC), set membership
+    (venue in {ACL,EMNLP}), case insensitive regular expressions (booktitle~"findings"), key presence (has:Code) and
+    the workshop and tutorial keywords. ! binds tighter than &, & tighter than |.
+    """
+    filter_tokens = tokenize_filter(expression)
+    position = 0
+
+    def peek():
+        return filter_tokens[position] if position < len(filter_tokens) else None
+
+    def take():
+        nonlocal position
+        filter_token = peek()
+        if filter_token is None:
+            raise ValueError("unexpected end of filter {!r}".format(expression))
+        position += 1
+        return filter_token
+
+    def parse_or():
+        nonlocal position
+        clauses = [parse_and()]
+        while peek() == "|":
+            position += 1
+            clauses.append(parse_and())
+        return get_or_node(clauses)
+
+    def parse_and():
+        nonlocal position
+        clauses = [parse_not()]
+        while peek() == "&":
+            position += 1
+            clauses.append(parse_not())
+        return get_and_node(clauses)
+
+    def parse_not():
+        nonlocal position
+        if peek() == "!":
+            position += 1
+            return get_not_node(parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        filter_token = take()
+        if filter_token == "(":
+            node = parse_or()
+            if take() != ")":
+                raise ValueError("missing ) in filter {!r}".format(expression))
+            return node
+        if not re.match(r'^[A-Za-z_"]', filter_token):
+            raise ValueError("unexpected {!r} at position {} of filter {!r}".format(filter_token, position - 1,
+                                                                                  expression))
+        has_match = re.match(r'^has:"?([^"]+)"?$', filter_token)
+        if has_match is not None:
+            return "has", has_match.group(1)
+        if filter_token in KEYWORD_NODES and peek() not in COMPARISON_OPERATORS and \
+                peek() not in ("==", "!=", "in", "~"):
+            return KEYWORD_NODES[filter_token]
+
+        field = get_value(filter_token)
+        operator = take()
+        if operator not in COMPARISON_OPERATORS and operator not in ("==", "!=", "in", "~"):
+            raise ValueError("unknown operator {!r} after {} in filter {!r}".format(operator, field, expression))
+        if operator == "in":
+            if take() != "{":
+                raise ValueError("expected {{ after '{} in' in filter {!r}".format(field, expression))
+            values = [get_value(take())]
+            while peek() == ",":
+                take()
+                values.append(get_value(take()))
+            if take() != "}":
+                raise ValueError("missing }} in filter {!r}".format(expression))
+            return "in", field, tuple(sorted(set(values)))
+        value = get_value(take())
+        if operator == "==":
+            return "in", field, (value,)
+        if operator == "!=":
+            return "not", ("in", field, (value,))
+        if operator == "~":
+            re.compile(value)
+            return "match", field, value
+        try:
+            return "compare", field, operator, float(value)
+        except ValueError:
+            raise ValueError("{} {} needs a number, not {!r}".format(field, operator, value))
+
+    node = parse_or()
+    if position != len(filter_tokens):
+        raise ValueError("unexpected {!r} in filter {!r}".format(filter_tokens[position], expression))
+    return node
+
+
+def get_node_fields(node):
+    if node[0] in ("and", "or"):
+        return set().union(*[get_node_fields(clause) for clause in node[1]])
+    if node[0] == "not":
+        return get_node_fields(node[1])
+    if node[0] == "has":
+        return {("has", node[1])}
+    return {node[1]}
+
+
+def get_entry_field(entry, field):
+    if field == "year":
+        return int(entry.get("year", 0))
+    value = entry.get(FIELD_KEYS.get(field, field), "")
+    if field == "booktitle":
+        return value.replace("{", "").replace("}", "")
+    return value
+
+
+class EntryTable:
+    """Columns of the entries used by cohort filters, extracted once and shared by every mask.
+
+    entries is a list of anthology entries or a DataFrame of them, get_venue maps an entry to the venue column (its
+    conference abbreviation, or its booktitle, by default). Masks are cached and returned read-only.
+    """
+
+    def __init__(self, entries, get_venue=get_entry_venue):
+        self.entries = entries
+        self.get_venue = get_venue
+        self.columns = {}
+        self.mask_cache = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load_columns(self, fields):
+        fields = [field for field in fields if field not in self.columns]
+        if len(fields) == 0:
+            return
+        if isinstance(self.entries, pd.DataFrame):
+            for field in fields:
+                self.columns[field] = self.get_frame_column(field)
+            return
+
+        values = {field: [] for field in fields}
+        # a single pass over the entries for all the columns the cohorts need
+        for entry in self.entries:
+            for field in fields:
+                if isinstance(field, tuple):
+                    values[field].append(field[1] in entry)
+                elif field == "venue":
+                    values[field].append(self.get_venue(entry))
+                else:
+                    values[field].append(get_entry_field(entry, field))
+        for field in fields:
+            self.columns[field] = self.get_array(field, values[field])
+
+    def get_frame_venues(self):
+        # get_venue sees every row as an entry without its missing values, like the entries of a list
+        columns = list(self.entries.columns)
+        return [self.get_venue({key: value for key, value in zip(columns, row)
+                                if not (value is None or isinstance(value, float) and np.isnan(value))})
+                for row in self.entries.itertuples(index=False, name=None)]
+
+    def get_frame_column(self, field):
+        if field == "venue":
+            return self.get_array(field, self.get_frame_venues())
+        if isinstance(field, tuple):
+            if field[1] not in self.entries.columns:
+                return np.zeros(len(self.entries), dtype=bool)
+            return self.entries[field[1]].notna().to_numpy()
+        key = FIELD_KEYS.get(field, field)
+        if key not in self.entries.columns:
+            return self.get_array(field, [""] * len(self.entries))
+        column = self.entries[key]
+        if field == "booktitle":
+            column = column.str.replace("{", "").str.replace("}", "")
+        return self.get_array(field, column.tolist())
+
+    @staticmethod
+    def get_array(field, values):
+        if isinstance(field, tuple):
+            return np.array(values, dtype=bool)
+        if field == "year":
+            return np.array(values, dtype=np.int64)
+        # string columns are kept as codes into their distinct values, clauses are evaluated once per value
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(""))
+        return codes, np.array([str(value) for value in uniques], dtype=object)
+
+    def get_column(self, field):
+        self.load_columns([field])
+        return self.columns[field]
+
+    def get_mask(self, node):
+        if node in self.mask_cache:
+            return self.mask_cache[node]
+        node_type = node[0]
+        if node_type == "and":
+            mask = np.logical_and.reduce([self.get_mask(clause) for clause in node[1]])
+        elif node_type == "or":
+            mask = np.logical_or.reduce([self.get_mask(clause) for clause in node[1]])
+        elif node_type == "not":
+            mask = ~self.get_mask(node[1])
+        elif node_type == "has":
+            mask = self.get_column(("has", node[1]))
+        else:
+            mask = self.get_field_mask(node)
+        # shared by every cohort with the same clause, callers must not change it in place
+        mask.flags.writeable = False
+        self.mask_cache[node] = mask
+        return mask
+
+    def get_field_mask(self, node):
+        node_type, field = node[0], node[1]
+        column = self.get_column(field)
+        if isinstance(column, np.ndarray):
+            if node_type == "compare":
+                return COMPARISON_OPERATORS[node[2]](column, node[3])
+            if node_type == "in":
+                return np.isin(column, [int(value) for value in node[2]])
+            pattern = re.compile(node[2], re.IGNORECASE)
+            return np.array([pattern.search(str(value)) is not None for value in column], dtype=bool)
+
+        codes, uniques = column
+        if node_type == "in":
+            value_mask = np.isin(uniques, list(node[2]))
+        elif node_type == "match":
+            pattern = re.compile(node[2], re.IGNORECASE)
+            value_mask = np.array([pattern.search(value) is not None for value in uniques], dtype=bool)
+        else:
+            value_mask = COMPARISON_OPERATORS[node[2]](pd.to_numeric(pd.Series(uniques), errors="coerce").to_numpy(),
+                                                       node[3])
+        return np.append(value_mask, False)[codes]
+
+    def evaluate(self, expression):
+        return self.get_mask(parse_filter(expression))
+
+    def evaluate_all(self, cohorts):
+        nodes = {name: parse_filter(expression) for name, expression in cohorts.items()}
+        self.load_columns(sorted(set().union(*[get_node_fields(node) for node in nodes.values()]), key=repr))
+        return {name: self.get_mask(node) for name, node in nodes.items()}
+
+
+def get_cohort_masks(entries, cohorts, get_venue=get_entry_venue):
+    return EntryTable(entries, get_venue=get_venue).evaluate_all(cohorts)
+
+
+def load_cohorts(cohorts_path):
+    with open(cohorts_path) as f:
+        cohorts = json.load(f)
+    for expression in cohorts.values():
+        parse_filter(expression)
+    return cohorts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Counting the entries of cohort filters')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--cohorts_path", type=str, default="",
+                        help="JSON object of cohort names to filters")
+    parser.add_argument("--filter", type=str, nargs="*", default=[],
+                        help="filters to count, e.g. 'year>2015 & venue in {ACL,EMNLP} & !workshop & has:Code'")
+
+    args = parser.parse_args()
+    from analyse_anthology import load_anthology, preprocess_acl_data
+
+    cohorts = load_cohorts(args.cohorts_path) if args.cohorts_path != "" else {}
+    cohorts.update({expression: expression for expression in args.filter})
+
+    acl_anthology = load_anthology(args.anthology_json_path)
+    preprocess_acl_data(acl_anthology)
+
+    start_time = time.perf_counter()
+    masks = get_cohort_masks(acl_anthology, cohorts)
+    logging.info("Evaluated {} cohorts in {:.3f} s".format(len(cohorts), time.perf_counter() - start_time))
+    for name, mask in masks.items():
+        print("{}\t{}".format(name, int(mask.sum())))
+
+
+if __name__ == '__main__':
+    main()
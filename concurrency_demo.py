@@ -0,0 +1,151 @@
+import argparse
+import collections
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from process_anthology import ConcurrencyController, get_acl_information, get_reproducibility_information, \
+    is_acl_overloaded, run_func_in_parallel
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+PAPER_PAGE = '<html><body><div class="acl-paper-link-block"><a href="https://github.com/acl/{0}">Code</a></div>' \
+             '</body></html>'
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Anthology paper pages served with the latency of a server with limited capacity.
+
+    A request waits base_latency times the number of requests in flight per unit of capacity, more than
+    overload_factor times the capacity in flight are answered with a 503. Every spike_interval seconds the
+    capacity drops to spike_capacity and the latency is multiplied by spike_factor for spike_duration seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, base_latency=0.1, capacity=16, overload_factor=3, spike_interval=10.0,
+                 spike_duration=3.0, spike_capacity=2, spike_factor=5.0):
+        super().__init__(address, StandInRequestHandler)
+        self.base_latency = base_latency
+        self.capacity = capacity
+        self.overload_factor = overload_factor
+        self.spike_interval = spike_interval
+        self.spike_duration = spike_duration
+        self.spike_capacity = spike_capacity
+        self.spike_factor = spike_factor
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.start_time = time.monotonic()
+
+    def is_spike(self):
+        return (time.monotonic() - self.start_time) % self.spike_interval >= self.spike_interval - self.spike_duration
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            in_flight = server.in_flight
+        try:
+            is_spike = server.is_spike()
+            capacity = server.spike_capacity if is_spike else server.capacity
+            if in_flight > server.overload_factor * capacity:
+                self.send_error(503)
+                return
+            latency = server.base_latency * max(1.0, in_flight / capacity)
+            time.sleep(latency * server.spike_factor if is_spike else latency)
+            body = PAPER_PAGE.format(self.path.strip("/").split("/")[-1]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on the request
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_demo_entries(base_url, number_of_entries):
+    # the path contains aclanthology.org, get_reproducibility_information only requests anthology pages
+    return [{"ID": "paper-{}".format(i), "url": "{}/aclanthology.org/paper-{}/".format(base_url, i)}
+            for i in range(number_of_entries)]
+
+
+def get_run_summary(name, acl_entries, seconds):
+    status_counts = collections.Counter("overloaded" if is_acl_overloaded(entry) else entry["acl_status"]
+                                        for entry in acl_entries)
+    return {"run": name,
+            "seconds": round(seconds, 1),
+            "pages_per_second": round(status_counts["success"] / seconds, 1),
+            "success": status_counts["success"],
+            "overloaded": status_counts["overloaded"],
+            "other": len(acl_entries) - status_counts["success"] - status_counts["overloaded"]}
+
+
+def run_demo(server, base_url, number_of_entries, fixed_workers, max_concurrency):
+    summaries = []
+    for workers in fixed_workers:
+        server.reset()
+        start_time = time.perf_counter()
+        acl_entries = run_func_in_parallel(get_reproducibility_information, get_demo_entries(base_url,
+                                                                                             number_of_entries),
+                                           max_workers=workers)
+        summaries.append(get_run_summary("fixed {} workers".format(workers), acl_entries,
+                                         time.perf_counter() - start_time))
+
+    server.reset()
+    controller = ConcurrencyController(max_limit=max_concurrency)
+    start_time = time.perf_counter()
+    acl_entries = get_acl_information(get_demo_entries(base_url, number_of_entries), controller=controller)
+    summaries.append(get_run_summary("adaptive, at most {}".format(max_concurrency), acl_entries,
+                                     time.perf_counter() - start_time))
+    return pd.DataFrame(summaries), pd.DataFrame(controller.history, columns=["seconds", "limit"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed and adaptive concurrency against a local stand-in server')
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--fixed_workers", type=int, nargs="*", default=[5, 32],
+                        help="5 is the ThreadPoolExecutor default on one core, 32 on a many-core machine")
+    parser.add_argument("--max_concurrency", type=int, default=32)
+    parser.add_argument("--base_latency", type=float, default=0.1)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--spike_interval", type=float, default=10.0)
+    parser.add_argument("--spike_duration", type=float, default=3.0)
+    parser.add_argument("--history_path", type=str, default="",
+                        help="CSV of the adaptive run's limit over time")
+
+    args = parser.parse_args()
+    server = StandInServer(("127.0.0.1", args.port), base_latency=args.base_latency, capacity=args.capacity,
+                           spike_interval=args.spike_interval, spike_duration=args.spike_duration)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        summary_df, history_df = run_demo(server, "http://127.0.0.1:{}".format(args.port), args.entries,
+                                          args.fixed_workers, args.max_concurrency)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(summary_df.to_string(index=False))
+    if args.history_path != "":
+        history_df.to_csv(args.history_path, index=False)
+
+
+if __name__ == '__main__':
+    main()
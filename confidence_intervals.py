@@ -0,0 +1,70 @@
+import numpy as np
+from scipy.stats import norm
+
+CI_METHODS = ["wilson", "bootstrap"]
+
+
+def wilson_interval(successes, totals, confidence=0.95):
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+
+    z = norm.ppf(0.5 + confidence / 2)
+    z_squared = z * z
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = successes / totals
+        denominator = 1 + z_squared / totals
+        center = (ratio + z_squared / (2 * totals)) / denominator
+        half_width = z * np.sqrt(ratio * (1 - ratio) / totals + z_squared / (4 * totals * totals)) / denominator
+    lower = np.clip(center - half_width, 0, 1)
+    upper = np.clip(center + half_width, 0, 1)
+    return lower, upper
+
+
+def bootstrap_ratio_interval(successes, totals, n_resamples=2000, confidence=0.95, seed=0,
+                             max_batch_elements=2 ** 24):
+    # resampling n papers with replacement from a group with k successes gives a Binomial(n, k/n)
+    # success count, so every group and every resample is drawn at once from the count arrays
+    # instead of materializing per-paper indices
+    successes = np.asarray(successes, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    if successes.shape != totals.shape:
+        raise ValueError("successes and totals must have the same shape")
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    safe_totals = np.maximum(totals, 1)
+    ratio = successes / safe_totals
+
+    lower = np.empty(len(totals), dtype=np.float64)
+    upper = np.empty(len(totals), dtype=np.float64)
+    # bound the size of the (groups x resamples) matrix
+    groups_per_batch = max(1, max_batch_elements // n_resamples)
+    for start in range(0, len(totals), groups_per_batch):
+        stop = start + groups_per_batch
+        resampled_successes = rng.binomial(safe_totals[start:stop, None], ratio[start:stop, None],
+                                           size=(len(totals[start:stop]), n_resamples))
+        resampled_ratio = resampled_successes / safe_totals[start:stop, None]
+        lower[start:stop], upper[start:stop] = np.quantile(resampled_ratio, [alpha, 1 - alpha], axis=1)
+
+    lower[totals == 0] = np.nan
+    upper[totals == 0] = np.nan
+    return lower, upper
+
+
+def ratio_interval(successes, totals, method="wilson", confidence=0.95, n_resamples=2000, seed=0):
+    if method == "wilson":
+        return wilson_interval(successes, totals, confidence=confidence)
+    if method == "bootstrap":
+        return bootstrap_ratio_interval(successes, totals, n_resamples=n_resamples, confidence=confidence,
+                                        seed=seed)
+    raise ValueError("unknown interval method {}, expected one of {}".format(method, CI_METHODS))
+
+
+def draw_interval_bands(grid, data, x, lower, upper, hue, hue_order, palette, alpha=0.2):
+    # seaborn only computes error bands from raw observations, so precomputed bounds are drawn per hue level
+    ax = grid.ax
+    for hue_level in hue_order:
+        hue_data = data[data[hue] == hue_level].sort_values(x)
+        ax.fill_between(hue_data[x], hue_data[lower], hue_data[upper],
+                        color=palette[hue_level], alpha=alpha, linewidth=0)
+    return grid
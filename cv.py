@@ -28,14 +28,28 @@ NOTE:
 * CV assumes all measurements are positive; if they're not, shift measurement scale to start at 0
 * for fair comparison across studies, measurements on a scale that doesn't start at 0 need to be shifted to a scale that does start at 0
 
+Measurement tables can also be scored from a file, one measurement per row, grouped by the given columns:
+
+python cv.py --input results.csv --group_by paper system metric --value_column score --output cv.csv
+
+CSV, JSONL and Parquet inputs are read in chunks and scored in a process pool, the output has the
+get_precision_results fields for each group, as CSV or LaTeX.
+
 KNOWN ISSUES:
 
 none
 """
 
-import math
+import argparse
+import concurrent
+import logging
+import os
+import sys
+from concurrent import futures
+
 import numpy as np
 import pandas as pd
+from scipy.special import gammaln
 from scipy.stats import t
 
 
@@ -47,20 +61,106 @@ def get_precision_results(set_of_measurements):
     if sample_mean <= 0:
         raise ValueError(set_of_measurements, ": mean is 0 or negative")
 
-    sample_size = len(set_of_measurements)
+    precision_statistics = compute_precision_statistics(np.asarray(set_of_measurements, dtype=np.float64)[None, :])
+
+    result_dict = {
+        "sample size": int(precision_statistics["sample size"][0]),
+        "mean": precision_statistics["mean"][0],
+        "unbiased stdev": precision_statistics["unbiased stdev"][0],
+        "stdev 95% CI": "[{:.2f}, {:.2f}]".format(precision_statistics["stdev 95% CI lower"][0],
+                                                  precision_statistics["stdev 95% CI upper"][0]),
+        "CV*": precision_statistics["CV*"][0],
+        # "% of measured values within two standard deviations": count_within_2_sd / sample_size * 100,
+        # "% of measured values within one standard deviations": count_within_1_sd / sample_size * 100,
+    }
+    return result_dict
+
+
+def pad_measurement_sets(set_of_set_of_measurements):
+    # ragged list of measurement sets -> (number of sets, longest set) matrix padded with NaN
+    sample_sizes = np.fromiter((len(m) for m in set_of_set_of_measurements), dtype=np.int64,
+                               count=len(set_of_set_of_measurements))
+    padded_measurements = np.full((len(sample_sizes), max(sample_sizes.max(initial=0), 1)), np.nan)
+    if sample_sizes.sum() > 0:
+        row_index = np.repeat(np.arange(len(sample_sizes)), sample_sizes)
+        column_index = np.arange(sample_sizes.sum()) - np.repeat(np.cumsum(sample_sizes) - sample_sizes,
+                                                                  sample_sizes)
+        padded_measurements[row_index, column_index] = np.concatenate(
+            [np.asarray(m, dtype=np.float64) for m in set_of_set_of_measurements if len(m) > 0])
+    return padded_measurements
+
+
+def pad_measurement_table(measurement_df, group_column, value_column):
+    # long-format table with one measurement per row -> padded matrix with one row per group
+    grouped = measurement_df.groupby(group_column, sort=False)
+    group_index = grouped.ngroup().to_numpy()
+    position_index = grouped.cumcount().to_numpy()
+    sample_sizes = np.bincount(group_index, minlength=grouped.ngroups)
+
+    padded_measurements = np.full((grouped.ngroups, max(sample_sizes.max(initial=0), 1)), np.nan)
+    padded_measurements[group_index, position_index] = measurement_df[value_column].to_numpy(dtype=np.float64)
+    group_labels = pd.Series(list(grouped.groups.keys())) if grouped.ngroups > 0 else pd.Series([], dtype=object)
+    if isinstance(group_column, (list, tuple)) and len(group_column) > 1:
+        group_labels = pd.MultiIndex.from_tuples(group_labels, names=group_column)
+    else:
+        group_labels = pd.Index(group_labels, name=group_column if not isinstance(group_column, (list, tuple))
+                                else group_column[0])
+    return padded_measurements, group_labels
+
+
+# c_4(N) = sqrt(2 / (N - 1)) * Gamma(N / 2) / Gamma((N - 1) / 2), the gamma functions overflow a float for N > ~343,
+# so the table is built from log-gamma and larger N use the asymptotic expansion
+# c_4(N) = 1 - 1/(4N) - 7/(32N^2) - 19/(128N^3) - 101/(2048N^4) + 161/(8192N^5) - 2355/(65536N^6) + O(N^-7)
+C4_TABLE_MAX_SAMPLE_SIZE = 128
+C4_ASYMPTOTIC_COEFFICIENTS = [1, -1 / 4, -7 / 32, -19 / 128, -101 / 2048, 161 / 8192, -2355 / 65536]
+
+
+def get_c4_log_gamma(sample_sizes):
+    sample_sizes = np.asarray(sample_sizes, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(2 / (sample_sizes - 1)) * np.exp(gammaln(sample_sizes / 2) - gammaln((sample_sizes - 1) / 2))
+
+
+def get_c4_asymptotic(sample_sizes):
+    inverse_sample_sizes = 1 / np.asarray(sample_sizes, dtype=np.float64)
+    # Horner evaluation of the expansion in 1/N
+    c_4 = np.zeros_like(inverse_sample_sizes)
+    for coefficient in reversed(C4_ASYMPTOTIC_COEFFICIENTS):
+        c_4 = c_4 * inverse_sample_sizes + coefficient
+    return c_4
+
+
+C4_TABLE = get_c4_log_gamma(np.arange(C4_TABLE_MAX_SAMPLE_SIZE + 1))
+C4_TABLE[:2] = np.nan
+
+
+def get_c4(sample_sizes):
+    # c_4(N) for every sample size, undefined (NaN) for N < 2
+    sample_sizes = np.asarray(sample_sizes, dtype=np.int64)
+    flat_sample_sizes = sample_sizes.ravel()
+    in_table = flat_sample_sizes <= C4_TABLE_MAX_SAMPLE_SIZE
+    c_4 = np.empty(len(flat_sample_sizes), dtype=np.float64)
+    c_4[in_table] = C4_TABLE[np.maximum(flat_sample_sizes[in_table], 0)]
+    c_4[~in_table] = get_c4_asymptotic(flat_sample_sizes[~in_table])
+    return c_4.reshape(sample_sizes.shape)
+
+
+def get_t_quantiles(degrees_of_freedom, confidence=0.95):
+    # one scipy call per distinct degrees of freedom instead of one per measurement set
+    unique_degrees_of_freedom, inverse = np.unique(degrees_of_freedom, return_inverse=True)
+    unique_quantiles = t.ppf(0.5 + confidence / 2, unique_degrees_of_freedom)
+    return unique_quantiles[inverse]
+
+
+def compute_precision_statistics_from_moments(sample_size, sample_mean, sum_of_squared_differences):
     degrees_of_freedom = sample_size - 1
-    sum_of_squared_differences = np.sum(np.square(sample_mean - set_of_measurements))
 
     # unbiassed sample variance s^2
     unbiassed_sample_variance = sum_of_squared_differences / degrees_of_freedom
     # corrected sample standard deviation s
     corrected_sample_standard_deviation = np.sqrt(unbiassed_sample_variance)
-    # Gamma(N/2)
-    gamma_N_over_2 = math.gamma(sample_size / 2)
-    # Gamma((N-1)/2)
-    gamma_df_over_2 = math.gamma(degrees_of_freedom / 2)
     # c_4(N)
-    c_4_N = math.sqrt(2 / degrees_of_freedom) * gamma_N_over_2 / gamma_df_over_2
+    c_4_N = get_c4(sample_size)
     # unbiassed sample std dev s/c_4
     unbiassed_sample_std_dev_s_c_4 = corrected_sample_standard_deviation / c_4_N
     # standard error of the unbiassed sample variance (assumes normally distributed population)
@@ -68,40 +168,344 @@ def get_precision_results(set_of_measurements):
     # estimated std err of std dev based on std err of unbiassed sample variance
     est_SE_of_SD_based_on_SE_of_unbiassed_sample_variance = standard_error_of_unbiassed_sample_variance / (
             2 * unbiassed_sample_std_dev_s_c_4)
+    # 95% CI of the std dev, same as t.interval(0.95, df, loc=s/c_4, scale=SE)
+    ci_half_width = get_t_quantiles(degrees_of_freedom) * est_SE_of_SD_based_on_SE_of_unbiassed_sample_variance
 
     # COEFFICIENT OF VARIATION CV
     coefficient_of_variation = (unbiassed_sample_std_dev_s_c_4 / sample_mean) * 100
     # SMALL SAMPLE CORRECTED COEFFICIENT OF VARIATION CV*
     small_sample_coefficient_of_variation = (1 + (1 / (4 * sample_size))) * coefficient_of_variation
 
-    # compute percentage of measured values within 1 and 2 standard deviations from the mean
-    # initialise counts
-    count_within_1_sd = 0
-    count_within_2_sd = 0
-    # for each measured value
-    for m in set_of_measurements:
-        # if it's within two std devs, increment count_within_2_sd
-        if np.abs(m - sample_mean) < 2 * unbiassed_sample_std_dev_s_c_4:
-            count_within_2_sd += 1
-            # if it's also within one std devs, increment count_within_1_sd
-            if np.abs(m - sample_mean) < unbiassed_sample_std_dev_s_c_4:
-                count_within_1_sd += 1
-
-    result_dict = {
+    return {
         "sample size": sample_size,
         "mean": sample_mean,
         "unbiased stdev": unbiassed_sample_std_dev_s_c_4,
-        "stdev 95% CI": "[{:.2f}, {:.2f}]".format(
-            *t.interval(0.95, degrees_of_freedom, loc=unbiassed_sample_std_dev_s_c_4,
-                        scale=est_SE_of_SD_based_on_SE_of_unbiassed_sample_variance)),
+        "stdev 95% CI lower": unbiassed_sample_std_dev_s_c_4 - ci_half_width,
+        "stdev 95% CI upper": unbiassed_sample_std_dev_s_c_4 + ci_half_width,
         "CV*": small_sample_coefficient_of_variation,
-        # "% of measured values within two standard deviations": count_within_2_sd / sample_size * 100,
-        # "% of measured values within one standard deviations": count_within_1_sd / sample_size * 100,
     }
-    return result_dict
 
 
-def main():
+def compute_precision_statistics(padded_measurements):
+    sample_size = np.sum(~np.isnan(padded_measurements), axis=1)
+    sample_mean = np.nansum(padded_measurements, axis=1) / sample_size
+    absolute_differences = np.abs(padded_measurements - sample_mean[:, None])
+    sum_of_squared_differences = np.nansum(np.square(absolute_differences), axis=1)
+
+    precision_statistics = compute_precision_statistics_from_moments(sample_size, sample_mean,
+                                                                     sum_of_squared_differences)
+    unbiassed_sample_std_dev_s_c_4 = precision_statistics["unbiased stdev"]
+
+    # count measured values within 1 and 2 standard deviations from the mean, padding compares as False
+    count_within_2_sd = np.sum(absolute_differences < 2 * unbiassed_sample_std_dev_s_c_4[:, None], axis=1)
+    count_within_1_sd = np.sum(absolute_differences < unbiassed_sample_std_dev_s_c_4[:, None], axis=1)
+
+    precision_statistics["% within two standard deviations"] = count_within_2_sd / sample_size * 100
+    precision_statistics["% within one standard deviation"] = count_within_1_sd / sample_size * 100
+    return precision_statistics
+
+
+def get_precision_results_batch(measurements, group_column=None, value_column="value"):
+    """Computes the get_precision_results statistics for many measurement sets in one pass.
+
+    measurements is either a ragged list of measurement sets, a NaN-padded 2D array with one set per row,
+    or a long-format DataFrame with one measurement per row, grouped by group_column.
+    Returns a DataFrame with one row per measurement set.
+    """
+    if isinstance(measurements, pd.DataFrame):
+        if group_column is None:
+            raise ValueError("group_column is required for long-format measurement tables")
+        padded_measurements, group_labels = pad_measurement_table(measurements, group_column, value_column)
+    elif isinstance(measurements, np.ndarray) and measurements.ndim == 2:
+        padded_measurements = measurements.astype(np.float64, copy=False)
+        group_labels = pd.RangeIndex(len(padded_measurements))
+    else:
+        padded_measurements = pad_measurement_sets(measurements)
+        group_labels = pd.RangeIndex(len(padded_measurements))
+
+    sample_size = np.sum(~np.isnan(padded_measurements), axis=1)
+    too_small = sample_size < 2
+    if too_small.any():
+        raise ValueError(list(group_labels[too_small]), ": set of measurements is smaller than 2")
+    non_positive_mean = np.nansum(padded_measurements, axis=1) <= 0
+    if non_positive_mean.any():
+        raise ValueError(list(group_labels[non_positive_mean]), ": mean is 0 or negative")
+
+    precision_statistics = compute_precision_statistics(padded_measurements)
+    results_df = pd.DataFrame(precision_statistics, index=group_labels)
+    results_df.insert(3, "stdev 95% CI", ["[{:.2f}, {:.2f}]".format(lower, upper) for lower, upper in
+                                          zip(precision_statistics["stdev 95% CI lower"],
+                                              precision_statistics["stdev 95% CI upper"])])
+    return results_df
+
+
+class PrecisionAccumulator:
+    """Streaming version of get_precision_results.
+
+    Keeps the sample size, mean and sum of squared differences (Welford) so CV* can be updated one
+    measurement at a time and partial states from different workers can be combined with merge().
+    The within-1/2-SD percentages need the measured values themselves. With track_values they are computed
+    from the values, a uniform sample of at most max_values of them once there are more, so the state keeps
+    a fixed size.
+    """
+
+    def __init__(self, track_values=False, max_values=1024, seed=0):
+        self.sample_size = 0
+        self.sample_mean = 0.0
+        self.sum_of_squared_differences = 0.0
+        self.track_values = track_values
+        self.max_values = max_values
+        self.values = []
+        self.random_generator = np.random.default_rng(seed)
+
+    def update(self, measurement):
+        measurement = float(measurement)
+        self.sample_size += 1
+        delta = measurement - self.sample_mean
+        self.sample_mean += delta / self.sample_size
+        self.sum_of_squared_differences += delta * (measurement - self.sample_mean)
+        if self.track_values:
+            # reservoir sampling, every measurement so far is kept with the same probability
+            if len(self.values) < self.max_values:
+                self.values.append(measurement)
+            else:
+                index = self.random_generator.integers(self.sample_size)
+                if index < self.max_values:
+                    self.values[index] = measurement
+        return self
+
+    def update_many(self, measurements):
+        measurements = np.asarray(measurements, dtype=np.float64).ravel()
+        if len(measurements) == 0:
+            return self
+        if self.track_values:
+            batch_values = measurements if len(measurements) <= self.max_values else \
+                self.random_generator.choice(measurements, self.max_values, replace=False)
+            self.values = self._merge_values(self.sample_size, self.values, len(measurements), batch_values.tolist())
+        batch_mean = float(measurements.mean())
+        self._merge_moments(len(measurements), batch_mean, float(np.sum(np.square(measurements - batch_mean))))
+        return self
+
+    def merge(self, other):
+        # all checks come before any change, a failed merge leaves the accumulator as it was
+        if self.track_values and other.sample_size > 0:
+            if not other.track_values:
+                raise ValueError("cannot merge an accumulator without tracked values into one that tracks them")
+            if other.max_values != self.max_values:
+                raise ValueError("cannot merge accumulators keeping {} and {} values".format(self.max_values,
+                                                                                           other.max_values))
+        if self.track_values:
+            self.values = self._merge_values(self.sample_size, self.values, other.sample_size, other.values)
+        self._merge_moments(other.sample_size, other.sample_mean, other.sum_of_squared_differences)
+        return self
+
+    def _merge_values(self, sample_size, values, other_sample_size, other_values):
+        # uniform sample of the union of two populations from uniform samples of each of them
+        if len(values) + len(other_values) <= self.max_values:
+            return list(values) + list(other_values)
+        number_of_values = self.random_generator.hypergeometric(sample_size, other_sample_size, self.max_values)
+        return self.random_generator.choice(values, number_of_values, replace=False).tolist() + \
+            self.random_generator.choice(other_values, self.max_values - number_of_values, replace=False).tolist()
+
+    def _merge_moments(self, sample_size, sample_mean, sum_of_squared_differences):
+        # Chan et al. pairwise update of the Welford state
+        if sample_size == 0:
+            return
+        total_sample_size = self.sample_size + sample_size
+        delta = sample_mean - self.sample_mean
+        self.sample_mean += delta * sample_size / total_sample_size
+        self.sum_of_squared_differences += sum_of_squared_differences + \
+            delta * delta * self.sample_size * sample_size / total_sample_size
+        self.sample_size = total_sample_size
+
+    def _count_within(self, sorted_values, lower, upper):
+        # values strictly inside (lower, upper)
+        return int(np.searchsorted(sorted_values, upper, side="left") -
+                   np.searchsorted(sorted_values, lower, side="right"))
+
+    def get_precision_results(self):
+        if self.sample_size < 2:
+            raise ValueError(self.sample_size, ": set of measurements is smaller than 2")
+        if self.sample_mean <= 0:
+            raise ValueError(self.sample_mean, ": mean is 0 or negative")
+
+        precision_statistics = compute_precision_statistics_from_moments(np.array([self.sample_size]),
+                                                                         np.array([self.sample_mean]),
+                                                                         np.array([self.sum_of_squared_differences]))
+        unbiassed_sample_std_dev_s_c_4 = precision_statistics["unbiased stdev"][0]
+        result_dict = {
+            "sample size": self.sample_size,
+            "mean": self.sample_mean,
+            "unbiased stdev": unbiassed_sample_std_dev_s_c_4,
+            "stdev 95% CI": "[{:.2f}, {:.2f}]".format(precision_statistics["stdev 95% CI lower"][0],
+                                                      precision_statistics["stdev 95% CI upper"][0]),
+            "CV*": precision_statistics["CV*"][0],
+        }
+        if self.track_values:
+            # exact as long as all values are kept, an estimate from the sample beyond max_values
+            sorted_values = np.sort(np.asarray(self.values, dtype=np.float64))
+            for label, number_of_sd in [("% within two standard deviations", 2),
+                                        ("% within one standard deviation", 1)]:
+                count_within = self._count_within(sorted_values,
+                                                  self.sample_mean - number_of_sd * unbiassed_sample_std_dev_s_c_4,
+                                                  self.sample_mean + number_of_sd * unbiassed_sample_std_dev_s_c_4)
+                result_dict[label] = count_within / len(sorted_values) * 100
+        return result_dict
+
+    def to_state(self):
+        state = {
+            "sample_size": self.sample_size,
+            "sample_mean": float(self.sample_mean),
+            "sum_of_squared_differences": float(self.sum_of_squared_differences),
+        }
+        if self.track_values:
+            state["max_values"] = self.max_values
+            state["values"] = list(self.values)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        accumulator = cls(track_values="values" in state, max_values=state.get("max_values", 1024))
+        accumulator.sample_size = int(state["sample_size"])
+        accumulator.sample_mean = float(state["sample_mean"])
+        accumulator.sum_of_squared_differences = float(state["sum_of_squared_differences"])
+        if accumulator.track_values:
+            accumulator.values = [float(value) for value in state["values"]]
+        return accumulator
+
+
+MEASUREMENT_FILE_FORMATS = ["csv", "jsonl", "parquet"]
+PRECISION_RESULT_COLUMNS = ["sample size", "mean", "unbiased stdev", "stdev 95% CI", "CV*"]
+
+
+def get_measurement_file_format(file_path):
+    file_name = file_path.lower()
+    for compression_extension in [".gz", ".bz2", ".xz", ".zst"]:
+        if file_name.endswith(compression_extension):
+            file_name = file_name[:-len(compression_extension)]
+    extension = os.path.splitext(file_name)[1].lstrip(".")
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in MEASUREMENT_FILE_FORMATS:
+        raise ValueError(file_path, ": unknown measurement file format, expected one of {}".format(
+            MEASUREMENT_FILE_FORMATS))
+    return extension
+
+
+def iter_measurement_chunks(file_path, columns, file_format=None, chunksize=1_000_000):
+    file_format = file_format if file_format is not None else get_measurement_file_format(file_path)
+    if file_format == "csv":
+        yield from pd.read_csv(file_path, usecols=columns, chunksize=chunksize)
+    elif file_format == "jsonl":
+        for chunk in pd.read_json(file_path, lines=True, chunksize=chunksize):
+            yield chunk[columns]
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("reading parquet measurement files requires pyarrow")
+        parquet_file = pyarrow.parquet.ParquetFile(file_path)
+        for record_batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield record_batch.to_pandas()
+    else:
+        raise ValueError(file_format, ": unknown measurement file format")
+
+
+def get_group_moments(measurement_df, group_by, value_column):
+    # sample size, mean and sum of squared differences of every group in a chunk
+    measurement_df = measurement_df.dropna(subset=[value_column])
+    grouped_values = measurement_df.groupby(group_by, sort=False, dropna=False)[value_column]
+    group_mean = grouped_values.transform("mean")
+    squared_differences = np.square(measurement_df[value_column] - group_mean)
+    moments_df = grouped_values.agg(sample_size="count", sample_mean="mean")
+    moments_df["sum_of_squared_differences"] = squared_differences.groupby(
+        [measurement_df[column] for column in group_by], sort=False, dropna=False).sum()
+    return moments_df.reset_index()
+
+
+def merge_group_moments(moments_df, group_by):
+    # pooled moments of groups that were split across chunks, exact like PrecisionAccumulator.merge
+    weighted_mean = moments_df["sample_size"] * moments_df["sample_mean"]
+    grouped = moments_df.assign(weighted_mean=weighted_mean).groupby(group_by, sort=False, dropna=False)
+    merged_df = grouped.agg(sample_size=("sample_size", "sum"), weighted_mean=("weighted_mean", "sum"))
+    merged_df["sample_mean"] = merged_df["weighted_mean"] / merged_df["sample_size"]
+
+    pooled_mean = grouped["weighted_mean"].transform("sum") / grouped["sample_size"].transform("sum")
+    between_chunks = moments_df["sample_size"] * np.square(moments_df["sample_mean"] - pooled_mean)
+    merged_df["sum_of_squared_differences"] = (moments_df["sum_of_squared_differences"] + between_chunks).groupby(
+        [moments_df[column] for column in group_by], sort=False, dropna=False).sum()
+    return merged_df.drop(columns="weighted_mean").reset_index()
+
+
+def get_precision_results_from_moments(moments_df, group_by):
+    valid = np.logical_and(moments_df["sample_size"] >= 2, moments_df["sample_mean"] > 0)
+    if not valid.all():
+        logging.warning("Skipping {} groups with fewer than 2 measurements or a mean that is 0 or negative".format(
+            int((~valid).sum())))
+    moments_df = moments_df[valid]
+
+    precision_statistics = compute_precision_statistics_from_moments(
+        moments_df["sample_size"].to_numpy(),
+        moments_df["sample_mean"].to_numpy(),
+        moments_df["sum_of_squared_differences"].to_numpy())
+    results_df = moments_df[group_by].reset_index(drop=True)
+    for column in PRECISION_RESULT_COLUMNS:
+        if column == "stdev 95% CI":
+            results_df[column] = ["[{:.2f}, {:.2f}]".format(lower, upper) for lower, upper in
+                                  zip(precision_statistics["stdev 95% CI lower"],
+                                      precision_statistics["stdev 95% CI upper"])]
+        else:
+            results_df[column] = precision_statistics[column]
+    return results_df
+
+
+def merge_chunk_moments(merged_moments_df, done_futures, group_by):
+    moments_df_list = [future.result() for future in done_futures]
+    if merged_moments_df is not None:
+        moments_df_list.append(merged_moments_df)
+    if len(moments_df_list) == 0:
+        return merged_moments_df
+    return merge_group_moments(pd.concat(moments_df_list, ignore_index=True), list(group_by))
+
+
+def score_measurement_file(file_path, group_by, value_column, file_format=None, chunksize=1_000_000,
+                           max_workers=None):
+    # chunks are reduced to per-group moments in worker processes, only the moments are kept in memory
+    max_workers = max_workers if max_workers is not None else os.cpu_count()
+    merged_moments_df = None
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending_futures = set()
+        chunks = iter_measurement_chunks(file_path, list(group_by) + [value_column], file_format=file_format,
+                                         chunksize=chunksize)
+        for chunk in chunks:
+            pending_futures.add(executor.submit(get_group_moments, chunk, list(group_by), value_column))
+            if len(pending_futures) < 2 * max_workers:
+                continue
+            done_futures, pending_futures = concurrent.futures.wait(pending_futures,
+                                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            merged_moments_df = merge_chunk_moments(merged_moments_df, done_futures, group_by)
+        merged_moments_df = merge_chunk_moments(merged_moments_df, pending_futures, group_by)
+
+    if merged_moments_df is None:
+        return pd.DataFrame(columns=list(group_by) + PRECISION_RESULT_COLUMNS)
+    return get_precision_results_from_moments(merged_moments_df, list(group_by))
+
+
+def export_precision_results(results_df, output_path, output_format):
+    output = sys.stdout if output_path == "" else output_path
+    if output_format == "latex":
+        # column names like "stdev 95% CI" would start a LaTeX comment unescaped
+        latex_table = results_df.to_latex(index=False, float_format="{:.2f}".format, escape=True)
+        if output_path == "":
+            print(latex_table)
+        else:
+            with open(output_path, "w") as f:
+                f.write(latex_table)
+    else:
+        results_df.to_csv(output, index=False)
+
+
+def report_example_measurements():
     # measurements from Belz et al. (2022)
     set_of_set_of_measurements = [[84.51, 84.5, 87.46, 85.6, 84.2, 86.61, 86.2, 84.51, 86.53, 88.81],
                                   # [30.65, 30.65, 29.13, 30.65, 29.96, 30.65, 29.96, 30.23],
@@ -137,71 +541,49 @@ def main():
     #                              [0.693, 0.658, 0.683, 0.668, 0.692, 0.689, 0.659, 0.391],
     #                              [0.689, 0.662, 0.681, 0.659, 0.681, 0.684, 0.657, 0.401]]
 
-    for set_of_measurements in set_of_set_of_measurements:
-        if len(set_of_measurements) < 2:
-            print(set_of_measurements, ": set of measurements is smaller than 2")
-            break
-
-        sample_mean = np.mean(set_of_measurements)
-        if sample_mean <= 0:
-            print(set_of_measurements, ": mean is 0 or negative")
-            break
-
-        sample_size = len(set_of_measurements)
-        degrees_of_freedom = sample_size - 1
-        sum_of_squared_differences = np.sum(np.square(sample_mean - set_of_measurements))
-
-        # unbiassed sample variance s^2
-        unbiassed_sample_variance = sum_of_squared_differences / degrees_of_freedom
-        # corrected sample standard deviation s
-        corrected_sample_standard_deviation = np.sqrt(unbiassed_sample_variance)
-        # Gamma(N/2)
-        gamma_N_over_2 = math.gamma(sample_size / 2)
-        # Gamma((N-1)/2)
-        gamma_df_over_2 = math.gamma(degrees_of_freedom / 2)
-        # c_4(N)
-        c_4_N = math.sqrt(2 / degrees_of_freedom) * gamma_N_over_2 / gamma_df_over_2
-        # unbiassed sample std dev s/c_4
-        unbiassed_sample_std_dev_s_c_4 = corrected_sample_standard_deviation / c_4_N
-        # standard error of the unbiassed sample variance (assumes normally distributed population)
-        standard_error_of_unbiassed_sample_variance = unbiassed_sample_variance * np.sqrt(2 / degrees_of_freedom)
-        # estimated std err of std dev based on std err of unbiassed sample variance
-        est_SE_of_SD_based_on_SE_of_unbiassed_sample_variance = standard_error_of_unbiassed_sample_variance / (
-                2 * unbiassed_sample_std_dev_s_c_4)
-
-        # COEFFICIENT OF VARIATION CV
-        coefficient_of_variation = (unbiassed_sample_std_dev_s_c_4 / sample_mean) * 100
-        # SMALL SAMPLE CORRECTED COEFFICIENT OF VARIATION CV*
-        small_sample_coefficient_of_variation = (1 + (1 / (4 * sample_size))) * coefficient_of_variation
-
-        # compute percentage of measured values within 1 and 2 standard deviations from the mean
-        # initialise counts
-        count_within_1_sd = 0
-        count_within_2_sd = 0
-        # for each measured value
-        for m in set_of_measurements:
-            # if it's within two std devs, increment count_within_2_sd
-            if np.abs(m - sample_mean) < 2 * unbiassed_sample_std_dev_s_c_4:
-                count_within_2_sd += 1
-                # if it's also within one std devs, increment count_within_1_sd
-                if np.abs(m - sample_mean) < unbiassed_sample_std_dev_s_c_4:
-                    count_within_1_sd += 1
-
+    precision_results_df = get_precision_results_batch(set_of_set_of_measurements)
+    for _, precision_results in precision_results_df.iterrows():
         # report results as described in code description above
-        print("The unbiased coefficient of variation is", round(small_sample_coefficient_of_variation, 2))
-        print("for a mean of", sample_mean, ", ")
-        print("unbiased sample standard deviation of", round(unbiassed_sample_std_dev_s_c_4, 2),
-              ", with 95% CI [{:.2f}, {:.2f}]".format(
-                  *t.interval(0.95, degrees_of_freedom, loc=unbiassed_sample_std_dev_s_c_4,
-                              scale=est_SE_of_SD_based_on_SE_of_unbiassed_sample_variance))
-              , ",")
-        print("and a sample size of", sample_size, ".")
-        print(count_within_2_sd / sample_size * 100, "% of measured values fall within two standard deviations.")
-        print(round(count_within_1_sd / sample_size * 100, 3),
+        print("The unbiased coefficient of variation is", round(precision_results["CV*"], 2))
+        print("for a mean of", precision_results["mean"], ", ")
+        print("unbiased sample standard deviation of", round(precision_results["unbiased stdev"], 2),
+              ", with 95% CI", precision_results["stdev 95% CI"], ",")
+        print("and a sample size of", precision_results["sample size"], ".")
+        print(precision_results["% within two standard deviations"],
+              "% of measured values fall within two standard deviations.")
+        print(round(precision_results["% within one standard deviation"], 3),
               "% of measured values fall within one standard deviation.", )
         print("-------")
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Coefficient of variation (CV*) of sets of measurements')
+    parser.add_argument("--input", type=str, default="",
+                        help="measurement table with one measurement per row, runs the built-in example if empty")
+    parser.add_argument("--input_format", type=str, choices=MEASUREMENT_FILE_FORMATS, default=None)
+    parser.add_argument("--group_by", type=str, nargs="+", default=["paper", "system", "metric"])
+    parser.add_argument("--value_column", type=str, default="value")
+    parser.add_argument("--output", type=str, default="")
+    parser.add_argument("--output_format", type=str, choices=["csv", "latex"], default="csv")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--max_workers", type=int, default=None)
+
+    args = parser.parse_args()
+    if args.input == "":
+        report_example_measurements()
+        return
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S')
+    results_df = score_measurement_file(args.input, args.group_by, args.value_column,
+                                        file_format=args.input_format,
+                                        chunksize=args.chunksize,
+                                        max_workers=args.max_workers)
+    export_precision_results(results_df, args.output, args.output_format)
+
+
 if __name__ == "__main__":
     # results_dict = {
     #     "bert-base": [5.78882882435848, 9.9],
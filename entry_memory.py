@@ -0,0 +1,152 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import pandas as pd
+
+from anthology_entry import BIB_KEYS
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+GITHUB_RESPONSE = {"stargazers_count": 3, "forks_count": 1, "open_issues_count": 0,
+                   "updated_at": "2022-01-01T00:00:00Z", "created_at": "2021-01-01T00:00:00Z",
+                   "pushed_at": "2021-06-01T00:00:00Z"}
+
+
+class StandInResponse:
+    def __init__(self, status_code, content=b"", json_content=None):
+        self.status_code = status_code
+        self.content = content
+        self.json_content = json_content
+
+    def json(self):
+        return self.json_content
+
+
+def get_stand_in_response(url, timeout=None, headers=None):
+    # answers the crawler's requests without a network, a third of the paper pages link a GitHub repository
+    if url.endswith("/rate_limit"):
+        return StandInResponse(200, json_content={"rate": {"remaining": 10 ** 9, "reset": 0}})
+    if "api.github.com/repos/" in url:
+        return StandInResponse(200, json_content=GITHUB_RESPONSE)
+    paper_number = zlib.crc32(url.encode("utf-8"))
+    links = '<a href="{}.pdf">PDF</a>'.format(url)
+    if paper_number % 3 == 0:
+        links += '<a href="https://github.com/acl/repository-{}">Code</a>'.format(paper_number)
+    page = '<html><body><div class="acl-paper-link-block">{}</div></body></html>'.format(links)
+    return StandInResponse(200, page.encode("utf-8"))
+
+
+def get_resident_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+def get_peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_bib_json(bib_path, size, seed):
+    from anthology_io import dump_entries
+    from synthetic_anthology import iter_synthetic_entries
+
+    # the bib fields of synthetic entries, in the JSON cache load_acl_anthology_bib reads instead of the bib file
+    entries = ({key: value for key, value in entry.items() if key in BIB_KEYS}
+               for entry in iter_synthetic_entries(size, seed=seed))
+    dump_entries(bib_path + ".json", entries)
+
+
+def run_crawl(process_anthology_dir, bib_path, export_dir):
+    """Load, ACL, GitHub and export passes of process_anthology.py with stand-in responses, in this process."""
+    sys.path.insert(0, process_anthology_dir)
+    import process_anthology
+
+    process_anthology.requests.get = get_stand_in_response
+    logging.disable(logging.INFO)
+    start_time = time.perf_counter()
+    acl_entries = process_anthology.cache_load_acl_anthology_bib(bib_path, export_dir)
+    acl_entries = process_anthology.get_acl_information(acl_entries)
+    acl_entries = process_anthology.get_github_information(acl_entries, "")
+    process_anthology.export_acl(export_dir, acl_entries)
+    seconds = time.perf_counter() - start_time
+    peak_rss_mb = get_peak_rss_mb()
+
+    del acl_entries
+    gc.collect()
+    resident_mb = get_resident_mb()
+    acl_entries = process_anthology.cache_load_acl_anthology_bib(bib_path, export_dir)
+    gc.collect()
+    return {"entries": len(acl_entries),
+            "seconds": round(seconds, 1),
+            "peak_rss_mb": round(peak_rss_mb),
+            "loaded_export_mb": round(get_resident_mb() - resident_mb)}
+
+
+def measure_variant(name, process_anthology_dir, bib_path):
+    # every variant runs in a fresh process, the peak RSS of one does not carry over to the next
+    with tempfile.TemporaryDirectory() as export_dir:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run_crawl", process_anthology_dir,
+                                 "--bib_path", bib_path, "--export_dir", export_dir],
+                                check=True, stdout=subprocess.PIPE, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    logging.info("{}: {}".format(name, result))
+    return dict({"variant": name}, **result)
+
+
+def get_baseline_dir(baseline_ref, baseline_dir):
+    process_anthology_source = subprocess.run(["git", "show", "{}:process_anthology.py".format(baseline_ref)],
+                                              check=True, stdout=subprocess.PIPE, text=True,
+                                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    with open(os.path.join(baseline_dir, "process_anthology.py"), "w") as f:
+        f.write(process_anthology_source)
+    return baseline_dir
+
+
+def compare_memory(size, seed, baseline_ref):
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        bib_path = os.path.join(data_dir, "anthology.bib")
+        write_bib_json(bib_path, size, seed)
+        if baseline_ref != "":
+            baseline_dir = os.path.join(data_dir, "baseline")
+            os.makedirs(baseline_dir)
+            results.append(measure_variant(baseline_ref, get_baseline_dir(baseline_ref, baseline_dir), bib_path))
+        results.append(measure_variant("working tree", os.path.dirname(os.path.abspath(__file__)), bib_path))
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak memory of a crawl of a synthetic anthology')
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline_ref", type=str, default="",
+                        help="git revision whose process_anthology.py is measured as well, e.g. 7419b10~1")
+    parser.add_argument("--results_path", type=str, default="")
+    parser.add_argument("--run_crawl", type=str, default="", help=argparse.SUPPRESS)
+    parser.add_argument("--bib_path", type=str, default="", help=argparse.SUPPRESS)
+    parser.add_argument("--export_dir", type=str, default="", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.run_crawl != "":
+        print(json.dumps(run_crawl(args.run_crawl, args.bib_path, args.export_dir)))
+        return
+    results_df = compare_memory(args.size, args.seed, args.baseline_ref)
+    print(results_df.to_string(index=False))
+    if args.results_path != "":
+        results_df.to_csv(args.results_path, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import requests
+from tqdm import tqdm
+
+from anthology_io import load_entries, open_text_file
+from process_anthology import GITHUB_KEYS, GLOBAL_HEADERS, get_entry_github_url, \
+    get_github_api_rate_remaining_and_reset
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+HISTORY_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# a 304 is a successful check as well, the values did not change
+CHECKED_STATUSES = ("success", "not modified")
+
+
+def get_utc_now():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def format_history_date(date):
+    return date.strftime(HISTORY_DATE_FORMAT)
+
+
+def parse_history_date(date):
+    return datetime.strptime(date, HISTORY_DATE_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def iter_history_records(history_path):
+    if not os.path.isfile(history_path):
+        return
+    with open_text_file(history_path) as f:
+        for line in f:
+            if line.strip() != "":
+                yield json.loads(line)
+
+
+def get_repository_states(history_records):
+    # replaying the deltas gives the latest values, ETag and check time of every repository, a failed check is
+    # kept apart from the last successful one
+    repository_states = {}
+    for record in history_records:
+        state = repository_states.setdefault(record["url"], {"values": {}, "etag": None})
+        state["values"].update(record.get("values", {}))
+        if "etag" in record:
+            state["etag"] = record["etag"]
+        if record["status"] in CHECKED_STATUSES:
+            state["checked_at"] = record["checked_at"]
+            state.pop("failed_at", None)
+        else:
+            state["failed_at"] = record["checked_at"]
+        state["status"] = record["status"]
+    return repository_states
+
+
+def get_value_delta(old_values, new_values):
+    return {key: value for key, value in new_values.items() if key not in old_values or old_values[key] != value}
+
+
+def is_stale(state, now, stale_after_days):
+    pushed_at = state["values"].get("pushed_at")
+    if pushed_at is None:
+        return False
+    return now - parse_history_date(pushed_at) > timedelta(days=stale_after_days)
+
+
+def is_refresh_due(state, now, refresh_days, stale_refresh_days, stale_after_days, retry_hours=1):
+    if state is None:
+        return True
+    if "failed_at" in state:
+        # the last check failed, it is retried sooner than a successful one is refreshed
+        return now - parse_history_date(state["failed_at"]) >= timedelta(hours=retry_hours)
+    if "checked_at" not in state:
+        return True
+    # repositories nobody pushed to in a long time rarely change, they are refreshed less often
+    refresh_interval = stale_refresh_days if is_stale(state, now, stale_after_days) else refresh_days
+    return now - parse_history_date(state["checked_at"]) >= timedelta(days=refresh_interval)
+
+
+def request_repository(session, github_url_api, etag, github_auth_token):
+    headers = dict(GLOBAL_HEADERS)
+    if github_auth_token != "":
+        headers['Authorization'] = 'token ' + github_auth_token
+    if etag is not None:
+        # a 304 answer to a conditional request does not count against the rate limit
+        headers['If-None-Match'] = etag
+    return session.get(url=github_url_api, timeout=5, headers=headers)
+
+
+def refresh_repository(session, github_url_api, state, github_auth_token, now):
+    # the history record of one check, values only holds the keys that changed since the last snapshot
+    record = {"url": github_url_api, "checked_at": format_history_date(now)}
+    try:
+        response = request_repository(session, github_url_api, state["etag"] if state is not None else None,
+                                      github_auth_token)
+    except Exception as e:
+        record["status"] = "exception {}".format(type(e))
+        return record, None
+
+    if response.status_code == 304:
+        record["status"] = "not modified"
+    elif response.status_code != 200:
+        record["status"] = "error {}".format(response.status_code)
+    else:
+        repository_json = response.json()
+        new_values = {key: repository_json.get(key) for key in GITHUB_KEYS}
+        record["values"] = get_value_delta(state["values"] if state is not None else {}, new_values)
+        record["status"] = "success"
+        if response.headers.get("ETag") is not None:
+            record["etag"] = response.headers["ETag"]
+    return record, response
+
+
+def get_rate_limit_from_response(response, remaining_requests, seconds_to_reset):
+    if response is None or "X-RateLimit-Remaining" not in response.headers:
+        return remaining_requests, seconds_to_reset
+    remaining_requests = int(response.headers["X-RateLimit-Remaining"])
+    if "X-RateLimit-Reset" in response.headers:
+        seconds_to_reset = max(int(response.headers["X-RateLimit-Reset"]) - time.time(), 0)
+    return remaining_requests, seconds_to_reset
+
+
+def update_history(history_path, github_urls, github_auth_token, refresh_days=1, stale_refresh_days=30,
+                   stale_after_days=365, retry_hours=1, now=None):
+    now = now if now is not None else get_utc_now()
+    repository_states = get_repository_states(iter_history_records(history_path))
+    due_urls = [url for url in github_urls
+                if is_refresh_due(repository_states.get(url), now, refresh_days, stale_refresh_days, stale_after_days,
+                                  retry_hours=retry_hours)]
+    logging.info("{} of {} repositories are due for a refresh".format(len(due_urls), len(github_urls)))
+
+    status_counts = {}
+    remaining_requests, seconds_to_reset = get_github_api_rate_remaining_and_reset(github_auth_token)
+    # records are appended as they come in, an interrupted run keeps the checks it already made
+    with requests.Session() as session, open_text_file(history_path, "a") as history_file:
+        for github_url_api in tqdm(due_urls):
+            if remaining_requests == 0:
+                logging.info("Waiting {} seconds for github reset".format(seconds_to_reset))
+                time.sleep(seconds_to_reset + 5)
+                remaining_requests, seconds_to_reset = get_github_api_rate_remaining_and_reset(github_auth_token)
+
+            record, response = refresh_repository(session, github_url_api, repository_states.get(github_url_api),
+                                                  github_auth_token, now)
+            remaining_requests, seconds_to_reset = get_rate_limit_from_response(response, remaining_requests,
+                                                                                seconds_to_reset)
+            history_file.write(json.dumps(record) + "\n")
+            status_counts[record["status"]] = status_counts.get(record["status"], 0) + 1
+    logging.info("Refresh results {}".format(status_counts))
+    return status_counts
+
+
+def get_history_df(history_records):
+    # one row per check with the full snapshot, unchanged values are carried forward from earlier checks
+    rows = [dict(record.get("values", {}), url=record["url"], checked_at=record["checked_at"],
+                 status=record["status"]) for record in history_records]
+    history_df = pd.DataFrame(rows, columns=["url", "checked_at", "status"] + GITHUB_KEYS)
+    history_df["checked_at"] = pd.to_datetime(history_df["checked_at"], format="ISO8601")
+    history_df = history_df.sort_values(["url", "checked_at"], kind="stable").reset_index(drop=True)
+    history_df[GITHUB_KEYS] = history_df.groupby("url")[GITHUB_KEYS].ffill()
+    return history_df
+
+
+def get_entry_github_urls(acl_entries):
+    github_urls = set()
+    for entry in acl_entries:
+        github_url_api = get_entry_github_url({key: value for key, value in entry.items() if isinstance(value, str)})
+        if github_url_api is not None:
+            github_urls.add(github_url_api)
+    return sorted(github_urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Appending GitHub metric snapshots of the linked repositories')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--history_path", type=str, default="data/github_history.jsonl")
+    parser.add_argument("--github_auth_token", type=str, default="")
+    parser.add_argument("--refresh_days", type=float, default=1)
+    parser.add_argument("--stale_refresh_days", type=float, default=30,
+                        help="refresh interval of repositories with no push in the last --stale_after_days")
+    parser.add_argument("--stale_after_days", type=float, default=365)
+    parser.add_argument("--retry_hours", type=float, default=1,
+                        help="retry delay of repositories whose last check failed (an exception or an error status)")
+    parser.add_argument("--export_csv", type=str, default="",
+                        help="write the expanded per-check snapshots, e.g. for star and fork trajectories")
+
+    args = parser.parse_args()
+
+    github_urls = get_entry_github_urls(load_entries(args.anthology_json_path))
+
+    logging.info("Updating GitHub History")
+    update_history(args.history_path, github_urls, args.github_auth_token,
+                   refresh_days=args.refresh_days,
+                   stale_refresh_days=args.stale_refresh_days,
+                   stale_after_days=args.stale_after_days,
+                   retry_hours=args.retry_hours)
+
+    if args.export_csv != "":
+        logging.info("Exporting History")
+        get_history_df(iter_history_records(args.history_path)).to_csv(args.export_csv, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import collections
+import concurrent
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import urllib.parse
+from concurrent import futures
+
+import requests
+from tqdm import tqdm
+
+from anthology_io import dump_entries_csv, load_entries
+from process_anthology import GLOBAL_HEADERS
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+# keys collected by parse_acl_anthology_webpage, repeated links get a _1, _2, ... suffix
+LINK_KEYS = ["PDF", "Software", "Data", "Code"]
+LINK_KEY_PATTERN = re.compile(r"^({})(_\d+)?$".format("|".join(LINK_KEYS)))
+# servers that do not implement HEAD properly, retried with a one byte GET
+HEAD_FALLBACK_STATUS_CODES = {403, 405, 501}
+LINK_HEALTH_COLUMNS = ["ID", "key", "url", "host", "status", "status_code", "final_url", "elapsed"]
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+
+    def take(self, now):
+        # takes a token if one is available, otherwise returns the time at which the next one is
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+
+class HostScheduler:
+    """Hands out URLs so that every host is drained at most at its token bucket rate.
+
+    Hosts are kept in a heap ordered by the time their next request is allowed, so workers always pick
+    a host that is ready instead of waiting behind a busy one. A host with max_in_flight_per_host
+    unanswered requests leaves the heap until one of them is done. host_limits maps a host to its own
+    (rate, max in flight), e.g. for a host that serves most of the links and can take more.
+    """
+
+    def __init__(self, urls, rate_per_host=1.0, burst_per_host=2, max_in_flight_per_host=2, host_limits=None):
+        self.host_queues = collections.defaultdict(collections.deque)
+        for url in urls:
+            self.host_queues[get_url_host(url)].append(url)
+        host_limits = host_limits if host_limits is not None else {}
+        self.max_in_flight = {host: host_limits.get(host, (rate_per_host, max_in_flight_per_host))[1]
+                              for host in self.host_queues}
+        self.buckets = {host: TokenBucket(host_limits[host][0], max(burst_per_host, host_limits[host][1]))
+                        if host in host_limits else TokenBucket(rate_per_host, burst_per_host)
+                        for host in self.host_queues}
+        self.in_flight = collections.Counter()
+        self.scheduled_hosts = set(self.host_queues)
+        now = time.monotonic()
+        self.ready_heap = [(now, host) for host in self.host_queues]
+        heapq.heapify(self.ready_heap)
+        self.condition = threading.Condition()
+
+    def _schedule(self, host, ready_time):
+        self.scheduled_hosts.add(host)
+        heapq.heappush(self.ready_heap, (ready_time, host))
+        self.condition.notify()
+
+    def next_url(self):
+        with self.condition:
+            while True:
+                if len(self.ready_heap) == 0:
+                    if sum(self.in_flight.values()) == 0:
+                        return None
+                    # a host with queued urls may come back once its requests are done
+                    self.condition.wait()
+                    continue
+                ready_time, host = self.ready_heap[0]
+                now = time.monotonic()
+                if ready_time > now:
+                    self.condition.wait(ready_time - now)
+                    continue
+                heapq.heappop(self.ready_heap)
+                self.scheduled_hosts.discard(host)
+                send_time = self.buckets[host].take(now)
+                if send_time > now:
+                    self._schedule(host, send_time)
+                    continue
+                url = self.host_queues[host].popleft()
+                self.in_flight[host] += 1
+                if len(self.host_queues[host]) > 0 and self.in_flight[host] < self.max_in_flight[host]:
+                    self._schedule(host, now)
+                return url
+
+    def done(self, url):
+        host = get_url_host(url)
+        with self.condition:
+            self.in_flight[host] -= 1
+            if len(self.host_queues[host]) > 0 and host not in self.scheduled_hosts:
+                self._schedule(host, time.monotonic())
+            self.condition.notify_all()
+
+
+def get_url_host(url):
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+def check_url(url, timeout=10, session=None):
+    session = session if session is not None else requests
+    result = {"url": url, "host": get_url_host(url)}
+    start_time = time.monotonic()
+    try:
+        response = session.head(url, timeout=timeout, headers=GLOBAL_HEADERS, allow_redirects=True)
+        if response.status_code in HEAD_FALLBACK_STATUS_CODES:
+            headers = dict(GLOBAL_HEADERS)
+            headers["Range"] = "bytes=0-0"
+            response = session.get(url, timeout=timeout, headers=headers, allow_redirects=True, stream=True)
+            response.close()
+        result["status_code"] = response.status_code
+        result["final_url"] = response.url
+        # 206 is the answer to the ranged GET
+        result["status"] = "success" if response.status_code < 400 else "error {}".format(response.status_code)
+    except Exception as e:
+        result["status_code"] = None
+        result["final_url"] = None
+        result["status"] = "exception {}".format(type(e))
+    result["elapsed"] = time.monotonic() - start_time
+    return result
+
+
+def get_entry_links(acl_entries):
+    links = []
+    for entry in acl_entries:
+        for key, value in entry.items():
+            if not isinstance(value, str) or not LINK_KEY_PATTERN.match(key):
+                continue
+            # multiple urls of one field are joined with spaces
+            for url in value.split(" "):
+                if url.startswith("http://") or url.startswith("https://"):
+                    links.append({"ID": entry["ID"], "key": key, "url": url})
+    return links
+
+
+def parse_host_limit(host_limit):
+    # host=rate or host=rate,max_in_flight
+    host, _, limit = host_limit.partition("=")
+    rate, _, max_in_flight = limit.partition(",")
+    try:
+        return host.lower(), (float(rate), int(max_in_flight) if max_in_flight != "" else 2)
+    except ValueError:
+        raise ValueError("host limits are host=rate or host=rate,max_in_flight, not {!r}".format(host_limit))
+
+
+def get_sweep_seconds(scheduler):
+    # the slowest host bounds the sweep, its urls go out at most at its rate
+    return max((len(urls) / scheduler.buckets[host].rate for host, urls in scheduler.host_queues.items()), default=0)
+
+
+def check_links(urls, max_workers=64, rate_per_host=1.0, burst_per_host=2, max_in_flight_per_host=2, timeout=10,
+                host_limits=None):
+    unique_urls = list(dict.fromkeys(urls))
+    scheduler = HostScheduler(unique_urls, rate_per_host=rate_per_host, burst_per_host=burst_per_host,
+                              max_in_flight_per_host=max_in_flight_per_host, host_limits=host_limits)
+    largest_host = max(scheduler.host_queues, key=lambda host: len(scheduler.host_queues[host]), default=None)
+    logging.info("Checking {} urls on {} hosts, {} has the most ({}), the rate limits allow the sweep to finish in "
+                 "{:.0f} minutes at the earliest".format(len(unique_urls), len(scheduler.host_queues), largest_host,
+                                                          len(scheduler.host_queues.get(largest_host, [])),
+                                                          get_sweep_seconds(scheduler) / 60))
+
+    url_results = {}
+    lock = threading.Lock()
+
+    def worker(progress_bar):
+        session = requests.Session()
+        while True:
+            url = scheduler.next_url()
+            if url is None:
+                return
+            result = check_url(url, timeout=timeout, session=session)
+            scheduler.done(url)
+            with lock:
+                url_results[url] = result
+                progress_bar.update(1)
+
+    with tqdm(total=len(unique_urls)) as progress_bar:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_list = [executor.submit(worker, progress_bar) for _ in range(max_workers)]
+            for future in concurrent.futures.as_completed(future_list):
+                future.result()
+    return url_results
+
+
+def get_link_health(acl_entries, max_workers=64, rate_per_host=1.0, burst_per_host=2, max_in_flight_per_host=2,
+                    timeout=10, host_limits=None):
+    links = get_entry_links(acl_entries)
+    url_results = check_links([link["url"] for link in links], max_workers=max_workers,
+                              rate_per_host=rate_per_host, burst_per_host=burst_per_host,
+                              max_in_flight_per_host=max_in_flight_per_host, timeout=timeout,
+                              host_limits=host_limits)
+    for link in links:
+        link.update(url_results[link["url"]])
+    return links
+
+
+def export_link_health(export_dir, links):
+    # written to a temporary file and renamed like the anthology exports
+    dump_entries_csv(os.path.join(export_dir, "link_health.csv"), links, LINK_HEALTH_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Link rot check of the PDF, Software, Data and Code links')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--export_dir", type=str)
+    parser.add_argument("--max_workers", type=int, default=64)
+    parser.add_argument("--rate_per_host", type=float, default=1.0,
+                        help="sustained requests per second per host. Almost all PDF links are on aclanthology.org, "
+                             "at 1 per second a full sweep takes about a day, see --host_limit")
+    parser.add_argument("--burst_per_host", type=int, default=2)
+    parser.add_argument("--max_in_flight_per_host", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--host_limit", type=str, nargs="*", default=[],
+                        help="host=rate or host=rate,max_in_flight overriding the per host limits, e.g. "
+                             "aclanthology.org=25,16")
+
+    args = parser.parse_args()
+    host_limits = dict(parse_host_limit(host_limit) for host_limit in args.host_limit)
+
+    acl_entries = load_entries(args.anthology_json_path)
+
+    logging.info("Checking Links")
+    links = get_link_health(acl_entries, max_workers=args.max_workers, rate_per_host=args.rate_per_host,
+                            burst_per_host=args.burst_per_host,
+                            max_in_flight_per_host=args.max_in_flight_per_host, timeout=args.timeout,
+                            host_limits=host_limits)
+
+    logging.info("Exporting Results")
+    export_link_health(args.export_dir, links)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import logging
+import os
+import re
+
+from anthology_io import COMPRESSIONS, EXPORT_FORMATS, find_export_file, load_entries
+from process_anthology import GITHUB_KEYS, add_entry_value, export_acl, get_entry_github_url, \
+    load_acl_anthology_bib
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+GITHUB_KEY_PATTERN = re.compile(r"^({})(_\d+)?$".format("|".join(GITHUB_KEYS)))
+
+
+def get_status_rank(entry, status_key):
+    # lower is better: a successful request, then a definitive "missing", then errors and exceptions
+    status = entry.get(status_key)
+    if status == "success":
+        return 0
+    if status == "missing":
+        return 1
+    if status is not None and status.startswith("error"):
+        return 2
+    if status is not None:
+        return 3
+    return 4
+
+
+def get_github_url(entry):
+    return get_entry_github_url({key: value for key, value in entry.items() if isinstance(value, str)})
+
+
+def merge_entry_records(records):
+    # records of one ID from different shards, the record with the best ACL and then GitHub status wins
+    records = sorted(records, key=lambda r: (get_status_rank(r, "acl_status"), get_status_rank(r, "github_status")))
+    merged = records[0]
+    if merged.get("github_status") == "success":
+        return merged
+
+    # another shard may have reached GitHub for the same repository, graft its fields onto the winner
+    # the same way get_entry_github_information would have added them
+    github_url = get_github_url(merged)
+    donor = next((r for r in records[1:] if r.get("github_status") == "success" and
+                  get_github_url(r) == github_url and github_url is not None), None)
+    if donor is None:
+        return merged
+    merged = {key: value for key, value in merged.items() if key != "github_status"}
+    for key in GITHUB_KEYS:
+        # a key the donor has beyond the winner's keys was added by the GitHub phase, if there is none the
+        # GitHub value was equal to the existing one and was skipped
+        added_keys = [donor_key for donor_key in donor
+                      if donor_key not in merged and GITHUB_KEY_PATTERN.match(donor_key) and
+                      GITHUB_KEY_PATTERN.match(donor_key).group(1) == key]
+        add_entry_value(merged, key, donor[added_keys[0]] if len(added_keys) > 0 else donor[key])
+    merged["github_status"] = "success"
+    return merged
+
+
+def load_shard_records(shard_dirs):
+    shard_records = {}
+    for shard_dir in shard_dirs:
+        shard_entries = load_entries(find_export_file(shard_dir))
+        logging.info("Loaded {} entries from {}".format(len(shard_entries), shard_dir))
+        for entry in shard_entries:
+            shard_records.setdefault(entry["ID"], []).append(entry)
+    return shard_records
+
+
+def merge_shards(bib_entries, shard_records):
+    # the bib file defines the canonical order, entries no shard processed are kept as they are
+    merged_entries = []
+    missing_count = 0
+    for bib_entry in bib_entries:
+        records = shard_records.get(bib_entry["ID"])
+        if records is None:
+            missing_count += 1
+            merged_entries.append(bib_entry)
+            continue
+        merged_entries.append(merge_entry_records(records))
+    if missing_count > 0:
+        logging.warning("{} entries were not in any shard".format(missing_count))
+    return merged_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merging the exports of process_anthology.py --shard runs')
+    parser.add_argument("--anthology_path", type=str)
+    parser.add_argument("--shard_dirs", type=str, nargs="+")
+    parser.add_argument("--export_dir", type=str)
+    parser.add_argument("--export_format", type=str, choices=EXPORT_FORMATS, default="json")
+    parser.add_argument("--compression", type=str, choices=COMPRESSIONS, default="none")
+    parser.add_argument("--parse_workers", type=int, default=None,
+                        help="processes parsing chunks of the bib file, one per core by default")
+
+    args = parser.parse_args()
+
+    logging.info("Loading Bib")
+    bib_entries = load_acl_anthology_bib(args.anthology_path, parse_workers=args.parse_workers)
+
+    logging.info("Merging Shards")
+    acl_entries = merge_shards(bib_entries, load_shard_records(args.shard_dirs))
+
+    logging.info("Exporting Results")
+    export_acl(args.export_dir, acl_entries, export_format=args.export_format, compression=args.compression)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import bisect
+import concurrent
+import logging
+import os
+import re
+import time
+from concurrent import futures
+
+import bibtexparser
+import pandas as pd
+
+from anthology_io import open_text_file
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+ENTRY_START_PATTERN = re.compile(r"^@[ \t]*([a-zA-Z]+)[ \t]*[{(]", re.MULTILINE)
+CHUNKS_PER_WORKER = 4
+
+
+def get_default_workers():
+    return os.cpu_count() or 1
+
+
+def parse_bib_text(bib_text):
+    # same parser settings as the single process load in process_anthology.py
+    return bibtexparser.bparser.BibTexParser(common_strings=True).parse(bib_text).entries
+
+
+def get_entry_starts(bib_text):
+    # an @ at the start of a line only starts an entry outside of braces, e.g. not in a multi line abstract
+    entry_starts = []
+    depth, last_position = 0, 0
+    for match in ENTRY_START_PATTERN.finditer(bib_text):
+        depth += bib_text.count("{", last_position, match.start()) - bib_text.count("}", last_position, match.start())
+        last_position = match.start()
+        if depth == 0:
+            entry_starts.append((match.start(), match.group(1).lower()))
+    return entry_starts
+
+
+def split_bib_text(bib_text, number_of_chunks):
+    """Splits a bib file into chunks of whole entries of about the same length.
+
+    Every chunk starts with the @string definitions that precede it in the file, the macros of its entries are
+    expanded the same way as in a single pass over the file.
+    """
+    entry_starts = get_entry_starts(bib_text)
+    positions = [position for position, _ in entry_starts]
+    boundaries = [0]
+    for i in range(1, number_of_chunks):
+        entry_index = bisect.bisect_left(positions, len(bib_text) * i // number_of_chunks)
+        if entry_index < len(positions) and positions[entry_index] > boundaries[-1]:
+            boundaries.append(positions[entry_index])
+    boundaries.append(len(bib_text))
+
+    string_blocks = [(position, bib_text[position:positions[i + 1] if i + 1 < len(positions) else len(bib_text)])
+                     for i, (position, entry_type) in enumerate(entry_starts) if entry_type == "string"]
+    chunks = []
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        string_prefix = "".join(string_block for position, string_block in string_blocks if position < start)
+        chunks.append(string_prefix + bib_text[start:end])
+    return chunks
+
+
+def parse_bib_text_parallel(bib_text, workers=None):
+    workers = workers if workers is not None else get_default_workers()
+    if workers <= 1:
+        return parse_bib_text(bib_text)
+    # a few chunks per worker even out the entries that take longer to parse
+    chunks = split_bib_text(bib_text, workers * CHUNKS_PER_WORKER)
+    acl_entries = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # map keeps the order of the chunks
+        for chunk_entries in executor.map(parse_bib_text, chunks):
+            acl_entries.extend(chunk_entries)
+    return acl_entries
+
+
+def load_bib_entries(bib_path, workers=None):
+    with open_text_file(bib_path) as acl_bib:
+        bib_text = acl_bib.read()
+    return parse_bib_text_parallel(bib_text, workers=workers)
+
+
+def benchmark_workers(bib_path, workers_list, repeats=1):
+    with open_text_file(bib_path) as acl_bib:
+        bib_text = acl_bib.read()
+
+    start_time = time.perf_counter()
+    reference_entries = parse_bib_text(bib_text)
+    sequential_seconds = time.perf_counter() - start_time
+    logging.info("bibtexparser parsed {} entries in {:.2f} s".format(len(reference_entries), sequential_seconds))
+
+    results = []
+    for workers in workers_list:
+        seconds = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            acl_entries = parse_bib_text_parallel(bib_text, workers=workers)
+            seconds.append(time.perf_counter() - start_time)
+        results.append({"workers": workers,
+                        "seconds": round(min(seconds), 3),
+                        "speedup": round(sequential_seconds / min(seconds), 2),
+                        "entries": len(acl_entries),
+                        "identical": acl_entries == reference_entries})
+        logging.info("{} workers: {:.2f} s".format(workers, min(seconds)))
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parsing a bib file in parallel chunks')
+    parser.add_argument("--anthology_path", type=str)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="worker counts to benchmark against a single bibtexparser pass")
+    parser.add_argument("--repeats", type=int, default=1, help="the fastest of the repeated runs is reported")
+    parser.add_argument("--results_path", type=str, default="")
+
+    args = parser.parse_args()
+    results_df = benchmark_workers(args.anthology_path, args.workers, repeats=args.repeats)
+    print(results_df.to_string(index=False))
+    if args.results_path != "":
+        results_df.to_csv(args.results_path, index=False)
+    if not results_df["identical"].all():
+        raise SystemExit("the parallel parse differs from bibtexparser")
+
+
+if __name__ == '__main__':
+    main()
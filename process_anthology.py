@@ -1,21 +1,30 @@
 import argparse
+import collections
 import concurrent
-import csv
-import json
+import hashlib
 import logging
 import os
+import re
 import time
 from builtins import enumerate
 from concurrent import futures
 from datetime import datetime
 from time import mktime
-import bibtexparser
 import bs4
 import requests
 import requests.utils
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from anthology_entry import AnthologyEntry
+from anthology_io import COMPRESSIONS, EXPORT_FORMATS, dump_entries, dump_entries_csv, find_export_file, \
+    get_export_file_name, load_entries, remove_other_exports, strip_compression_extension
+from author_index import build_author_index
+from cohort_filters import EntryTable, parse_filter
+from parallel_bib import load_bib_entries
+from search_index import build_search_index
+from venues import get_entry_venue
+
 GLOBAL_HEADERS = requests.utils.default_headers()
 GLOBAL_HEADERS.update({'User-Agent': 'Mozilla/5.0'})
 GITHUB_RATE_LIMIT_REACHED = False
@@ -26,27 +35,163 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S')
 
 
-def cache_load_acl_anthology_bib(bib_path, export_dir):
-    json_export_file_name = os.path.join(export_dir, "anthology.json")
-    if os.path.isfile(json_export_file_name):
+GITHUB_KEYS = ["stargazers_count", "forks_count", "open_issues_count", "updated_at", "created_at", "pushed_at"]
+ANTHOLOGY_VOLUME_URL = "https://aclanthology.org/volumes/{}/"
+VOLUME_REQUEST_TIMEOUT = 10
+# overloaded volume and paper pages are requested again after 5, 10, 20 and 40 seconds
+OVERLOAD_RETRIES = 4
+OVERLOAD_RETRY_DELAY = 5
+# badges of a paper on its volume page, keyed as on the paper page, the others (bib, abs) are not links to keep
+VOLUME_BADGE_KEYS = {"pdf": "PDF", "code": "Code", "software": "Software", "data": "Data", "dataset": "Data",
+                     "video": "Video"}
+# statuses of get_reproducibility_information that mean the server is overloaded rather than the page missing
+OVERLOAD_STATUS_PATTERN = re.compile(r"^error (429|5\d\d)$|^exception .*(Timeout|ConnectionError)")
+
+
+class ConcurrencyController:
+    """Additive increase, multiplicative decrease of the number of requests in flight.
+
+    Healthy responses raise the limit by 1 / limit, about one more request per round trip of the whole window,
+    as long as their latency stays within latency_tolerance times the fastest recent one. A timeout, 429 or 5xx
+    response cuts the limit by decrease_factor, once per round trip: failures of requests that were already in
+    flight at the last cut are caused by the same overload.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64, decrease_factor=0.5, latency_tolerance=3.0):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.base_latency = None
+        self.start_time = time.monotonic()
+        self.last_decrease = self.start_time
+        self.decrease_count = 0
+        self.history = [(0.0, self.get_limit())]
+
+    def get_limit(self):
+        return int(self.limit)
+
+    def _record(self, now):
+        if self.get_limit() != self.history[-1][1]:
+            self.history.append((round(now - self.start_time, 3), self.get_limit()))
+
+    def on_response(self, send_time, latency, is_overloaded):
+        now = time.monotonic()
+        if is_overloaded:
+            if send_time >= self.last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self.last_decrease = now
+                self.decrease_count += 1
+                self._record(now)
+            return
+        # the fastest latency slowly drifts up, a server that got slower for good is the new baseline
+        self.base_latency = latency if self.base_latency is None else min(latency, self.base_latency * 1.01)
+        if latency <= self.latency_tolerance * self.base_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._record(now)
+
+    def get_postfix(self):
+        return {"limit": self.get_limit(),
+                "max": max(limit for _, limit in self.history),
+                "cuts": self.decrease_count}
+
+
+def get_bib_json_cache_files(bib_path):
+    # anthology.bib and anthology.bib.gz share the anthology.bib.json(.gz) cache, the first one is written
+    bib_path = strip_compression_extension(bib_path)
+    return [bib_path + ".json.gz", bib_path + ".json"]
+
+
+def load_acl_anthology_bib(bib_path, parse_workers=None):
+    json_cache_file = next(filter(os.path.isfile, get_bib_json_cache_files(bib_path)), None)
+    if json_cache_file is not None:
+        acl_entries = load_entries(json_cache_file, object_hook=AnthologyEntry.from_dict)
+    else:
+        # .bib.gz is decompressed while reading, no uncompressed copy is needed, chunks of the file are parsed by
+        # parse_workers processes
+        acl_entries = load_bib_entries(bib_path, workers=parse_workers)
+        dump_entries(get_bib_json_cache_files(bib_path)[0], acl_entries)
+        # replace the parsed dicts one by one so both representations are never fully alive together
+        for i in range(len(acl_entries)):
+            acl_entries[i] = AnthologyEntry.from_dict(acl_entries[i])
+    return acl_entries
+
+
+def cache_load_acl_anthology_bib(bib_path, export_dir, parse_workers=None, export_format=None, compression=None):
+    json_export_file_name = find_export_file(export_dir, export_format=export_format, compression=compression)
+    if json_export_file_name is not None:
         logging.info("Loading previously exported file, remove the files and rerun if you rather start fresh")
-        with open(json_export_file_name, "r") as acl_json:
-            acl_entries = json.load(acl_json)
+        acl_entries = load_entries(json_export_file_name, object_hook=AnthologyEntry.from_dict)
     else:
-        json_cache_file = bib_path + ".json"
-        if os.path.isfile(json_cache_file):
-            with open(json_cache_file, "r") as acl_json:
-                acl_entries = json.load(acl_json)
-        else:
-            with open(bib_path) as acl_bib:
-                bib_database = bibtexparser.bparser.BibTexParser(common_strings=True) \
-                    .parse_file(acl_bib)
-                acl_entries = bib_database.entries
-                with open(json_cache_file, "w") as f:
-                    json.dump(acl_entries, f)
+        acl_entries = load_acl_anthology_bib(bib_path, parse_workers=parse_workers)
     return acl_entries
 
 
+def add_entry_value(entry, key, value):
+    # an existing key keeps its value, a different value goes to the first free key_1, key_2, ...
+    if key in entry:
+        if entry[key] == value:
+            return entry
+        i = 1
+        while key + "_{}".format(i) in entry:
+            i = i + 1
+        key = key + "_{}".format(i)
+    entry[key] = value
+    return entry
+
+
+def parse_shard(shard):
+    # "i/N" -> (i, N), shards are numbered from 0
+    shard_index, number_of_shards = [int(part) for part in shard.split("/")]
+    if not 0 <= shard_index < number_of_shards:
+        raise ValueError("shard {} is not in 0/N .. N-1/N".format(shard))
+    return shard_index, number_of_shards
+
+
+def get_entry_shard(entry, number_of_shards):
+    # a stable hash, python's hash() of a str changes between processes
+    return int(hashlib.sha1(entry["ID"].encode("utf-8")).hexdigest(), 16) % number_of_shards
+
+
+def get_shard_export_dir(export_dir, shard_index, number_of_shards):
+    return os.path.join(export_dir, "shard_{}_of_{}".format(shard_index, number_of_shards))
+
+
+def get_include_mask(acl_entries, include_filters):
+    # all filters have to match, on the bib entries the venue is derived from the booktitle
+    include_filter = " & ".join("({})".format(include_filter) for include_filter in include_filters)
+    return EntryTable(acl_entries).evaluate(include_filter)
+
+
+def merge_selected_entries(all_entries, selected_indices, selected_entries):
+    # the export keeps the entries that were not selected unchanged, a later run with other filters resumes from it
+    for i, entry in zip(selected_indices, selected_entries):
+        all_entries[i] = entry
+    return all_entries
+
+
+def log_selected_work(acl_entries, number_of_entries, top_venues=0, by_volume=False):
+    acl_requests = sum(1 for entry in acl_entries
+                       if entry.get("acl_status") != "success" and "aclanthology.org" in entry.get("url", ""))
+    # the repositories of entries without a crawled anthology page are only known after it was crawled
+    github_requests = sum(1 for entry in acl_entries
+                          if entry.get("acl_status") == "success" and entry.get("github_status") != "success" and
+                          get_entry_github_url(entry) is not None)
+    logging.info("{} of {} entries selected, {} anthology pages and at least {} GitHub repositories to request".format(
+        len(acl_entries), number_of_entries, acl_requests, github_requests))
+    if by_volume:
+        volume_entries = get_volume_entries(acl_entries)
+        logging.info("The anthology pages are on {} volume pages, {} entries have no volume".format(
+            len(volume_entries) - (None in volume_entries), len(volume_entries.get(None, []))))
+    if top_venues == 0:
+        return
+    venue_type_counts = collections.Counter((get_entry_venue(entry), entry.get("ENTRYTYPE", ""))
+                                            for entry in acl_entries)
+    for (venue, entry_type), count in venue_type_counts.most_common(top_venues):
+        logging.info("{:>8} {} {}".format(count, entry_type, venue))
+
+
 # def try_get_webpage(url, headers, try_count=0):
 #     response = None
 #     request_failed = False
@@ -97,7 +242,8 @@ def get_reproducibility_information(entry: dict):
                     additional_information.append((key, url))
         return additional_information
 
-    result = entry.copy()
+    # entries are updated in place
+    result = entry
 
     if "acl_status" in result and result["acl_status"] == "success":
         return result
@@ -116,14 +262,7 @@ def get_reproducibility_information(entry: dict):
         # logging.info("{} success".format(acl_url))
         acl_info_tuple_list = parse_acl_anthology_webpage(acl_page_response)
         for key, value in acl_info_tuple_list:
-            if key in result:
-                if result[key] == value:
-                    continue
-                i = 1
-                while key + "_{}".format(i) in result:
-                    i = i + 1
-                key = key + "_{}".format(i)
-            result[key] = value
+            add_entry_value(result, key, value)
         result["acl_status"] = "success"
 
     except Exception as e:
@@ -185,17 +324,12 @@ def get_github_api_rate_remaining_and_reset(github_auth_token):
 def get_entry_github_information(entry: dict, github_url_api, github_auth_token):
     def parse_github_webpage(response: requests.Response):
         response = response.json()
-        github_tuple_list = []
-        github_tuple_list.append(("stargazers_count", response["stargazers_count"]))
-        github_tuple_list.append(("forks_count", response["forks_count"]))
-        github_tuple_list.append(("open_issues_count", response["open_issues_count"]))
-        github_tuple_list.append(("updated_at", response["updated_at"]))
-        github_tuple_list.append(("created_at", response["created_at"]))
-        github_tuple_list.append(("pushed_at", response["pushed_at"]))
+        github_tuple_list = [(key, response[key]) for key in GITHUB_KEYS]
 
         return github_tuple_list
 
-    result = entry.copy()
+    # entries are updated in place
+    result = entry
     try:
         global GLOBAL_HEADERS
         headers = dict(GLOBAL_HEADERS)
@@ -207,14 +341,7 @@ def get_entry_github_information(entry: dict, github_url_api, github_auth_token)
         else:
             github_tuple_list = parse_github_webpage(github_page_response)
             for key, value in github_tuple_list:
-                if key in result:
-                    if result[key] == value:
-                        continue
-                    i = 1
-                    while key + "_{}".format(i) in result:
-                        i = i + 1
-                    key = key + "_{}".format(i)
-                result[key] = value
+                add_entry_value(result, key, value)
             result["github_status"] = "success"
 
     except Exception as e:
@@ -223,38 +350,233 @@ def get_entry_github_information(entry: dict, github_url_api, github_auth_token)
     return result
 
 
-def export_acl(export_dir, acl_entries):
-    export_file_name = os.path.join(export_dir, "anthology")
-    json_file_name = export_file_name + ".json"
-    with open(json_file_name, "w") as f:
-        json.dump(acl_entries, f)
+def export_acl(export_dir, acl_entries, export_format="json", compression="none"):
+    # files are written to a temporary file first and renamed, an interrupted export never leaves a partial file
+    json_file_name = get_export_file_name(export_dir, "anthology", export_format, compression)
+    dump_entries(json_file_name, acl_entries, export_format=export_format)
+
+    keys = sorted(set(key for entry in acl_entries for key in entry))
+
+    csv_file_name = get_export_file_name(export_dir, "anthology", "csv", compression)
+    dump_entries_csv(csv_file_name, acl_entries, keys)
+    remove_other_exports(export_dir, [json_file_name, csv_file_name])
+
 
-    keys = sorted(list(set([kk for k in acl_entries for kk in list(k.keys())])))
+def get_timed_result(func, entry):
+    send_time = time.monotonic()
+    result = func(entry)
+    return result, send_time, time.monotonic() - send_time
 
-    csv_file_name = export_file_name + ".csv"
-    with open(csv_file_name, 'w') as output_file:
-        dict_writer = csv.DictWriter(output_file, keys,
-                                     quoting=csv.QUOTE_ALL,
-                                     doublequote=True)
-        dict_writer.writeheader()
-        dict_writer.writerows(acl_entries)
 
+def run_func_in_parallel(func, inputs, max_workers=None, controller=None, is_overloaded=None):
+    """Runs func on every input in a thread pool and replaces the inputs with the results.
 
-def run_func_in_parallel(func, inputs):
+    With a ConcurrencyController the number of calls in flight follows its limit, is_overloaded(result) tells
+    it which results were overload failures. Without one, a few calls per worker are in flight.
+    """
     number_of_entries = len(inputs)
+    if controller is not None:
+        max_workers = controller.max_limit
+    # same default as ThreadPoolExecutor, only a few futures per worker are kept alive at a time
+    max_workers = max_workers if max_workers is not None else min(32, (os.cpu_count() or 1) + 4)
+
+    def get_max_in_flight():
+        return controller.get_limit() if controller is not None else 4 * max_workers
+
+    def collect(done_futures):
+        for future in done_futures:
+            result, send_time, latency = future.result()
+            inputs[future_list.pop(future)] = result
+            if controller is not None:
+                controller.on_response(send_time, latency, is_overloaded(result))
+        progress_bar.update(len(done_futures))
+        if controller is not None:
+            progress_bar.set_postfix(controller.get_postfix(), refresh=False)
+
     with tqdm(total=number_of_entries) as progress_bar:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_list = {executor.submit(func, entry):
-                               index for index, entry in enumerate(inputs)}
-            for future in concurrent.futures.as_completed(future_list):
-                arg = future_list[future]
-                inputs[arg] = future.result()
-                progress_bar.update(1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_list = {}
+            for index, entry in enumerate(inputs):
+                while len(future_list) >= get_max_in_flight():
+                    done_futures, _ = concurrent.futures.wait(future_list,
+                                                              return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done_futures)
+                future_list[executor.submit(get_timed_result, func, entry)] = index
+            while len(future_list) > 0:
+                done_futures, _ = concurrent.futures.wait(future_list, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done_futures)
+    if controller is not None:
+        logging.info("Concurrency limit history (seconds, limit): {}".format(controller.history))
     return inputs
 
 
-def get_acl_information(acl_entries):
-    return run_func_in_parallel(get_reproducibility_information, acl_entries)
+def is_acl_request_needed(entry):
+    return entry.get("acl_status") != "success" and "aclanthology.org" in entry["url"]
+
+
+def is_acl_overloaded(entry):
+    return OVERLOAD_STATUS_PATTERN.match(entry["acl_status"]) is not None
+
+
+def get_acl_information(acl_entries, controller=None, max_workers=None, retries=OVERLOAD_RETRIES,
+                        retry_delay=OVERLOAD_RETRY_DELAY):
+    # only the entries with a request count towards the controller, the others are done without waiting
+    request_indices = []
+    for i, entry in enumerate(acl_entries):
+        if is_acl_request_needed(entry):
+            request_indices.append(i)
+        else:
+            acl_entries[i] = get_reproducibility_information(entry)
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            # the controller probes into overload on purpose, the papers it overloaded are requested again
+            logging.info("Retrying {} overloaded paper pages in {} seconds".format(len(request_indices), retry_delay))
+            time.sleep(retry_delay)
+            retry_delay = 2 * retry_delay
+        request_entries = run_func_in_parallel(get_reproducibility_information,
+                                               [acl_entries[i] for i in request_indices],
+                                               max_workers=max_workers,
+                                               controller=controller,
+                                               is_overloaded=is_acl_overloaded)
+        for i, entry in zip(request_indices, request_entries):
+            acl_entries[i] = entry
+        # the entries still overloaded after the last retry keep their status and are requested on the next run
+        request_indices = [i for i, entry in zip(request_indices, request_entries) if is_acl_overloaded(entry)]
+        if len(request_indices) == 0:
+            break
+    return acl_entries
+
+
+def get_anthology_id(entry):
+    return entry["url"].rstrip("/").split("/")[-1]
+
+
+def get_volume_id(anthology_id):
+    # 2021.emnlp-main.123 -> 2021.emnlp-main, P18-1001 -> P18-1, W18-5001 -> W18-50, same rules as the anthology's
+    # own ids, None if the id has neither form
+    new_style_match = re.match(r"^(\d{4}\.[a-z0-9\-]+)\.\d+$", anthology_id)
+    if new_style_match is not None:
+        return new_style_match.group(1)
+    old_style_match = re.match(r"^([A-Z]\d{2})-(\d{4})$", anthology_id)
+    if old_style_match is None:
+        return None
+    collection_id, number = old_style_match.groups()
+    if collection_id.startswith("W") or collection_id == "C69" or (collection_id == "D19" and int(number[0]) >= 5):
+        return "{}-{}".format(collection_id, number[:2])
+    return "{}-{}".format(collection_id, number[0])
+
+
+def parse_volume_page(content, volume_url):
+    """Links of every paper listed on a volume page, by anthology id.
+
+    Papers whose code is only linked through Papers with Code have no code badge, they are left out so they
+    are fetched one by one.
+    """
+    soup = BeautifulSoup(content, "lxml")
+    paper_links = {}
+    for paper_row in soup.find_all("p", {"class": "d-sm-flex"}):
+        title_link = paper_row.select_one("strong a[href]")
+        if title_link is None:
+            continue
+        anthology_id = title_link.attrs["href"].strip("/").split("/")[-1]
+        links = []
+        has_code_badge, has_papers_with_code_badge = False, False
+        for badge in paper_row.select("a.badge[href]"):
+            url = requests.compat.urljoin(volume_url, badge.attrs["href"])
+            if "paperswithcode.com" in url:
+                has_papers_with_code_badge = True
+                continue
+            # keyed by the badge text as on the paper page, a GitHub repository can hold data or software as well
+            key = VOLUME_BADGE_KEYS.get(badge.text.strip().lower())
+            if key is None:
+                continue
+            has_code_badge = has_code_badge or key == "Code"
+            links.append((key, url))
+        if has_papers_with_code_badge and not has_code_badge:
+            continue
+        paper_links[anthology_id] = links
+    return paper_links
+
+
+def get_volume_reproducibility_information(volume):
+    # volume is (volume id, entries), the entries that are not listed on the volume page are returned
+    volume_id, entries = volume
+    volume_url = ANTHOLOGY_VOLUME_URL.format(volume_id)
+    try:
+        volume_page_response = requests.get(url=volume_url, timeout=VOLUME_REQUEST_TIMEOUT, headers=GLOBAL_HEADERS)
+        if volume_page_response.status_code != 200:
+            return volume_id, entries, "error {}".format(volume_page_response.status_code)
+        paper_links = parse_volume_page(volume_page_response.content, volume_url)
+    except Exception as e:
+        return volume_id, entries, "exception {}".format(type(e))
+
+    missing_entries = []
+    for entry in entries:
+        anthology_id = get_anthology_id(entry)
+        if anthology_id not in paper_links:
+            missing_entries.append(entry)
+            continue
+        for key, value in paper_links[anthology_id]:
+            add_entry_value(entry, key, value)
+        entry["acl_status"] = "success"
+    return volume_id, missing_entries, "success"
+
+
+def get_volume_entries(acl_entries):
+    volume_entries = collections.defaultdict(list)
+    for entry in acl_entries:
+        if is_acl_request_needed(entry):
+            volume_entries[get_volume_id(get_anthology_id(entry))].append(entry)
+    return volume_entries
+
+
+def is_volume_overloaded(volume_result):
+    return OVERLOAD_STATUS_PATTERN.match(volume_result[2]) is not None
+
+
+def get_acl_information_by_volume(acl_entries, controller=None, max_workers=None, retries=OVERLOAD_RETRIES,
+                                  retry_delay=OVERLOAD_RETRY_DELAY):
+    for entry in acl_entries:
+        if not is_acl_request_needed(entry):
+            get_reproducibility_information(entry)
+    volume_entries = get_volume_entries(acl_entries)
+    fallback_entries = volume_entries.pop(None, [])
+    logging.info("Requesting {} volume pages for {} entries".format(
+        len(volume_entries), sum(len(entries) for entries in volume_entries.values())))
+    volumes = list(volume_entries.items())
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            # the controller has cut its limit on the overloaded responses, the retries also wait before they start
+            logging.info("Retrying {} overloaded volume pages in {} seconds".format(len(volumes), retry_delay))
+            time.sleep(retry_delay)
+            retry_delay = 2 * retry_delay
+        volume_results = run_func_in_parallel(get_volume_reproducibility_information, volumes,
+                                              max_workers=max_workers,
+                                              controller=controller,
+                                              is_overloaded=is_volume_overloaded)
+        volumes = []
+        for volume_result in volume_results:
+            volume_id, missing_entries, status = volume_result
+            if status == "success":
+                fallback_entries.extend(missing_entries)
+            elif status == "error 404":
+                logging.info("Volume {} {}, its entries are requested one by one".format(volume_id, status))
+                fallback_entries.extend(missing_entries)
+            elif is_volume_overloaded(volume_result) and attempt < retries:
+                volumes.append((volume_id, missing_entries))
+            else:
+                # a paper request per entry would multiply the load on a server that is failing already, the
+                # entries keep the status and are requested again on the next run
+                logging.info("Volume {} {}, its entries are left for the next run".format(volume_id, status))
+                for entry in missing_entries:
+                    entry["acl_status"] = status
+        if len(volumes) == 0:
+            break
+
+    # entries are updated in place, the paper pages fill in the ones the volume pages did not have
+    logging.info("Requesting {} paper pages".format(len(fallback_entries)))
+    get_acl_information(fallback_entries, controller=controller, max_workers=max_workers)
+    return acl_entries
 
 
 def get_github_information(acl_entries, github_auth_token):
@@ -286,26 +608,87 @@ def main():
     parser.add_argument("--anthology_path", type=str)
     parser.add_argument("--export_dir", type=str)
     parser.add_argument("--github_auth_token", type=str, default="")
+    parser.add_argument("--export_format", type=str, choices=EXPORT_FORMATS, default="json")
+    parser.add_argument("--compression", type=str, choices=COMPRESSIONS, default="none")
+    parser.add_argument("--parse_workers", type=int, default=None,
+                        help="processes parsing chunks of the bib file, one per core by default, see parallel_bib.py")
+    parser.add_argument("--shard", type=str, default="",
+                        help="i/N, only process the i-th of N hash partitions of the entries, see merge_shards.py")
+    parser.add_argument("--build_search_index", action="store_true",
+                        help="index titles and abstracts into export_dir/search_index, see search_index.py")
+    parser.add_argument("--build_author_index", action="store_true",
+                        help="index the normalized authors into export_dir/author_index, see author_index.py")
+    parser.add_argument("--include", type=str, nargs="*", default=[],
+                        help="cohort filters the entries have to match to be crawled, e.g. 'year>2015' "
+                             "'venue in {ACL,EMNLP}' 'type==inproceedings', see cohort_filters.py")
+    parser.add_argument("--max_concurrency", type=int, default=32,
+                        help="upper bound of the anthology requests in flight, the limit adapts to the server's "
+                             "responses below it")
+    parser.add_argument("--fixed_concurrency", type=int, default=None,
+                        help="use this many threads with a fixed number of requests in flight instead")
+    parser.add_argument("--by_volume", action="store_true",
+                        help="request the volume page listing the links of all papers of a volume once, paper pages "
+                             "only for the papers missing from it")
+    parser.add_argument("--dry_run", action="store_true",
+                        help="only count the selected entries and the requests they need")
 
     args = parser.parse_args()
     anthology_file_path = args.anthology_path
     export_dir = args.export_dir
     github_auth_token = args.github_auth_token
+    for include_filter in args.include:
+        # fail before the bib is loaded
+        parse_filter(include_filter)
+
+    if args.shard != "":
+        shard_index, number_of_shards = parse_shard(args.shard)
+        export_dir = get_shard_export_dir(export_dir, shard_index, number_of_shards)
+        os.makedirs(export_dir, exist_ok=True)
 
     logging.info("Loading Bib")
-    acl_entries = cache_load_acl_anthology_bib(anthology_file_path, export_dir)
+    acl_entries = cache_load_acl_anthology_bib(anthology_file_path, export_dir, parse_workers=args.parse_workers,
+                                               export_format=args.export_format, compression=args.compression)
+
+    if args.shard != "":
+        acl_entries = [entry for entry in acl_entries if get_entry_shard(entry, number_of_shards) == shard_index]
+        logging.info("Shard {} has {} entries".format(args.shard, len(acl_entries)))
+
+    number_of_entries = len(acl_entries)
+    all_entries, selected_indices = acl_entries, range(number_of_entries)
+    if len(args.include) > 0:
+        include_mask = get_include_mask(acl_entries, args.include)
+        selected_indices = [i for i, is_included in enumerate(include_mask) if is_included]
+        acl_entries = [all_entries[i] for i in selected_indices]
+    log_selected_work(acl_entries, number_of_entries, top_venues=20 if args.dry_run else 0, by_volume=args.by_volume)
+    if args.dry_run:
+        return
 
     logging.info("Getting ACL Info")
-    acl_entries = get_acl_information(acl_entries)
+    controller = ConcurrencyController(max_limit=args.max_concurrency) if args.fixed_concurrency is None else None
+    if args.by_volume:
+        acl_entries = get_acl_information_by_volume(acl_entries, controller=controller,
+                                                    max_workers=args.fixed_concurrency)
+    else:
+        acl_entries = get_acl_information(acl_entries, controller=controller, max_workers=args.fixed_concurrency)
 
     logging.info("Exporting intermediate results")
-    export_acl(export_dir, acl_entries)
+    all_entries = merge_selected_entries(all_entries, selected_indices, acl_entries)
+    export_acl(export_dir, all_entries, export_format=args.export_format, compression=args.compression)
 
     logging.info("Getting GitHub Info")
     acl_entries = get_github_information(acl_entries, github_auth_token)
 
     logging.info("Exporting Results")
-    export_acl(export_dir, acl_entries)
+    all_entries = merge_selected_entries(all_entries, selected_indices, acl_entries)
+    export_acl(export_dir, all_entries, export_format=args.export_format, compression=args.compression)
+
+    if args.build_search_index:
+        logging.info("Building Search Index")
+        build_search_index(all_entries, os.path.join(export_dir, "search_index"))
+
+    if args.build_author_index:
+        logging.info("Building Author Index")
+        build_author_index(all_entries, os.path.join(export_dir, "author_index"))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,324 @@
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from analyse_anthology import aggregate_code_submissions, load_anthology, preprocess_acl_data
+from confidence_intervals import CI_METHODS
+from cv import get_precision_results_batch
+from repo_activity import DEFAULT_AS_OF_DATE, REPO_ACTIVITY_COLUMNS, add_repo_activity_features
+from search_index import SearchIndex, get_search_index_dir
+from venues import is_major_conference
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+REPO_COUNT_COLUMNS = ["stargazers_count", "forks_count", "open_issues_count"]
+CATEGORY_COLUMNS = ["conference", "booktitle", "github_status"]
+
+
+def get_anthology_frame(acl_anthology, as_of_date=DEFAULT_AS_OF_DATE):
+    # one row per paper with only the columns the queries need, repeated strings stored as categories
+    frame = pd.DataFrame({
+        "ID": [entry["ID"] for entry in acl_anthology],
+        "year": np.array([entry["year"] for entry in acl_anthology], dtype=np.int32),
+        "conference": [entry.get("conference", entry.get("booktitle")) for entry in acl_anthology],
+        "booktitle": [entry.get("booktitle") for entry in acl_anthology],
+        "is_major_conference": [is_major_conference(entry) if "booktitle" in entry else False
+                                for entry in acl_anthology],
+        "has_code": ["Code" in entry for entry in acl_anthology],
+        "has_software": ["Software" in entry or "Optional supplementary material" in entry
+                         for entry in acl_anthology],
+        "github_status": [entry.get("github_status") for entry in acl_anthology],
+    })
+    for column in REPO_COUNT_COLUMNS + ["created_at", "updated_at", "pushed_at"]:
+        frame[column] = [entry.get(column) for entry in acl_anthology]
+    for column in REPO_COUNT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    for column in CATEGORY_COLUMNS:
+        frame[column] = frame[column].astype("category")
+    frame = add_repo_activity_features(frame, as_of_date=as_of_date)
+    return frame.drop(columns=["created_at", "updated_at", "pushed_at"])
+
+
+def get_values(params, name):
+    # ?venue=ACL&venue=EMNLP and ?venue=ACL,EMNLP are the same
+    return sorted(value for values in params.get(name, []) for value in values.split(",") if value != "")
+
+
+def get_single_value(params, name, default=None, value_type=str):
+    values = params.get(name)
+    if values is None or len(values) == 0 or values[-1] == "":
+        return default
+    try:
+        return value_type(values[-1])
+    except ValueError:
+        raise ValueError("{} must be a {}, not {}".format(name, value_type.__name__, values[-1]))
+
+
+def get_frame_records(frame):
+    return json.loads(frame.to_json(orient="records"))
+
+
+class DataVersionChanged(Exception):
+    pass
+
+
+class AnthologyService:
+    """The processed anthology held in memory for the HTTP handlers.
+
+    Query results are cached per data version, the modification times of the export and of the search index. A
+    background thread reloads them when either changes and swaps the new version in once loaded. A query reads the data once and runs on that version only, a query
+    whose version was swapped out before it started is rerun on the new one.
+    """
+
+    def __init__(self, anthology_json_path, as_of_date=DEFAULT_AS_OF_DATE, search_index_dir="", cache_size=1024):
+        self.anthology_json_path = anthology_json_path
+        self.as_of_date = as_of_date
+        self.search_index_dir = search_index_dir if search_index_dir != "" else \
+            get_search_index_dir(anthology_json_path)
+        self.reload_lock = threading.Lock()
+        self.data = None
+        self.cached_query = functools.lru_cache(maxsize=cache_size)(self.run_query)
+        self.reload()
+
+    def get_version(self):
+        # the search index is written after the export and replaced as a whole, vocabulary.json is written last
+        vocabulary_path = os.path.join(self.search_index_dir, "vocabulary.json")
+        index_modification_time = os.stat(vocabulary_path).st_mtime_ns if os.path.isfile(vocabulary_path) else None
+        return os.stat(self.anthology_json_path).st_mtime_ns, index_modification_time
+
+    def reload(self):
+        with self.reload_lock:
+            version = self.get_version()
+            if self.data is not None and self.data["version"] == version:
+                return False
+            start_time = time.perf_counter()
+            if self.data is not None and self.data["version"][0] == version[0]:
+                # only the search index changed
+                frame = self.data["frame"]
+            else:
+                acl_anthology = load_anthology(self.anthology_json_path)
+                preprocess_acl_data(acl_anthology)
+                frame = get_anthology_frame(acl_anthology, as_of_date=self.as_of_date)
+                del acl_anthology
+            search_index = SearchIndex(self.search_index_dir) if version[1] is not None else None
+            self.data = {"version": version, "frame": frame, "search_index": search_index,
+                         "id_positions": pd.Index(frame["ID"])}
+            self.cached_query.cache_clear()
+            logging.info("Loaded {} entries in {:.1f} s".format(len(frame), time.perf_counter() - start_time))
+            return True
+
+    def watch(self, interval=2.0):
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    # a half written or missing export is retried on the next check
+                    logging.error("reload failed {}, {}".format(e, type(e)))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def get_mask(self, data, params):
+        frame = data["frame"]
+        mask = np.ones(len(frame), dtype=bool)
+        venues = get_values(params, "venue")
+        if len(venues) > 0:
+            mask &= frame["conference"].isin(venues).to_numpy()
+        years = [int(year) for year in get_values(params, "year")]
+        if len(years) > 0:
+            mask &= frame["year"].isin(years).to_numpy()
+        from_year, to_year = get_single_value(params, "from_year", None, int), get_single_value(params, "to_year",
+                                                                                                 None, int)
+        if from_year is not None:
+            mask &= frame["year"].to_numpy() >= from_year
+        if to_year is not None:
+            mask &= frame["year"].to_numpy() <= to_year
+        if get_single_value(params, "major_only", "0") in ("1", "true"):
+            mask &= frame["is_major_conference"].to_numpy()
+        if get_single_value(params, "has_code", None) is not None:
+            mask &= frame["has_code"].to_numpy() == (get_single_value(params, "has_code") in ("1", "true"))
+        query = get_single_value(params, "q")
+        if query is not None:
+            if data["search_index"] is None:
+                raise ValueError("q needs a search index, build it with search_index.py --build")
+            matching_ids = data["search_index"].search_ids(query)
+            positions = data["id_positions"].get_indexer(matching_ids)
+            query_mask = np.zeros(len(frame), dtype=bool)
+            query_mask[positions[positions >= 0]] = True
+            mask &= query_mask
+        return mask
+
+    def get_code_ratio(self, data, params):
+        ci_method = get_single_value(params, "ci_method", "wilson")
+        if ci_method not in CI_METHODS:
+            raise ValueError("ci_method must be one of {}".format(CI_METHODS))
+        papers_df = data["frame"].loc[self.get_mask(data, params),
+                                      ["year", "has_code", "has_software", "conference"]]
+        papers_df = papers_df[papers_df["conference"].notna()]
+        papers_df["conference"] = papers_df["conference"].astype(str)
+        agg_result = aggregate_code_submissions(papers_df,
+                                                ci_method=ci_method,
+                                                confidence=get_single_value(params, "confidence", 0.95, float),
+                                                n_resamples=get_single_value(params, "n_resamples", 2000, int),
+                                                seed=get_single_value(params, "seed", 0, int))
+        return {"rows": get_frame_records(agg_result)}
+
+    def get_cohort(self, data, params):
+        cohort_df = data["frame"][self.get_mask(data, params)]
+        repos_df = cohort_df[cohort_df["github_status"] == "success"]
+        group_by = get_values(params, "group_by")
+        columns = REPO_COUNT_COLUMNS + REPO_ACTIVITY_COLUMNS
+        if len(group_by) > 0:
+            unknown = set(group_by) - {"conference", "year"}
+            if len(unknown) > 0:
+                raise ValueError("group_by must be conference and/or year, not {}".format(sorted(unknown)))
+            summary_df = repos_df.groupby(group_by, observed=True)[columns].agg(["count", "mean", "std", "median"])
+            summary_df.columns = ["_".join(column) for column in summary_df.columns]
+            return {"papers": int(len(cohort_df)), "papers_with_code": int(cohort_df["has_code"].sum()),
+                    "repositories": int(len(repos_df)), "groups": get_frame_records(summary_df.reset_index())}
+        summary = repos_df[columns].agg(["count", "mean", "std", "median"])
+        return {"papers": int(len(cohort_df)), "papers_with_code": int(cohort_df["has_code"].sum()),
+                "repositories": int(len(repos_df)), "statistics": json.loads(summary.to_json())}
+
+    def run_query(self, version, path, params_key):
+        # version is part of the cache key, a result is only computed on the data of that version
+        data = self.data
+        if data["version"] != version:
+            raise DataVersionChanged(version)
+        params = {name: list(values) for name, values in params_key}
+        if path == "/code_ratio":
+            return json.dumps(self.get_code_ratio(data, params))
+        if path == "/cohort":
+            return json.dumps(self.get_cohort(data, params))
+        raise KeyError(path)
+
+    def query(self, path, params):
+        params_key = tuple(sorted((name, tuple(values)) for name, values in params.items()))
+        while True:
+            try:
+                return self.cached_query(self.data["version"], path, params_key)
+            except DataVersionChanged:
+                # the export was swapped in between reading its version and running the query, exceptions are
+                # not cached
+                continue
+
+    def get_status(self):
+        cache_info = self.cached_query.cache_info()
+        return {"anthology_json_path": self.anthology_json_path, "version": self.data["version"],
+                "entries": len(self.data["frame"]), "search_index": self.data["search_index"] is not None,
+                "cache": {"hits": cache_info.hits, "misses": cache_info.misses, "size": cache_info.currsize}}
+
+
+def get_cv(body):
+    # {"measurements": [[...], ...]} or {"measurements": {"name": [...], ...}}
+    measurements = body.get("measurements")
+    if isinstance(measurements, dict):
+        names, measurements = list(measurements.keys()), list(measurements.values())
+    elif isinstance(measurements, list):
+        names = list(range(len(measurements)))
+    else:
+        raise ValueError("measurements must be a list of lists or an object of lists")
+    if any(not isinstance(values, list) or len(values) < 2 for values in measurements):
+        raise ValueError("every set of measurements needs at least two values")
+    results_df = get_precision_results_batch([[float(value) for value in values] for values in measurements])
+    results_df.insert(0, "name", names)
+    return {"rows": get_frame_records(results_df)}
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    def send_json(self, status, body):
+        content = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_request(self, get_body):
+        start_time = time.perf_counter()
+        try:
+            get_body()
+        except (ValueError, KeyError) as e:
+            status = 404 if isinstance(e, KeyError) else 400
+            self.send_json(status, {"error": str(e) if status == 400 else "unknown path {}".format(e)})
+        except Exception as e:
+            logging.exception("query failed")
+            self.send_json(500, {"error": "{}".format(type(e).__name__)})
+        logging.debug("{} took {:.1f} ms".format(self.path, (time.perf_counter() - start_time) * 1000))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        def get_body():
+            if url.path == "/status":
+                self.send_json(200, self.server.service.get_status())
+            else:
+                self.send_json(200, self.server.service.query(url.path, parse_qs(url.query)))
+
+        self.handle_request(get_body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        def get_body():
+            if url.path != "/cv":
+                raise KeyError(url.path)
+            content_length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(content_length) or b"{}")
+            except json.JSONDecodeError as e:
+                raise ValueError("invalid JSON body, {}".format(e))
+            self.send_json(200, get_cv(body))
+
+        self.handle_request(get_body)
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local HTTP/JSON query service over the processed anthology')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--as_of_date", type=str, default=DEFAULT_AS_OF_DATE)
+    parser.add_argument("--search_index_dir", type=str, default="",
+                        help="search_index next to the anthology export by default, enables the q= parameter")
+    parser.add_argument("--cache_size", type=int, default=1024)
+    parser.add_argument("--reload_interval", type=float, default=2.0,
+                        help="seconds between checks of the export's modification time")
+
+    args = parser.parse_args()
+
+    service = AnthologyService(args.anthology_json_path, as_of_date=args.as_of_date,
+                               search_index_dir=args.search_index_dir, cache_size=args.cache_size)
+    service.watch(interval=args.reload_interval)
+
+    server = ThreadingHTTPServer((args.host, args.port), QueryRequestHandler)
+    server.service = service
+    logging.info("Serving on http://{}:{}".format(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from analyse_anthology import load_anthology, preprocess_acl_data
+
+GITHUB_DATE_COLUMNS = ["created_at", "updated_at", "pushed_at"]
+# GitHub timestamps look like 2021-09-01T12:00:00Z, the ISO8601 fast path parses them in C
+GITHUB_DATE_FORMAT = "ISO8601"
+DEFAULT_AS_OF_DATE = "2022-06-15"
+
+REPO_ACTIVITY_COLUMNS = ["days_since_last_update",
+                         "days_since_last_push",
+                         "repo_age_days",
+                         "active_lifetime_days"]
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+
+def parse_as_of_date(as_of_date):
+    as_of_date = pd.Timestamp(as_of_date)
+    if as_of_date.tzinfo is None:
+        as_of_date = as_of_date.tz_localize("UTC")
+    return as_of_date
+
+
+def parse_github_dates(repos_df):
+    # one vectorized conversion per column instead of a strptime call per row,
+    # missing or malformed values become NaT
+    for column in GITHUB_DATE_COLUMNS:
+        if column not in repos_df:
+            repos_df[column] = pd.NaT
+        repos_df[column] = pd.to_datetime(repos_df[column], format=GITHUB_DATE_FORMAT, utc=True, errors="coerce")
+    return repos_df
+
+
+def add_repo_activity_features(repos_df, as_of_date=DEFAULT_AS_OF_DATE):
+    as_of_date = parse_as_of_date(as_of_date)
+    repos_df = parse_github_dates(repos_df)
+
+    one_day = np.timedelta64(1, "D")
+    # staleness: how long before the as-of date the repository was last touched
+    repos_df["days_since_last_update"] = (as_of_date - repos_df["updated_at"]) // one_day
+    repos_df["days_since_last_push"] = (as_of_date - repos_df["pushed_at"]) // one_day
+    # age: how long the repository existed at the as-of date
+    repos_df["repo_age_days"] = (as_of_date - repos_df["created_at"]) // one_day
+    # active lifetime: span between creation and the last push
+    repos_df["active_lifetime_days"] = (repos_df["pushed_at"] - repos_df["created_at"]) // one_day
+    return repos_df
+
+
+def summarize_repo_activity(repos_df, group_by=("conference", "year"), quantiles=(0.25, 0.5, 0.75)):
+    group_by = list(group_by)
+    grouped = repos_df.groupby(group_by, observed=True)[REPO_ACTIVITY_COLUMNS]
+
+    summary_df = grouped.agg(["count", "mean", "std"])
+    quantile_df = grouped.quantile(list(quantiles)).unstack(level=-1)
+    quantile_df.columns = pd.MultiIndex.from_tuples([(column, "q{:g}".format(q * 100))
+                                                     for column, q in quantile_df.columns])
+    summary_df = summary_df.join(quantile_df)
+    summary_df = summary_df[[column for feature in REPO_ACTIVITY_COLUMNS
+                             for column in summary_df.columns if column[0] == feature]]
+    summary_df.columns = ["_".join(column) for column in summary_df.columns]
+    return summary_df.reset_index()
+
+
+def get_github_repos_df(acl_anthology_df):
+    if "github_status" not in acl_anthology_df:
+        return acl_anthology_df.iloc[0:0].copy()
+    return acl_anthology_df[acl_anthology_df["github_status"] == "success"].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Repository activity statistics for GitHub-linked papers')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--as_of_date", type=str, default=DEFAULT_AS_OF_DATE)
+    parser.add_argument("--group_by", type=str, nargs="+", default=["conference", "year"])
+    parser.add_argument("--export_path", type=str, default="")
+
+    args = parser.parse_args()
+
+    acl_anthology = load_anthology(args.anthology_json_path)
+    preprocess_acl_data(acl_anthology)
+
+    repos_df = get_github_repos_df(pd.DataFrame(acl_anthology))
+    repos_df = add_repo_activity_features(repos_df, as_of_date=args.as_of_date)
+    logging.info("Computed repository activity for {} repositories".format(len(repos_df)))
+
+    summary_df = summarize_repo_activity(repos_df, group_by=args.group_by)
+    if args.export_path != "":
+        summary_df.to_csv(args.export_path, index=False)
+    else:
+        pd.set_option('display.max_columns', None)
+        print(summary_df)
+
+
+if __name__ == '__main__':
+    main()
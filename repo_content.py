@@ -0,0 +1,204 @@
+import argparse
+import concurrent
+import logging
+import os
+import re
+import shutil
+import tempfile
+from concurrent import futures
+
+import git
+from tqdm import tqdm
+
+from anthology_io import load_entries
+from process_anthology import export_acl, get_entry_github_url
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+# never block a worker on a credential prompt for private or deleted repositories
+GIT_ENVIRONMENT = {"GIT_TERMINAL_PROMPT": "0"}
+
+README_PATTERN = re.compile(r"^readme(\.\w+)?$", re.IGNORECASE)
+LICENSE_PATTERN = re.compile(r"^(license|licence|copying)(\.\w+)?$", re.IGNORECASE)
+REQUIREMENTS_FILE_NAMES = {"requirements.txt", "environment.yml", "environment.yaml", "setup.py", "setup.cfg",
+                           "pyproject.toml", "pipfile", "pipfile.lock", "poetry.lock", "conda.yaml", "conda.yml"}
+REQUIREMENTS_PATTERN = re.compile(r"^requirements[-_.\w]*\.txt$", re.IGNORECASE)
+DOCKER_PATTERN = re.compile(r"^(dockerfile([-_.\w]*)?|[-_.\w]*\.dockerfile|docker-compose\.ya?ml)$", re.IGNORECASE)
+TEST_DIRECTORY_NAMES = {"test", "tests", "testing"}
+TEST_FILE_PATTERN = re.compile(r"^(test_[-\w]*|[-\w]*_test)\.py$", re.IGNORECASE)
+SEED_PATTERN = r"seed[\"']?[[:space:]]*[:=][[:space:]]*[0-9]+"
+SEED_CONFIG_PATHSPECS = ["*.yaml", "*.yml", "*.json", "*.jsonnet", "*.cfg", "*.ini", "*.toml", "*.conf", "*.sh"]
+
+REPO_SIGNAL_KEYS = ["repo_has_readme", "repo_has_requirements", "repo_has_dockerfile", "repo_has_license",
+                    "repo_has_tests", "repo_has_seed_config", "repo_commit_count"]
+
+
+def get_clone_url(github_url_api):
+    # https://api.github.com/repos/owner/name -> https://github.com/owner/name.git
+    clone_url = github_url_api.replace("api.github.com/repos/", "github.com/").rstrip("/.,;)")
+    if not clone_url.endswith(".git"):
+        clone_url = clone_url + ".git"
+    return clone_url
+
+
+def get_cache_path(cache_dir, clone_url):
+    repository_path = re.sub(r"^[a-z]+://", "", clone_url)
+    repository_path = re.sub(r"[^\w.\-/]", "_", repository_path).strip("/")
+    if not repository_path.endswith(".git"):
+        repository_path = repository_path + ".git"
+    return os.path.join(cache_dir, repository_path)
+
+
+def open_cached_repository(cache_path):
+    # a directory that is not a repository, e.g. left by a clone interrupted before clones were renamed into place,
+    # is removed and cloned again
+    try:
+        return git.Repo(cache_path)
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+        logging.info("Removing invalid cached repository {}".format(cache_path))
+        shutil.rmtree(cache_path)
+        return None
+
+
+def clone_repository(clone_url, cache_path, clone_options):
+    # the clone goes to a temporary directory next to the cache path that is only renamed into place once complete,
+    # an interrupted clone never leaves a partial repository at the cache path
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temporary_path = tempfile.mkdtemp(dir=os.path.dirname(cache_path), prefix="." + os.path.basename(cache_path),
+                                      suffix=".tmp")
+    try:
+        git.Repo.clone_from(clone_url, temporary_path, bare=True, multi_options=clone_options, env=GIT_ENVIRONMENT)
+        os.replace(temporary_path, cache_path)
+    finally:
+        if os.path.isdir(temporary_path):
+            shutil.rmtree(temporary_path)
+    return git.Repo(cache_path)
+
+
+def sync_repository(clone_url, cache_path, depth=None, fetch=True):
+    # bare, blobless clone: commits and trees are downloaded, file contents only on demand
+    repo = open_cached_repository(cache_path) if os.path.isdir(cache_path) else None
+    if repo is not None:
+        if fetch:
+            fetch_options = ["--filter=blob:none", "--prune", "--force"]
+            if depth is not None:
+                fetch_options.append("--depth={}".format(depth))
+            with repo.git.custom_environment(**GIT_ENVIRONMENT):
+                repo.git.fetch(*fetch_options, "origin", "+refs/heads/*:refs/heads/*")
+        return repo
+
+    clone_options = ["--filter=blob:none"]
+    if depth is not None:
+        clone_options.append("--depth={}".format(depth))
+    return clone_repository(clone_url, cache_path, clone_options)
+
+
+def get_repository_signals(repo):
+    file_paths = repo.git.ls_tree("-r", "--name-only", "HEAD").splitlines()
+    root_file_names = [path for path in file_paths if "/" not in path]
+    file_names = [path.rsplit("/", 1)[-1] for path in file_paths]
+
+    signals = {
+        "repo_has_readme": any(README_PATTERN.match(name) for name in root_file_names),
+        "repo_has_requirements": any(name.lower() in REQUIREMENTS_FILE_NAMES or REQUIREMENTS_PATTERN.match(name)
+                                     for name in file_names),
+        "repo_has_dockerfile": any(DOCKER_PATTERN.match(name) for name in file_names),
+        "repo_has_license": any(LICENSE_PATTERN.match(name) for name in root_file_names),
+        "repo_has_tests": any(TEST_FILE_PATTERN.match(name) for name in file_names) or
+                          any(directory.lower() in TEST_DIRECTORY_NAMES
+                              for path in file_paths for directory in path.split("/")[:-1]),
+    }
+
+    # only the contents of config files are needed, git grep fetches just those blobs
+    try:
+        seed_files = repo.git.grep("-l", "-i", "-E", SEED_PATTERN, "HEAD", "--", *SEED_CONFIG_PATHSPECS)
+        signals["repo_has_seed_config"] = seed_files.strip() != ""
+    except git.GitCommandError as e:
+        # git grep exits with 1 when nothing matches
+        if e.status != 1:
+            raise
+        signals["repo_has_seed_config"] = False
+
+    signals["repo_commit_count"] = int(repo.git.rev_list("--count", "HEAD"))
+    return signals
+
+
+def analyse_repository(clone_url, cache_dir, depth=None, fetch=True):
+    result = {}
+    try:
+        repo = sync_repository(clone_url, get_cache_path(cache_dir, clone_url), depth=depth, fetch=fetch)
+        result.update(get_repository_signals(repo))
+        result["repo_status"] = "success"
+    except git.GitCommandError as e:
+        result["repo_status"] = "error {}".format(e.status)
+    except Exception as e:
+        result["repo_status"] = "exception {}".format(type(e))
+    return result
+
+
+def analyse_repositories(clone_urls, cache_dir, max_workers=8, depth=None, fetch=True):
+    # the pool bounds the number of concurrent git processes
+    repository_results = {}
+    with tqdm(total=len(clone_urls)) as progress_bar:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_list = {executor.submit(analyse_repository, clone_url, cache_dir, depth, fetch): clone_url
+                           for clone_url in clone_urls}
+            for future in concurrent.futures.as_completed(future_list):
+                repository_results[future_list[future]] = future.result()
+                progress_bar.update(1)
+    return repository_results
+
+
+def get_entry_clone_url(entry):
+    github_url_api = get_entry_github_url({key: value for key, value in entry.items() if isinstance(value, str)})
+    if github_url_api is None:
+        return None
+    return get_clone_url(github_url_api)
+
+
+def get_repository_content_information(acl_entries, cache_dir, max_workers=8, depth=None, fetch=True):
+    entry_clone_urls = [get_entry_clone_url(entry) for entry in acl_entries]
+    # papers sharing a repository are analysed once
+    clone_urls = sorted(set(clone_url for clone_url in entry_clone_urls if clone_url is not None))
+    logging.info("Analysing {} repositories linked from {} entries".format(
+        len(clone_urls), sum(clone_url is not None for clone_url in entry_clone_urls)))
+
+    repository_results = analyse_repositories(clone_urls, cache_dir, max_workers=max_workers, depth=depth,
+                                              fetch=fetch)
+    for entry, clone_url in zip(acl_entries, entry_clone_urls):
+        if clone_url is None:
+            entry["repo_status"] = "missing"
+            continue
+        entry.update(repository_results[clone_url])
+    return acl_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproducibility signals from the content of linked repositories')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--export_dir", type=str)
+    parser.add_argument("--cache_dir", type=str, default="data/repositories")
+    parser.add_argument("--max_workers", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=None,
+                        help="shallow clone depth, commit counts are capped by it, full history by default")
+    parser.add_argument("--no_fetch", action="store_true", help="use cached repositories without refreshing them")
+
+    args = parser.parse_args()
+
+    acl_entries = load_entries(args.anthology_json_path)
+
+    logging.info("Getting Repository Content Info")
+    acl_entries = get_repository_content_information(acl_entries, args.cache_dir,
+                                                     max_workers=args.max_workers,
+                                                     depth=args.depth,
+                                                     fetch=not args.no_fetch)
+
+    logging.info("Exporting Results")
+    export_acl(args.export_dir, acl_entries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+import argparse
+import array
+import bisect
+import json
+import logging
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from anthology_io import atomic_write, iter_json_entries
+from venues import get_entry_venue
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+SEARCH_INDEX_FIELDS = ["title", "abstract"]
+SEARCH_INDEX_ARRAYS = ["term_offsets", "posting_docs", "posting_term_frequencies", "position_offsets", "positions",
+                       "doc_lengths", "doc_years", "doc_venues"]
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# LaTeX accents ({\"u}, \'e) and braces are dropped before splitting, M{\"u}ller is indexed as muller
+LATEX_PATTERN = re.compile(r"\\[^a-zA-Z\s]|\\[a-zA-Z]+\s*(?=\{)|[{}]")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+QUERY_TOKEN_PATTERN = re.compile(r'\(|\)|[A-Za-z_]+:"[^"]*"|"[^"]*"|[^\s()"]+')
+QUERY_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(LATEX_PATTERN.sub("", text).lower())
+
+
+def get_entry_text(entry):
+    return " ".join(entry[field] for field in SEARCH_INDEX_FIELDS if field in entry)
+
+
+def get_search_index_dir(anthology_json_path):
+    return os.path.join(os.path.dirname(anthology_json_path), "search_index")
+
+
+def build_search_index(acl_entries, index_dir):
+    # one (term, document, position) triple per token, sorting them by term gives the postings in document and
+    # position order since the triples are produced in that order
+    term_ids = {}
+    token_terms, token_docs, token_positions = array.array("i"), array.array("i"), array.array("i")
+    entry_ids, venue_names, venue_ids = [], [], {}
+    doc_lengths, doc_years, doc_venues = array.array("i"), array.array("i"), array.array("i")
+
+    for doc, entry in enumerate(acl_entries):
+        tokens = tokenize(get_entry_text(entry))
+        token_terms.extend([term_ids.setdefault(token, len(term_ids)) for token in tokens])
+        token_docs.extend([doc] * len(tokens))
+        token_positions.extend(range(len(tokens)))
+
+        venue = get_entry_venue(entry) if "booktitle" in entry or "conference" in entry else entry.get("journal", "")
+        if venue.lower() not in venue_ids:
+            venue_ids[venue.lower()] = len(venue_names)
+            venue_names.append(venue)
+        entry_ids.append(entry["ID"])
+        doc_lengths.append(len(tokens))
+        doc_years.append(int(entry.get("year", 0)))
+        doc_venues.append(venue_ids[venue.lower()])
+
+    # term ids follow the sorted vocabulary, a prefix query is then a contiguous range of terms and postings
+    vocabulary = sorted(term_ids)
+    term_ranks = np.empty(len(vocabulary), dtype=np.int32)
+    term_ranks[[term_ids[term] for term in vocabulary]] = np.arange(len(vocabulary), dtype=np.int32)
+
+    token_terms = term_ranks[np.frombuffer(token_terms, dtype=np.int32)]
+    token_order = np.argsort(token_terms, kind="stable")
+    token_terms = token_terms[token_order]
+    token_docs = np.frombuffer(token_docs, dtype=np.int32)[token_order]
+    token_positions = np.frombuffer(token_positions, dtype=np.int32)[token_order]
+
+    # a posting starts wherever the term or the document changes
+    is_posting_start = np.ones(len(token_terms), dtype=bool)
+    is_posting_start[1:] = (token_terms[1:] != token_terms[:-1]) | (token_docs[1:] != token_docs[:-1])
+    posting_starts = np.flatnonzero(is_posting_start)
+    position_offsets = np.append(posting_starts, len(token_terms)).astype(np.int64)
+    arrays = {
+        "term_offsets": np.searchsorted(token_terms[posting_starts], np.arange(len(vocabulary) + 1)).astype(np.int64),
+        "posting_docs": token_docs[posting_starts],
+        "posting_term_frequencies": np.diff(position_offsets).astype(np.int32),
+        "position_offsets": position_offsets,
+        "positions": token_positions,
+        "doc_lengths": np.frombuffer(doc_lengths, dtype=np.int32),
+        "doc_years": np.frombuffer(doc_years, dtype=np.int32),
+        "doc_venues": np.frombuffer(doc_venues, dtype=np.int32),
+    }
+
+    # written next to the target and renamed once complete, like the exports
+    temporary_dir = index_dir.rstrip("/") + ".tmp"
+    if os.path.isdir(temporary_dir):
+        shutil.rmtree(temporary_dir)
+    os.makedirs(temporary_dir)
+    for name, values in arrays.items():
+        np.save(os.path.join(temporary_dir, name + ".npy"), values)
+    with atomic_write(os.path.join(temporary_dir, "vocabulary.json")) as f:
+        json.dump({"terms": vocabulary, "ids": entry_ids, "venues": venue_names}, f)
+    if os.path.isdir(index_dir):
+        shutil.rmtree(index_dir)
+    os.replace(temporary_dir, index_dir)
+    logging.info("Indexed {} entries, {} terms, {} postings".format(len(entry_ids), len(vocabulary),
+                                                                   len(posting_starts)))
+    return index_dir
+
+
+def tokenize_query(query):
+    return QUERY_TOKEN_PATTERN.findall(query)
+
+
+def parse_query(query):
+    """Parses a query into nested tuples.
+
+    Terms are matched against the title and abstract, term* is a prefix, "a b" a phrase, venue:EMNLP and
+    year:2021 (or year:2016..2021) filter on fields. NOT binds tighter than AND, AND tighter than OR,
+    clauses without an operator in between are combined with AND.
+    """
+    query_tokens = tokenize_query(query)
+    position = 0
+
+    def peek():
+        return query_tokens[position] if position < len(query_tokens) else None
+
+    def parse_or():
+        nonlocal position
+        clauses = [parse_and()]
+        while peek() == "OR":
+            position += 1
+            clauses.append(parse_and())
+        return clauses[0] if len(clauses) == 1 else ("or", clauses)
+
+    def parse_and():
+        nonlocal position
+        clauses = [parse_not()]
+        while peek() is not None and peek() not in (")", "OR"):
+            if peek() == "AND":
+                position += 1
+            clauses.append(parse_not())
+        return clauses[0] if len(clauses) == 1 else ("and", clauses)
+
+    def parse_not():
+        nonlocal position
+        if peek() == "NOT":
+            position += 1
+            return "not", parse_not()
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal position
+        query_token = peek()
+        if query_token is None or query_token in QUERY_OPERATORS or query_token == ")":
+            raise ValueError("unexpected {} at position {} of query {!r}".format(
+                "end" if query_token is None else repr(query_token), position, query))
+        position += 1
+        if query_token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError("missing ) in query {!r}".format(query))
+            position += 1
+            return node
+        field_match = re.match(r'^([A-Za-z_]+):"?([^"]*)"?$', query_token)
+        if field_match is not None:
+            return parse_field(field_match.group(1).lower(), field_match.group(2))
+        if query_token.startswith('"'):
+            return get_text_node(tokenize(query_token))
+        if query_token.endswith("*") and len(tokenize(query_token)) == 1:
+            return "prefix", tokenize(query_token)[0]
+        return get_text_node(tokenize(query_token))
+
+    node = parse_or()
+    if position != len(query_tokens):
+        raise ValueError("unexpected {!r} in query {!r}".format(query_tokens[position], query))
+    return node
+
+
+def parse_field(field, value):
+    if field == "venue":
+        return "venue", value.lower()
+    if field == "year":
+        first_year, _, last_year = value.partition("..")
+        return "year", int(first_year), int(last_year) if last_year != "" else int(first_year)
+    raise ValueError("unknown field {}, use venue: or year:".format(field))
+
+
+def get_text_node(tokens):
+    # "low-resource" is two tokens and is matched as a phrase
+    if len(tokens) == 0:
+        return ("all",)
+    if len(tokens) == 1:
+        return "term", tokens[0]
+    return "phrase", tokens
+
+
+class SearchIndex:
+    """A search index written by build_search_index, the postings are memory mapped and not read up front."""
+
+    def __init__(self, index_dir):
+        for name in SEARCH_INDEX_ARRAYS:
+            setattr(self, name, np.load(os.path.join(index_dir, name + ".npy"), mmap_mode="r"))
+        with open(os.path.join(index_dir, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        self.terms = vocabulary["terms"]
+        self.ids = vocabulary["ids"]
+        self.venue_ids = {venue.lower(): i for i, venue in enumerate(vocabulary["venues"])}
+        self.average_doc_length = float(np.mean(self.doc_lengths)) if len(self.ids) > 0 else 0.0
+
+    def get_term_range(self, term, prefix=False):
+        first = bisect.bisect_left(self.terms, term)
+        if prefix:
+            return first, bisect.bisect_left(self.terms, term + "\uffff")
+        return first, first + 1 if first < len(self.terms) and self.terms[first] == term else first
+
+    def get_postings(self, first_term, last_term):
+        # postings of a term range, the documents of a prefix can repeat
+        start, end = self.term_offsets[first_term], self.term_offsets[last_term]
+        return np.arange(start, end), self.posting_docs[start:end]
+
+    def get_term_mask(self, first_term, last_term):
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.get_postings(first_term, last_term)[1]] = True
+        return mask
+
+    def get_term_occurrences(self, term):
+        # every (document, position) of a term, its postings and their positions are contiguous
+        start, end = self.term_offsets[term], self.term_offsets[term + 1]
+        docs = np.repeat(np.asarray(self.posting_docs[start:end], dtype=np.int64),
+                         self.posting_term_frequencies[start:end])
+        return docs, self.positions[self.position_offsets[start]:self.position_offsets[end]]
+
+    def get_phrase_mask(self, tokens):
+        # a phrase matches where term i occurs at position p + i, (document, p) pairs are compared as one int64 key
+        mask = np.zeros(len(self.ids), dtype=bool)
+        phrase_keys = None
+        for offset, token in enumerate(tokens):
+            first_term, last_term = self.get_term_range(token)
+            if first_term == last_term:
+                return mask
+            docs, positions = self.get_term_occurrences(first_term)
+            starts = positions.astype(np.int64) - offset
+            keys = (docs << 32 | starts)[starts >= 0]
+            phrase_keys = keys if phrase_keys is None else np.intersect1d(phrase_keys, keys, assume_unique=True)
+        mask[phrase_keys >> 32] = True
+        return mask
+
+    def evaluate(self, node):
+        node_type = node[0]
+        if node_type == "all":
+            return np.ones(len(self.ids), dtype=bool)
+        if node_type == "term":
+            return self.get_term_mask(*self.get_term_range(node[1]))
+        if node_type == "prefix":
+            return self.get_term_mask(*self.get_term_range(node[1], prefix=True))
+        if node_type == "phrase":
+            return self.get_phrase_mask(node[1])
+        if node_type == "venue":
+            return np.asarray(self.doc_venues) == self.venue_ids.get(node[1], -1)
+        if node_type == "year":
+            return (np.asarray(self.doc_years) >= node[1]) & (np.asarray(self.doc_years) <= node[2])
+        if node_type == "not":
+            return ~self.evaluate(node[1])
+        if node_type == "and":
+            mask = self.evaluate(node[1][0])
+            for clause in node[1][1:]:
+                mask &= self.evaluate(clause)
+            return mask
+        if node_type == "or":
+            mask = self.evaluate(node[1][0])
+            for clause in node[1][1:]:
+                mask |= self.evaluate(clause)
+            return mask
+        raise ValueError("unknown query node {}".format(node_type))
+
+    def get_scoring_term_ranges(self, node, negated=False):
+        # terms under a NOT select documents but do not add to their score
+        node_type = node[0]
+        if node_type in ("term", "prefix"):
+            return [] if negated else [self.get_term_range(node[1], prefix=node_type == "prefix")]
+        if node_type == "phrase":
+            return [] if negated else [self.get_term_range(token) for token in node[1]]
+        if node_type == "not":
+            return self.get_scoring_term_ranges(node[1], not negated)
+        if node_type in ("and", "or"):
+            return [term_range for clause in node[1] for term_range in self.get_scoring_term_ranges(clause, negated)]
+        return []
+
+    def score(self, node, mask):
+        # BM25 over title and abstract, every term of a prefix counts as a separate query term
+        scores = np.zeros(len(self.ids))
+        doc_lengths = np.asarray(self.doc_lengths)
+        for first_term, last_term in self.get_scoring_term_ranges(node):
+            for term in range(first_term, last_term):
+                postings, docs = self.get_postings(term, term + 1)
+                inverse_document_frequency = np.log(1 + (len(self.ids) - len(docs) + 0.5) / (len(docs) + 0.5))
+                term_frequencies = np.asarray(self.posting_term_frequencies[postings], dtype=float)
+                length_norm = 1 - BM25_B + BM25_B * doc_lengths[docs] / max(self.average_doc_length, 1e-9)
+                scores[docs] += inverse_document_frequency * term_frequencies * (BM25_K1 + 1) / \
+                    (term_frequencies + BM25_K1 * length_norm)
+        return np.where(mask, scores, 0)
+
+    def search(self, query, limit=None):
+        node = parse_query(query)
+        mask = self.evaluate(node)
+        scores = self.score(node, mask)
+        matches = np.flatnonzero(mask)
+        # best score first, ties keep the export order
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        if limit is not None:
+            matches = matches[:limit]
+        return [(self.ids[doc], float(scores[doc])) for doc in matches]
+
+    def search_ids(self, query, limit=None):
+        return [entry_id for entry_id, _ in self.search(query, limit=limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Building and querying the title and abstract search index')
+    parser.add_argument("--anthology_json_path", type=str)
+    parser.add_argument("--index_dir", type=str, default="",
+                        help="search_index next to the anthology export by default")
+    parser.add_argument("--build", action="store_true", help="(re)build the index from the export")
+    parser.add_argument("--query", type=str, default="", help="e.g. 'reproducib* AND venue:EMNLP year:2021'")
+    parser.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    index_dir = args.index_dir if args.index_dir != "" else get_search_index_dir(args.anthology_json_path)
+
+    if args.build:
+        logging.info("Building Search Index")
+        build_search_index(iter_json_entries(args.anthology_json_path), index_dir)
+
+    if args.query != "":
+        search_index = SearchIndex(index_dir)
+        start_time = time.perf_counter()
+        results = search_index.search(args.query, limit=args.limit)
+        logging.info("Query took {:.1f} ms".format((time.perf_counter() - start_time) * 1000))
+        for entry_id, score in results:
+            print("{}\t{:.3f}".format(entry_id, score))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import json
+import logging
+import re
+
+import numpy as np
+
+from anthology_io import dump_entries, iter_json_entries, strip_compression_extension
+from venues import MAJOR_CONFERENCES_ABBREVIATION_DICT
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+VENUE_CATEGORIES = ["ACL", "EMNLP", "NAACL", "COLING", "LREC", "workshop", "tutorial", "journal", "other"]
+LINK_KEYS = ["PDF", "Code", "Software", "Data"]
+GITHUB_COUNT_KEYS = ["stargazers_count", "forks_count", "open_issues_count"]
+FIRST_YEAR, LAST_YEAR = 1980, 2022
+GENERATION_CHUNK_SIZE = 10000
+
+# booktitle templates per venue category, {year} and {number} (an edition count) are filled in
+VENUE_BOOKTITLES = {
+    "ACL": ["Proceedings of the {number}th Annual Meeting of the Association for Computational Linguistics "
+            "(Volume 1: Long Papers)",
+            "Proceedings of the {number}th Annual Meeting of the Association for Computational Linguistics "
+            "(Volume 2: Short Papers)",
+            "Findings of the Association for Computational Linguistics: ACL {year}"],
+    "EMNLP": ["Proceedings of the {year} Conference on Empirical Methods in Natural Language Processing",
+              "Findings of the Association for Computational Linguistics: EMNLP {year}"],
+    "NAACL": ["Proceedings of the {year} Conference of the North American Chapter of the Association for "
+              "Computational Linguistics: Human Language Technologies"],
+    "COLING": ["Proceedings of the {number}th International Conference on Computational Linguistics"],
+    "LREC": ["Proceedings of the {number}th Language Resources and Evaluation Conference"],
+    "workshop": ["Proceedings of the {number}th Workshop on {topic}",
+                 "Proceedings of the {year} Conference on Empirical Methods in Natural Language Processing: "
+                 "Workshop on {topic}"],
+    "tutorial": ["Proceedings of the {year} Conference on Empirical Methods in Natural Language Processing: "
+                 "Tutorial Abstracts",
+                 "Proceedings of the {number}th Annual Meeting of the Association for Computational Linguistics: "
+                 "Tutorial Abstracts"],
+    "other": ["Proceedings of the {number}th Conference on {topic}",
+              "Proceedings of the {year} International Conference on {topic}"],
+}
+JOURNALS = ["Transactions of the Association for Computational Linguistics", "Computational Linguistics"]
+TOPICS = ["Machine Translation", "Semantic Evaluation", "Argument Mining", "Biomedical Natural Language Processing",
+          "Computational Approaches to Subjectivity and Sentiment", "Representation Learning for NLP",
+          "Natural Language Generation", "Speech and Dialogue", "Multilingual Information Access",
+          "Computational Linguistics and Clinical Psychology", "Noisy User-generated Text", "Question Answering"]
+WORDS = ["neural", "language", "model", "models", "learning", "translation", "semantic", "parsing", "transfer",
+         "multilingual", "low-resource", "evaluation", "dataset", "benchmark", "generation", "dialogue", "knowledge",
+         "graph", "attention", "contrastive", "pretraining", "entity", "relation", "extraction", "summarization",
+         "question", "answering", "reasoning", "robust", "efficient", "cross-lingual", "zero-shot", "few-shot",
+         "representations", "embeddings", "syntax", "morphology", "speech", "sentiment", "classification",
+         "analysis", "towards", "via", "with", "for", "of", "and", "the", "a", "in", "on", "using"]
+GIVEN_NAMES = ["Wei", "Anna", "Mohammad", "Maria", "John", "Yuki", "Sofia", "Ahmed", "Li", "David", "Elena", "Raj",
+               "Chen", "Laura", "Jan", "Fatima", "Thomas", "Mei", "Pedro", "Sara"]
+SURNAMES = ["Zhang", "Smith", "Wang", "Garcia", "M{\\\"u}ller", "Kim", "Nguyen", "Rossi", "Sato", "Patel", "Li",
+            "Novak", "Cohen", "Silva", "Ivanova", "Dubois", "Chen", "Jones", "Papadopoulos", "Yilmaz"]
+GITHUB_STATUS_EXCEPTION = "exception <class 'requests.exceptions.ReadTimeout'>"
+
+
+def get_default_profile():
+    # approximate shape of the anthology around mid 2022, replace with fit_anthology_profile on a real export
+    venue_year_counts = {category: {} for category in VENUE_CATEGORIES}
+    link_probabilities = {key: {} for key in LINK_KEYS}
+    abstract_probabilities = {}
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        total = 200 * np.exp(0.09 * (year - FIRST_YEAR))
+        shares = {"ACL": 0.1, "EMNLP": 0.1 if year >= 1996 else 0,
+                  "NAACL": 0.06 if year >= 2000 and year % 4 != 3 else 0,
+                  "COLING": 0.08 if year % 2 == 0 else 0, "LREC": 0.1 if year >= 1998 and year % 2 == 0 else 0,
+                  "workshop": 0.35 if year >= 1990 else 0.05, "tutorial": 0.005, "journal": 0.04}
+        shares["other"] = 1 - sum(shares.values())
+        for category, share in shares.items():
+            if share > 0:
+                venue_year_counts[category][str(year)] = int(round(total * share))
+
+        link_probabilities["PDF"][str(year)] = 0.98
+        link_probabilities["Code"][str(year)] = 0.6 / (1 + np.exp(-0.6 * (year - 2018))) if year >= 2010 else 0
+        link_probabilities["Software"][str(year)] = 0.02 if year >= 2005 else 0
+        link_probabilities["Data"][str(year)] = 0.03 if year >= 2015 else 0
+        abstract_probabilities[str(year)] = 0.8 if year >= 2019 else 0.3 if year >= 2010 else 0.05
+
+    return {
+        "venue_year_counts": venue_year_counts,
+        "link_probabilities": link_probabilities,
+        "abstract_probabilities": abstract_probabilities,
+        "acl_status_weights": {"success": 0.97, "error 404": 0.02, "missing": 0.01},
+        "github_url_probability": 0.85,
+        "github_status_weights": {"success": 0.9, "error 404": 0.08, GITHUB_STATUS_EXCEPTION: 0.02},
+        # mean and standard deviation of log1p(count) of the successfully requested repositories
+        "github_log_count_parameters": {"stargazers_count": [2.5, 1.6], "forks_count": [1.5, 1.3],
+                                        "open_issues_count": [0.7, 0.9]},
+    }
+
+
+def get_venue_category(entry):
+    if "booktitle" not in entry:
+        return "journal" if "journal" in entry else "other"
+    booktitle = entry["booktitle"].replace("{", "").replace("}", "")
+    lower_booktitle = booktitle.lower()
+    if "workshop" in lower_booktitle:
+        return "workshop"
+    if "tutorial" in lower_booktitle:
+        return "tutorial"
+    for conference_full_name, conference in MAJOR_CONFERENCES_ABBREVIATION_DICT.items():
+        if conference_full_name in booktitle:
+            return conference
+    return "other"
+
+
+def get_status_weights(counts):
+    total = sum(counts.values())
+    return {status: count / total for status, count in counts.items()} if total > 0 else {}
+
+
+def fit_anthology_profile(acl_entries):
+    profile = get_default_profile()
+    venue_year_counts = {category: {} for category in VENUE_CATEGORIES}
+    link_counts = {key: {} for key in LINK_KEYS}
+    abstract_counts, year_counts = {}, {}
+    acl_status_counts, github_status_counts = {}, {}
+    github_url_count, code_count = 0, 0
+    log_counts = {key: [] for key in GITHUB_COUNT_KEYS}
+
+    for entry in acl_entries:
+        year = str(int(entry["year"]))
+        category_counts = venue_year_counts[get_venue_category(entry)]
+        category_counts[year] = category_counts.get(year, 0) + 1
+        year_counts[year] = year_counts.get(year, 0) + 1
+        for key in LINK_KEYS:
+            if key in entry:
+                link_counts[key][year] = link_counts[key].get(year, 0) + 1
+        if "abstract" in entry:
+            abstract_counts[year] = abstract_counts.get(year, 0) + 1
+        if "acl_status" in entry:
+            acl_status_counts[entry["acl_status"]] = acl_status_counts.get(entry["acl_status"], 0) + 1
+        if "Code" in entry:
+            code_count += 1
+            if "github.com/" in entry["Code"]:
+                github_url_count += 1
+                status = entry.get("github_status", "missing")
+                github_status_counts[status] = github_status_counts.get(status, 0) + 1
+        if entry.get("github_status") == "success":
+            for key in GITHUB_COUNT_KEYS:
+                if isinstance(entry.get(key), int):
+                    log_counts[key].append(np.log1p(entry[key]))
+
+    profile["venue_year_counts"] = venue_year_counts
+    profile["link_probabilities"] = {key: {year: counts.get(year, 0) / year_count
+                                           for year, year_count in year_counts.items()}
+                                     for key, counts in link_counts.items()}
+    profile["abstract_probabilities"] = {year: abstract_counts.get(year, 0) / year_count
+                                         for year, year_count in year_counts.items()}
+    if len(acl_status_counts) > 0:
+        profile["acl_status_weights"] = get_status_weights(acl_status_counts)
+    if code_count > 0:
+        profile["github_url_probability"] = github_url_count / code_count
+    if len(github_status_counts) > 0:
+        profile["github_status_weights"] = get_status_weights(github_status_counts)
+    for key, values in log_counts.items():
+        if len(values) > 1:
+            profile["github_log_count_parameters"][key] = [float(np.mean(values)), float(np.std(values))]
+    return profile
+
+
+def get_venue_year_table(profile):
+    venue_years = [(category, int(year), count)
+                   for category, year_counts in profile["venue_year_counts"].items()
+                   for year, count in year_counts.items() if count > 0]
+    counts = np.array([count for _, _, count in venue_years], dtype=float)
+    return [(category, year) for category, year, _ in venue_years], counts / counts.sum()
+
+
+def choose_weighted(rng, weights, size):
+    keys = list(weights.keys())
+    probabilities = np.array(list(weights.values()), dtype=float)
+    return [keys[i] for i in rng.choice(len(keys), size=size, p=probabilities / probabilities.sum())]
+
+
+def format_github_date(seconds):
+    return np.datetime_as_string(np.datetime64(int(seconds), "s"), unit="s") + "Z"
+
+
+def get_name_slug(name):
+    return re.sub(r"[^a-z]", "", name.lower())
+
+
+def get_booktitle(rng, category, year):
+    template = VENUE_BOOKTITLES[category][rng.integers(len(VENUE_BOOKTITLES[category]))]
+    if template.startswith("Findings") and year < 2020:
+        template = VENUE_BOOKTITLES[category][0]
+    return template.format(year=year, number=max(year - 1962, 1), topic=TOPICS[rng.integers(len(TOPICS))])
+
+
+def get_entry_url(category, year, index):
+    if year >= 2020:
+        return "https://aclanthology.org/{}.{}.{}".format(year, category.lower(), index)
+    return "https://aclanthology.org/{}{:02d}-{}{:03d}".format(category[0].upper(), year % 100, index // 1000 + 1,
+                                                               index % 1000)
+
+
+def iter_synthetic_entries(size, profile=None, seed=0, abstract_pool_size=1000):
+    profile = profile if profile is not None else get_default_profile()
+    rng = np.random.default_rng(seed)
+    venue_years, venue_year_probabilities = get_venue_year_table(profile)
+    words = np.array(WORDS)
+    # titles and abstracts are drawn from a fixed pool, their content does not matter, only their sizes
+    abstract_pool = [" ".join(rng.choice(words, size=rng.integers(80, 200))) for _ in range(abstract_pool_size)]
+
+    for chunk_start in range(0, size, GENERATION_CHUNK_SIZE):
+        chunk_size = min(GENERATION_CHUNK_SIZE, size - chunk_start)
+        venue_year_indices = rng.choice(len(venue_years), size=chunk_size, p=venue_year_probabilities)
+        acl_statuses = choose_weighted(rng, profile["acl_status_weights"], chunk_size)
+        github_statuses = choose_weighted(rng, profile["github_status_weights"], chunk_size)
+        uniform = rng.random((chunk_size, len(LINK_KEYS) + 2))
+        author_counts = rng.integers(1, 7, size=chunk_size)
+
+        for i in range(chunk_size):
+            index = chunk_start + i
+            category, year = venue_years[venue_year_indices[i]]
+            authors = [(SURNAMES[rng.integers(len(SURNAMES))], GIVEN_NAMES[rng.integers(len(GIVEN_NAMES))])
+                       for _ in range(author_counts[i])]
+            title_words = rng.choice(words, size=rng.integers(5, 12))
+            entry = {
+                "ENTRYTYPE": "article" if category == "journal" else "inproceedings",
+                "ID": "{}-etal-{}-{}-{}".format(get_name_slug(authors[0][0]), year, title_words[0], index),
+                "title": " ".join(title_words).capitalize(),
+                "author": " and ".join("{}, {}".format(surname, given_name) for surname, given_name in authors),
+                "year": str(year),
+                "month": "jul",
+                "address": "Online" if year in (2020, 2021) else "Dublin, Ireland",
+                "publisher": "Association for Computational Linguistics",
+                "pages": "{}--{}".format(index % 1000 + 1, index % 1000 + 12),
+            }
+            if category == "journal":
+                entry["journal"] = JOURNALS[index % len(JOURNALS)]
+            else:
+                entry["booktitle"] = get_booktitle(rng, category, year)
+            if uniform[i, -1] < profile["abstract_probabilities"].get(str(year), 0):
+                entry["abstract"] = abstract_pool[index % abstract_pool_size]
+
+            acl_status = acl_statuses[i]
+            entry["url"] = get_entry_url(category, year, index) if acl_status != "missing" else \
+                "https://www.isca-speech.org/archive/{}/{}.html".format(year, index)
+            entry["acl_status"] = acl_status
+            if acl_status == "success":
+                for j, key in enumerate(LINK_KEYS):
+                    if uniform[i, j] < profile["link_probabilities"][key].get(str(year), 0):
+                        entry[key] = entry["url"] + "." + key.lower()
+                if "Code" in entry:
+                    if uniform[i, -2] < profile["github_url_probability"]:
+                        entry["Code"] = "https://github.com/{}/{}-{}".format(get_name_slug(authors[0][0]),
+                                                                             title_words[0], index)
+                        add_github_fields(rng, entry, github_statuses[i], year, profile)
+                    else:
+                        entry["Code"] = "https://gitlab.com/{}/code-{}".format(authors[0][1].lower(), index)
+            yield entry
+
+
+def add_github_fields(rng, entry, github_status, year, profile):
+    entry["github_status"] = github_status
+    if github_status != "success":
+        return entry
+    for key in GITHUB_COUNT_KEYS:
+        mean, std = profile["github_log_count_parameters"][key]
+        entry[key] = int(np.expm1(max(rng.normal(mean, std), 0)))
+    # repositories are created around the paper's year and pushed to for a while after
+    created_at = (np.datetime64("{}-01-01".format(year), "s") - np.datetime64(0, "s")).astype(int) + \
+        int(rng.uniform(-180, 365) * 86400)
+    pushed_at = created_at + int(rng.exponential(200) * 86400)
+    updated_at = pushed_at + int(rng.exponential(100) * 86400)
+    entry["created_at"] = format_github_date(created_at)
+    entry["pushed_at"] = format_github_date(pushed_at)
+    entry["updated_at"] = format_github_date(updated_at)
+    return entry
+
+
+def generate_synthetic_anthology(export_path, size, profile=None, seed=0):
+    export_format = "jsonl" if strip_compression_extension(export_path).endswith(".jsonl") else "json"
+    dump_entries(export_path, iter_synthetic_entries(size, profile=profile, seed=seed), export_format=export_format)
+    return export_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generating synthetic anthology exports for benchmarks')
+    parser.add_argument("--export_path", type=str, default="data/synthetic_anthology.json",
+                        help=".json or .jsonl, optionally .gz or .zst compressed")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reference_json_path", type=str, default="",
+                        help="fit the venue, link and GitHub distributions to a real anthology export")
+    parser.add_argument("--profile_path", type=str, default="", help="also write the distributions used as JSON")
+
+    args = parser.parse_args()
+
+    profile = None
+    if args.reference_json_path != "":
+        logging.info("Fitting profile to {}".format(args.reference_json_path))
+        profile = fit_anthology_profile(iter_json_entries(args.reference_json_path))
+    if args.profile_path != "":
+        with open(args.profile_path, "w") as f:
+            json.dump(profile if profile is not None else get_default_profile(), f, indent=1)
+
+    logging.info("Generating {} entries".format(args.size))
+    generate_synthetic_anthology(args.export_path, args.size, profile=profile, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import json
+import pickle
+
+from anthology_entry import AnthologyEntry
+from anthology_io import dump_entries, load_entries
+
+# bibtexparser puts ENTRYTYPE and ID last, crawled keys and the suffixed overflow keys follow
+BIB_ENTRY = {"title": "A Paper", "author": "Doe, Jane", "booktitle": "Proceedings of ACL", "year": "2021",
+             "url": "https://aclanthology.org/2021.acl-long.1", "ENTRYTYPE": "inproceedings", "ID": "doe-2021-paper"}
+
+
+def get_crawled_entry():
+    entry = dict(BIB_ENTRY)
+    entry.update({"PDF": "https://aclanthology.org/2021.acl-long.1.pdf", "Code": "https://github.com/a/b",
+                  "Code_1": "https://github.com/a/c", "acl_status": "success", "stargazers_count": 3,
+                  "github_status": "success"})
+    return entry
+
+
+def test_keys_keep_insertion_order():
+    entry_dict = get_crawled_entry()
+    entry = AnthologyEntry.from_dict(entry_dict)
+    assert list(entry) == list(entry_dict)
+    assert entry.to_dict() == entry_dict
+    assert len(entry) == len(entry_dict)
+
+
+def test_delete_and_reinsert_moves_key_to_the_end():
+    entry_dict, entry = get_crawled_entry(), AnthologyEntry.from_dict(get_crawled_entry())
+    for key in ["title", "Code_1"]:
+        del entry_dict[key]
+        del entry[key]
+    entry_dict["title"] = entry["title"] = "A Better Title"
+    assert list(entry) == list(entry_dict)
+    assert "Code_1" not in entry
+
+
+def test_entries_with_the_same_keys_share_the_key_order():
+    first, second = AnthologyEntry.from_dict(BIB_ENTRY), AnthologyEntry.from_dict(dict(BIB_ENTRY, ID="other"))
+    assert first._keys is second._keys
+
+
+def test_dump_matches_dicts(tmp_path):
+    entry_dicts = [get_crawled_entry(), dict(BIB_ENTRY)]
+    dict_path, entry_path = tmp_path / "dicts.json", tmp_path / "entries.json"
+    with open(dict_path, "w") as f:
+        json.dump(entry_dicts, f)
+    entries = load_entries(str(dict_path), object_hook=AnthologyEntry.from_dict)
+    dump_entries(str(entry_path), entries)
+    assert entry_path.read_bytes() == dict_path.read_bytes()
+
+
+def test_pickle_keeps_order():
+    entry = AnthologyEntry.from_dict(get_crawled_entry())
+    assert list(pickle.loads(pickle.dumps(entry))) == list(entry)
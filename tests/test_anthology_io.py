@@ -0,0 +1,35 @@
+import os
+
+from anthology_io import dump_entries, find_export_file, load_entries
+from process_anthology import export_acl
+
+ENTRIES = [{"ID": "a", "year": "2021"}, {"ID": "b", "year": "2022"}]
+
+
+def write_export(file_path, entries, modification_time):
+    dump_entries(str(file_path), entries, export_format="jsonl" if ".jsonl" in file_path.name else "json")
+    os.utime(file_path, (modification_time, modification_time))
+
+
+def test_find_export_file_prefers_the_requested_format(tmp_path):
+    write_export(tmp_path / "anthology.json", ENTRIES[:1], 1000)
+    write_export(tmp_path / "anthology.json.gz", ENTRIES, 2000)
+    write_export(tmp_path / "anthology.jsonl", ENTRIES, 3000)
+    assert find_export_file(str(tmp_path), export_format="json", compression="gzip") == \
+        str(tmp_path / "anthology.json.gz")
+    assert find_export_file(str(tmp_path), export_format="json", compression="none") == str(tmp_path / "anthology.json")
+    # without a matching file (or a request) the newest export is resumed
+    assert find_export_file(str(tmp_path), export_format="jsonl", compression="gzip") == \
+        str(tmp_path / "anthology.jsonl")
+    assert find_export_file(str(tmp_path)) == str(tmp_path / "anthology.jsonl")
+    assert find_export_file(str(tmp_path / "missing")) is None
+
+
+def test_export_removes_the_other_formats(tmp_path):
+    write_export(tmp_path / "anthology.json", ENTRIES[:1], 1000)
+    (tmp_path / "anthology.csv").write_text("")
+    (tmp_path / "anthology.bib.json").write_text("[]")
+    export_acl(str(tmp_path), ENTRIES, compression="gzip")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["anthology.bib.json", "anthology.csv.gz",
+                                                                 "anthology.json.gz"]
+    assert load_entries(find_export_file(str(tmp_path))) == ENTRIES
@@ -0,0 +1,25 @@
+from author_index import AuthorIndex, build_author_index
+
+ENTRIES = [
+    {"ID": "a-2021", "author": "Doe, Jane and Roe, Richard", "year": "2021", "Code": "https://github.com/a/b"},
+    {"ID": "b-2021", "author": "Doe, Jane", "year": "2021"},
+    {"ID": "c-2019", "author": "Roe, Richard", "year": "2019", "Code": "https://github.com/c/d"},
+    # no year in the bib entry
+    {"ID": "d-missing", "author": "Doe, Jane"},
+]
+
+
+def test_author_rates_by_year_with_a_missing_year(tmp_path):
+    author_index = AuthorIndex(build_author_index(ENTRIES, str(tmp_path / "author_index")))
+    rates_df = author_index.get_author_rates(by_year=True)
+    rates = {(row.author, row.year): (row.papers, row.papers_with_code) for row in rates_df.itertuples()}
+    assert rates == {("Jane Doe", 0): (1, 0), ("Jane Doe", 2021): (2, 1),
+                     ("Richard Roe", 2019): (1, 1), ("Richard Roe", 2021): (1, 1)}
+
+
+def test_author_rates_without_years(tmp_path):
+    author_index = AuthorIndex(build_author_index(ENTRIES, str(tmp_path / "author_index")))
+    rates_df = author_index.get_author_rates(min_papers=2)
+    assert rates_df.to_dict("records") == [
+        {"author": "Jane Doe", "papers": 3, "papers_with_code": 1, "code_ratio": 1 / 3},
+        {"author": "Richard Roe", "papers": 2, "papers_with_code": 2, "code_ratio": 1.0}]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohort_filters import EntryTable
+
+ENTRIES = [
+    {"ID": "a", "ENTRYTYPE": "inproceedings", "year": 2021, "conference": "EMNLP",
+     "booktitle": "Proceedings of the 2021 Conference on Empirical Methods in Natural Language Processing",
+     "Code": "https://github.com/a/b"},
+    # a bib entry before preprocessing, the venue comes from its booktitle
+    {"ID": "b", "ENTRYTYPE": "inproceedings", "year": 2020,
+     "booktitle": "Proceedings of the 58th Annual Meeting of the Association for Computational Linguistics"},
+    {"ID": "c", "ENTRYTYPE": "inproceedings", "year": 2021,
+     "booktitle": "Proceedings of the Workshop on Annual Meeting of the Association for Computational Linguistics"},
+    {"ID": "d", "ENTRYTYPE": "article", "year": 2019, "journal": "Computational Linguistics"},
+]
+COHORTS = {"major": "venue in {ACL,EMNLP} & !workshop", "acl": "venue==ACL", "code": "has:Code & year>2020"}
+
+
+@pytest.mark.parametrize("entries", [ENTRIES, pd.DataFrame(ENTRIES)])
+def test_venue_falls_back_to_the_booktitle(entries):
+    masks = EntryTable(entries).evaluate_all(COHORTS)
+    assert {name: mask.tolist() for name, mask in masks.items()} == {"major": [True, True, False, False],
+                                                                      "acl": [False, True, False, False],
+                                                                      "code": [True, False, False, False]}
+
+
+def test_frame_venue_uses_get_venue():
+    def get_journal_venue(entry):
+        return entry.get("journal", "proceedings")
+
+    mask = EntryTable(pd.DataFrame(ENTRIES), get_venue=get_journal_venue).evaluate("venue==proceedings")
+    assert mask.tolist() == [True, True, True, False]
+
+
+def test_cached_masks_are_read_only():
+    entry_table = EntryTable(ENTRIES)
+    mask = entry_table.evaluate("year>2019")
+    with pytest.raises(ValueError):
+        mask &= np.zeros(len(ENTRIES), dtype=bool)
+    assert entry_table.evaluate("year>2019").tolist() == [True, True, True, False]
@@ -0,0 +1,82 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from cv import C4_TABLE_MAX_SAMPLE_SIZE, PrecisionAccumulator, export_precision_results, get_c4, get_precision_results, \
+    get_precision_results_batch
+
+MEASUREMENTS = [84.51, 84.5, 87.46, 85.6, 84.2, 86.61, 86.2, 84.51, 86.53, 88.81]
+
+
+def get_exact_c4(sample_size):
+    return math.sqrt(2 / (sample_size - 1)) * math.exp(math.lgamma(sample_size / 2) -
+                                                       math.lgamma((sample_size - 1) / 2))
+
+
+@pytest.mark.parametrize("sample_size", [2, 3, 4, 5, 10, 30, C4_TABLE_MAX_SAMPLE_SIZE - 1, C4_TABLE_MAX_SAMPLE_SIZE,
+                                         C4_TABLE_MAX_SAMPLE_SIZE + 1, 500, 10_000, 1_000_000])
+def test_c4_matches_gamma_formula(sample_size):
+    assert get_c4(sample_size) == pytest.approx(get_exact_c4(sample_size), rel=1e-9, abs=0)
+
+
+def test_c4_small_sample_sizes_with_gamma():
+    for sample_size in range(2, 20):
+        exact = math.sqrt(2 / (sample_size - 1)) * math.gamma(sample_size / 2) / math.gamma((sample_size - 1) / 2)
+        assert get_c4(sample_size) == pytest.approx(exact, rel=1e-12)
+    assert np.isnan(get_c4([0, 1])).all()
+
+
+def test_scalar_and_batch_results_agree():
+    measurement_sets = [MEASUREMENTS, [30.65, 30.65, 29.13, 30.65, 29.96], [31.11, 30.28]]
+    batch_results = get_precision_results_batch(measurement_sets)
+    for i, measurements in enumerate(measurement_sets):
+        results = get_precision_results(measurements)
+        for column in ["sample size", "mean", "unbiased stdev", "CV*"]:
+            assert results[column] == pytest.approx(batch_results[column].iloc[i])
+        assert results["stdev 95% CI"] == batch_results["stdev 95% CI"].iloc[i]
+
+
+def test_accumulator_merge_matches_batch():
+    first = PrecisionAccumulator(track_values=True)
+    for measurement in MEASUREMENTS[:4]:
+        first.update(measurement)
+    second = PrecisionAccumulator(track_values=True).update_many(MEASUREMENTS[4:])
+    results = first.merge(second).get_precision_results()
+    expected = get_precision_results_batch([MEASUREMENTS]).iloc[0]
+    assert results["CV*"] == pytest.approx(expected["CV*"])
+    assert results["% within one standard deviation"] == pytest.approx(expected["% within one standard deviation"])
+
+
+def test_failed_merge_keeps_state():
+    accumulator = PrecisionAccumulator(track_values=True).update_many([1.0, 2.0, 3.0])
+    state = accumulator.to_state()
+    with pytest.raises(ValueError):
+        accumulator.merge(PrecisionAccumulator().update_many([10.0, 11.0]))
+    assert accumulator.to_state() == state
+
+
+def test_state_size_is_bounded():
+    measurements = np.random.default_rng(0).normal(100, 5, 50_000)
+    accumulator = PrecisionAccumulator(track_values=True, max_values=256)
+    for chunk in np.array_split(measurements, 10):
+        accumulator.merge(PrecisionAccumulator(track_values=True, max_values=256).update_many(chunk))
+    state = accumulator.to_state()
+    assert accumulator.sample_size == len(measurements)
+    assert len(state["values"]) == 256
+    assert "values" not in PrecisionAccumulator().update_many(measurements).to_state()
+    restored = PrecisionAccumulator.from_state(json.loads(json.dumps(state)))
+    assert restored.get_precision_results()["CV*"] == pytest.approx(accumulator.get_precision_results()["CV*"])
+
+
+def test_latex_export_header_row(tmp_path):
+    results_df = get_precision_results_batch([MEASUREMENTS, [30.65, 30.65, 29.13]])
+    results_df.insert(0, "paper_id", ["a", "b"])
+    output_path = tmp_path / "cv.tex"
+    export_precision_results(results_df, str(output_path), "latex")
+    lines = output_path.read_text().splitlines()
+    header_row = lines[lines.index("\\toprule") + 1]
+    assert header_row.endswith("\\\\")
+    assert "95\\% CI" in header_row
+    assert "paper\\_id" in header_row
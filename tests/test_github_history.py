@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from github_history import get_repository_states, is_refresh_due
+
+URL = "https://api.github.com/repos/acl/repository"
+NOW = datetime(2022, 6, 2, 12, tzinfo=timezone.utc)
+
+
+def get_state(*records):
+    return get_repository_states([dict(record, url=URL) for record in records])[URL]
+
+
+def is_due(state, now=NOW):
+    return is_refresh_due(state, now, refresh_days=1, stale_refresh_days=30, stale_after_days=365, retry_hours=1)
+
+
+def test_failed_check_keeps_the_last_successful_check_time():
+    state = get_state({"checked_at": "2022-06-01T00:00:00Z", "status": "success", "values": {"forks_count": 1}},
+                      {"checked_at": "2022-06-02T11:30:00Z", "status": "error 502"})
+    assert state["checked_at"] == "2022-06-01T00:00:00Z"
+    assert state["failed_at"] == "2022-06-02T11:30:00Z"
+    assert state["values"] == {"forks_count": 1}
+
+
+def test_failed_check_is_retried_after_the_retry_delay():
+    state = get_state({"checked_at": "2022-06-02T11:30:00Z", "status": "exception <class 'TimeoutError'>"})
+    assert not is_due(state)
+    assert is_due(state, now=datetime(2022, 6, 2, 12, 30, tzinfo=timezone.utc))
+
+
+def test_not_modified_counts_as_a_check():
+    state = get_state({"checked_at": "2022-06-01T00:00:00Z", "status": "error 500"},
+                      {"checked_at": "2022-06-02T00:00:00Z", "status": "not modified"})
+    assert "failed_at" not in state
+    assert not is_due(state)
+    assert is_due(state, now=datetime(2022, 6, 3, tzinfo=timezone.utc))
@@ -0,0 +1,98 @@
+import csv
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from link_health import check_links, export_link_health, get_link_health, parse_host_limit
+
+
+class StandInLinkServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInLinkHandler)
+        self.request_times = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+
+class StandInLinkHandler(BaseHTTPRequestHandler):
+    # /paper-N.pdf answers, /missing is gone, /old redirects, /no-head only answers a ranged GET
+    def answer(self, with_body):
+        with self.server.lock:
+            self.server.request_times.append(time.monotonic())
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/paper-1.pdf")
+        elif self.path == "/missing":
+            self.send_response(404)
+        elif self.path == "/no-head" and not with_body:
+            self.send_response(405)
+        elif self.path == "/no-head":
+            self.send_response(206 if self.headers.get("Range") == "bytes=0-0" else 200)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.answer(False)
+
+    def do_GET(self):
+        self.answer(True)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    servers = [StandInLinkServer(), StandInLinkServer()]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_link_statuses_and_export(servers, tmp_path):
+    base_url = servers[0].base_url
+    acl_entries = [{"ID": "a", "PDF": base_url + "/paper-1.pdf", "Code": base_url + "/old"},
+                   {"ID": "b", "Data": base_url + "/missing " + base_url + "/no-head", "title": base_url + "/x"}]
+    links = get_link_health(acl_entries, max_workers=4, rate_per_host=100, timeout=5)
+    results = {link["url"][len(base_url):]: (link["key"], link["status"], link["status_code"]) for link in links}
+    assert results == {"/paper-1.pdf": ("PDF", "success", 200), "/old": ("Code", "success", 200),
+                       "/missing": ("Data", "error 404", 404), "/no-head": ("Data", "success", 206)}
+    assert next(link for link in links if link["url"].endswith("/old"))["final_url"] == base_url + "/paper-1.pdf"
+
+    export_link_health(str(tmp_path), links)
+    with open(tmp_path / "link_health.csv") as f:
+        assert len(list(csv.DictReader(f))) == 4
+    assert [path.name for path in tmp_path.iterdir()] == ["link_health.csv"]
+
+
+def test_hosts_are_rate_limited_separately(servers):
+    slow_server, fast_server = servers
+    urls = ["{}/paper-{}.pdf".format(server.base_url, i) for i in range(6) for server in servers]
+    # the slow host may send one request every 0.1 s, the fast one has its own limit
+    start_time = time.monotonic()
+    url_results = check_links(urls, max_workers=8, rate_per_host=10, burst_per_host=1, max_in_flight_per_host=1,
+                              host_limits={fast_server.base_url[len("http://"):]: (1000, 4)})
+    assert all(result["status"] == "success" for result in url_results.values())
+    assert time.monotonic() - start_time >= 0.45
+    # 6 requests at 10 per second without a burst are spread over 0.5 s, less a little network jitter
+    assert slow_server.request_times[-1] - slow_server.request_times[0] >= 0.4
+    assert fast_server.request_times[-1] - fast_server.request_times[0] < 0.3
+
+
+def test_parse_host_limit():
+    assert parse_host_limit("ACLanthology.org=25,16") == ("aclanthology.org", (25.0, 16))
+    assert parse_host_limit("github.com=0.5") == ("github.com", (0.5, 2))
+    with pytest.raises(ValueError):
+        parse_host_limit("github.com")
@@ -0,0 +1,39 @@
+from parallel_bib import get_entry_starts, parse_bib_text, parse_bib_text_parallel
+
+ENTRY = """@inproceedings{{paper-{0},
+    title = "Paper {0}",
+    booktitle = {1},
+    month = {2},
+    year = "2021",
+    abstract = {{A first line
+@inproceedings{{not-an-entry, in the abstract of paper {0}
+}}}},
+}}
+"""
+
+
+def get_bib_text(size):
+    # the macro is defined half way through the file, the entries after it use it
+    bib_text = ""
+    for i in range(size):
+        if i == size // 2:
+            bib_text += '@string{acl = "Annual Meeting of the Association for Computational Linguistics"}\n\n'
+        booktitle = "acl" if i > size // 2 else '"Workshop {}"'.format(i)
+        bib_text += ENTRY.format(i, booktitle, ["jan", "jun", "dec"][i % 3]) + "\n"
+    return bib_text
+
+
+def test_line_start_at_sign_in_an_abstract_does_not_start_an_entry():
+    entry_starts = get_entry_starts(get_bib_text(4))
+    assert [entry_type for _, entry_type in entry_starts] == ["inproceedings"] * 2 + ["string"] + ["inproceedings"] * 2
+
+
+def test_parallel_parse_matches_a_single_pass():
+    bib_text = get_bib_text(40)
+    reference_entries = parse_bib_text(bib_text)
+    assert len(reference_entries) == 40
+    assert reference_entries[-1]["booktitle"] == "Annual Meeting of the Association for Computational Linguistics"
+    assert reference_entries[0]["month"] == "January"
+    assert "@inproceedings{not-an-entry" in reference_entries[0]["abstract"]
+    for workers in [2, 3]:
+        assert parse_bib_text_parallel(bib_text, workers=workers) == reference_entries
@@ -0,0 +1,152 @@
+import concurrent.futures
+import json
+import sys
+import threading
+
+import process_anthology
+from process_anthology import ConcurrencyController, get_acl_information, get_acl_information_by_volume, \
+    parse_volume_page
+
+VOLUME_ROW = '<p class="d-sm-flex"><strong><a href="/{0}/">A Paper</a></strong>' \
+             '<a class="badge" href="/{0}.pdf">pdf</a></p>'
+PAPER_PAGE = '<div class="acl-paper-link-block"><a href="https://aclanthology.org/{0}.pdf">PDF</a></div>'
+
+
+class StandInResponse:
+    def __init__(self, status_code, content=b"", json_content=None):
+        self.status_code = status_code
+        self.content = content
+        self.json_content = json_content
+
+    def json(self):
+        return self.json_content
+
+
+class StandInAnthology:
+    """Volume and paper pages, a page answers with the statuses in page_statuses before its content."""
+
+    def __init__(self, volume_papers, page_statuses):
+        self.volume_papers = volume_papers
+        self.page_statuses = page_statuses
+        self.requested_urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None):
+        with self.lock:
+            self.requested_urls.append(url)
+        if url.endswith("/rate_limit"):
+            return StandInResponse(200, json_content={"rate": {"remaining": 100, "reset": 0}})
+        anthology_id = url.rstrip("/").split("/")[-1]
+        with self.lock:
+            statuses = self.page_statuses.get(anthology_id, [])
+            status = statuses.pop(0) if len(statuses) > 0 else 200
+        if status != 200:
+            return StandInResponse(status)
+        if "/volumes/" not in url:
+            return StandInResponse(200, PAPER_PAGE.format(anthology_id).encode("utf-8"))
+        rows = "".join(VOLUME_ROW.format(paper_id) for paper_id in self.volume_papers[anthology_id])
+        return StandInResponse(200, rows.encode("utf-8"))
+
+    def count(self, url_part):
+        return sum(1 for url in self.requested_urls if url_part in url)
+
+
+def get_entries(anthology_ids):
+    return [{"ID": anthology_id, "url": "https://aclanthology.org/{}/".format(anthology_id)}
+            for anthology_id in anthology_ids]
+
+
+def test_volume_badges_are_keyed_by_their_text():
+    volume_page = '<p class="d-sm-flex"><strong><a href="/2021.acl-long.1/">A Paper</a></strong>' \
+                  '<a class="badge" href="/2021.acl-long.1.pdf">pdf</a>' \
+                  '<a class="badge" href="https://github.com/acl/code">code</a>' \
+                  '<a class="badge" href="https://github.com/acl/data">data</a></p>' \
+                  '<p class="d-sm-flex"><strong><a href="/2021.acl-long.2/">Another Paper</a></strong>' \
+                  '<a class="badge" href="https://github.com/acl/software">Software</a>' \
+                  '<a class="badge" href="https://paperswithcode.com/paper/another">pwc</a></p>'
+    paper_links = parse_volume_page(volume_page, "https://aclanthology.org/volumes/2021.acl-long/")
+    assert paper_links == {"2021.acl-long.1": [("PDF", "https://aclanthology.org/2021.acl-long.1.pdf"),
+                                               ("Code", "https://github.com/acl/code"),
+                                               ("Data", "https://github.com/acl/data")]}
+
+
+def test_overloaded_volume_pages_are_retried_instead_of_split(monkeypatch):
+    anthology = StandInAnthology(
+        volume_papers={"2021.acl-long": ["2021.acl-long.1", "2021.acl-long.2"], "2021.naacl-main": []},
+        # acl-long recovers after one overloaded answer, naacl-main stays overloaded, emnlp-main does not exist
+        page_statuses={"2021.acl-long": [503], "2021.naacl-main": [503, 429, 503], "2021.emnlp-main": [404]})
+    monkeypatch.setattr(process_anthology.requests, "get", anthology.get)
+    acl_entries = get_entries(["2021.acl-long.1", "2021.acl-long.2", "2021.acl-long.3", "2021.emnlp-main.1",
+                               "2021.naacl-main.1", "2021.naacl-main.2"])
+
+    get_acl_information_by_volume(acl_entries, controller=ConcurrencyController(max_limit=4), retries=2,
+                                  retry_delay=0)
+    statuses = {entry["ID"]: entry["acl_status"] for entry in acl_entries}
+    assert statuses == {"2021.acl-long.1": "success", "2021.acl-long.2": "success", "2021.acl-long.3": "success",
+                        "2021.emnlp-main.1": "success", "2021.naacl-main.1": "error 503",
+                        "2021.naacl-main.2": "error 503"}
+    assert anthology.count("/volumes/2021.acl-long/") == 2
+    assert anthology.count("/volumes/2021.naacl-main/") == 3
+    # paper pages only for the paper missing from its volume page and the volume that does not exist
+    assert sorted(url for url in anthology.requested_urls if "/volumes/" not in url) == \
+        ["https://aclanthology.org/2021.acl-long.3/", "https://aclanthology.org/2021.emnlp-main.1/"]
+
+
+def test_overloaded_paper_pages_are_retried(monkeypatch):
+    anthology = StandInAnthology(volume_papers={},
+                                 page_statuses={"2021.acl-long.1": [429], "2021.acl-long.2": [503, 503, 503],
+                                                "2021.acl-long.3": [404]})
+    monkeypatch.setattr(process_anthology.requests, "get", anthology.get)
+    acl_entries = get_entries(["2021.acl-long.1", "2021.acl-long.2", "2021.acl-long.3", "2021.acl-long.4"])
+
+    get_acl_information(acl_entries, controller=ConcurrencyController(max_limit=4), retries=2, retry_delay=0)
+    statuses = {entry["ID"]: entry["acl_status"] for entry in acl_entries}
+    assert statuses == {"2021.acl-long.1": "success", "2021.acl-long.2": "error 503",
+                        "2021.acl-long.3": "error 404", "2021.acl-long.4": "success"}
+    assert [anthology.count("/2021.acl-long.{}/".format(i)) for i in range(1, 5)] == [2, 3, 1, 1]
+
+
+def test_fixed_concurrency_sets_the_pool_size_by_volume(monkeypatch, tmp_path):
+    anthology = StandInAnthology(volume_papers={"2021.acl-long": ["2021.acl-long.1"]}, page_statuses={})
+    monkeypatch.setattr(process_anthology.requests, "get", anthology.get)
+    pool_sizes = []
+
+    class RecordingThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+        def __init__(self, max_workers=None, *args, **kwargs):
+            pool_sizes.append(max_workers)
+            super().__init__(max_workers, *args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ThreadPoolExecutor", RecordingThreadPoolExecutor)
+    with open(tmp_path / "anthology.json", "w") as f:
+        json.dump(get_entries(["2021.acl-long.1", "2021.acl-long.2"]), f)
+    monkeypatch.setattr(sys, "argv", ["process_anthology.py", "--anthology_path", str(tmp_path / "anthology.bib"),
+                                      "--export_dir", str(tmp_path), "--by_volume", "--fixed_concurrency", "3"])
+
+    process_anthology.main()
+    # the volume pages and the paper pages of the papers missing from them
+    assert pool_sizes == [3, 3]
+    assert anthology.count("/volumes/") == 1
+    assert anthology.count("/2021.acl-long.2/") == 1
+
+
+def test_include_keeps_the_entries_that_were_not_selected(monkeypatch, tmp_path):
+    anthology = StandInAnthology(volume_papers={}, page_statuses={})
+    monkeypatch.setattr(process_anthology.requests, "get", anthology.get)
+    acl_entries = get_entries(["2019.acl-long.1", "2020.acl-long.1", "2021.acl-long.1", "2022.acl-long.1"])
+    for entry in acl_entries:
+        entry["year"] = entry["ID"][:4]
+    acl_entries[0]["acl_status"] = "error 503"
+    with open(tmp_path / "anthology.json", "w") as f:
+        json.dump(acl_entries, f)
+    monkeypatch.setattr(sys, "argv", ["process_anthology.py", "--anthology_path", str(tmp_path / "anthology.bib"),
+                                      "--export_dir", str(tmp_path), "--include", "year>2020"])
+
+    process_anthology.main()
+    with open(tmp_path / "anthology.json") as f:
+        exported_entries = {entry["ID"]: entry for entry in json.load(f)}
+    assert list(exported_entries) == [entry["ID"] for entry in acl_entries]
+    assert exported_entries["2019.acl-long.1"] == acl_entries[0]
+    assert exported_entries["2020.acl-long.1"] == acl_entries[1]
+    assert exported_entries["2021.acl-long.1"]["acl_status"] == "success"
+    assert exported_entries["2022.acl-long.1"]["acl_status"] == "success"
+    assert anthology.count("aclanthology.org/20") == 2
@@ -0,0 +1,59 @@
+import functools
+import json
+import os
+
+import pytest
+
+from anthology_io import dump_entries
+from query_service import AnthologyService
+from search_index import build_search_index, get_search_index_dir
+from synthetic_anthology import iter_synthetic_entries
+
+
+class VersionService(AnthologyService):
+    # no export on disk, the cohort of a query is the version of the data it ran on
+    def __init__(self):
+        self.data = {"version": 1}
+        self.cached_query = functools.lru_cache(maxsize=8)(self.run_query)
+
+    def get_cohort(self, data, params):
+        return {"version": data["version"]}
+
+
+def test_query_runs_on_the_version_it_is_cached_under():
+    service = VersionService()
+    cached_query = service.cached_query
+
+    def swap_then_query(version, path, params_key):
+        # the watcher swaps in a new export between reading the version and running the query
+        service.data = {"version": 2}
+        service.cached_query = cached_query
+        return cached_query(version, path, params_key)
+
+    service.cached_query = swap_then_query
+    assert json.loads(service.query("/cohort", {})) == {"version": 2}
+    assert json.loads(cached_query(2, "/cohort", ())) == {"version": 2}
+    assert cached_query.cache_info().currsize == 1
+
+
+def write_export(export_dir, size):
+    entries = list(iter_synthetic_entries(size, seed=1))
+    dump_entries(os.path.join(export_dir, "anthology.json"), entries)
+    return entries
+
+
+def test_search_index_written_after_the_export_is_loaded(tmp_path):
+    entries = write_export(str(tmp_path), 50)
+    service = AnthologyService(str(tmp_path / "anthology.json"))
+    assert not service.get_status()["search_index"]
+    with pytest.raises(ValueError):
+        service.query("/cohort", {"q": ["the"]})
+
+    # process_anthology writes the search index after the export
+    build_search_index(entries, get_search_index_dir(str(tmp_path / "anthology.json")))
+    frame = service.data["frame"]
+    assert service.reload()
+    assert service.get_status()["search_index"]
+    assert service.data["frame"] is frame
+    assert json.loads(service.query("/cohort", {"q": [entries[0]["title"].split()[0]]}))["papers"] >= 1
+    assert not service.reload()
@@ -0,0 +1,70 @@
+import os
+import subprocess
+
+import pytest
+
+from repo_content import analyse_repository, get_cache_path
+
+GIT_ENVIRONMENT = dict(os.environ, GIT_AUTHOR_NAME="Jane Doe", GIT_AUTHOR_EMAIL="jane@example.com",
+                       GIT_COMMITTER_NAME="Jane Doe", GIT_COMMITTER_EMAIL="jane@example.com")
+
+
+def run_git(repository_dir, *args):
+    subprocess.run(["git", *args], cwd=repository_dir, check=True, env=GIT_ENVIRONMENT, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+
+
+def commit_files(repository_dir, files):
+    for file_path, content in files.items():
+        os.makedirs(os.path.dirname(os.path.join(repository_dir, file_path)), exist_ok=True)
+        with open(os.path.join(repository_dir, file_path), "w") as f:
+            f.write(content)
+    run_git(repository_dir, "add", ".")
+    run_git(repository_dir, "commit", "-m", "Add {}".format(", ".join(files)))
+
+
+@pytest.fixture
+def source_url(tmp_path):
+    repository_dir = str(tmp_path / "source")
+    os.makedirs(repository_dir)
+    run_git(repository_dir, "init", "-b", "main")
+    run_git(repository_dir, "config", "uploadpack.allowFilter", "true")
+    commit_files(repository_dir, {"README.md": "# Source\n", "requirements.txt": "numpy\n",
+                                  "configs/train.yaml": "seed: 42\n"})
+    commit_files(repository_dir, {"tests/test_model.py": "def test_model():\n    pass\n"})
+    return "file://" + repository_dir
+
+
+def get_leftover_files(cache_dir):
+    return [name for _, _, file_names in os.walk(cache_dir) for name in file_names if name.endswith(".tmp")] + \
+        [name for _, directory_names, _ in os.walk(cache_dir) for name in directory_names if name.endswith(".tmp")]
+
+
+def test_clone_and_fetch_local_repository(source_url, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    result = analyse_repository(source_url, cache_dir)
+    assert result == {"repo_has_readme": True, "repo_has_requirements": True, "repo_has_dockerfile": False,
+                      "repo_has_license": False, "repo_has_tests": True, "repo_has_seed_config": True,
+                      "repo_commit_count": 2, "repo_status": "success"}
+
+    commit_files(source_url[len("file://"):], {"LICENSE": "MIT\n"})
+    result = analyse_repository(source_url, cache_dir)
+    assert result["repo_has_license"] and result["repo_commit_count"] == 3
+    assert get_leftover_files(cache_dir) == []
+
+
+def test_interrupted_clone_is_cloned_again(source_url, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    # what a clone killed half way left behind before clones were renamed into place
+    cache_path = get_cache_path(cache_dir, source_url)
+    os.makedirs(os.path.join(cache_path, "objects"))
+    assert analyse_repository(source_url, cache_dir)["repo_status"] == "success"
+    assert analyse_repository(source_url, cache_dir)["repo_commit_count"] == 2
+
+
+def test_failed_clone_leaves_nothing_behind(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    missing_url = "file://" + str(tmp_path / "missing")
+    assert analyse_repository(missing_url, cache_dir)["repo_status"] != "success"
+    assert not os.path.exists(get_cache_path(cache_dir, missing_url))
+    assert get_leftover_files(cache_dir) == []
@@ -0,0 +1,10 @@
+from venue_counts import get_export_files, get_snapshot_name
+
+
+def test_export_files_skip_caches_and_other_tools_outputs(tmp_path):
+    for file_name in ["anthology.json", "anthology_2021.jsonl.gz", "anthology_2020.json.zst", "anthology.bib.json",
+                      "anthology.bib.json.gz", "synthetic_anthology.json", "github_history.jsonl", "anthology.csv"]:
+        (tmp_path / file_name).write_text("[]")
+    (tmp_path / "search_index").mkdir()
+    snapshots = [get_snapshot_name(file_path) for file_path in get_export_files(str(tmp_path))]
+    assert snapshots == ["anthology", "anthology_2020", "anthology_2021"]
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+from venues import get_entry_venue, is_major_conference
+
+
+def test_entry_venue_from_booktitle():
+    assert get_entry_venue({"booktitle": "Proceedings of the 2021 Conference on {E}mpirical Methods in Natural "
+                                         "Language Processing"}) == "EMNLP"
+    assert get_entry_venue({"booktitle": "Findings of the Association for Computational Linguistics: ACL 2022"}) == \
+        "ACL"
+    assert get_entry_venue({"booktitle": "Proceedings of the Workshop on Annual Meeting of the Association for "
+                                         "Computational Linguistics"}).startswith("Proceedings")
+    assert get_entry_venue({"conference": "NAACL", "booktitle": "anything"}) == "NAACL"
+
+
+def test_crawler_does_not_load_the_plotting_stack():
+    # the crawler, including --dry_run, only needs the venue tables, not the analysis scripts
+    loaded = subprocess.run([sys.executable, "-c", "import sys, process_anthology; print(sorted(name for name in "
+                             "('matplotlib', 'seaborn', 'analyse_anthology', 'venue_counts') if name in sys.modules))"],
+                            check=True, stdout=subprocess.PIPE, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert loaded.strip() == "[]"
+
+
+def test_major_conference_excludes_workshops_and_tutorials():
+    assert is_major_conference({"booktitle": "Proceedings of the 2021 Conference on Empirical Methods in Natural "
+                                             "Language Processing"})
+    assert not is_major_conference({"booktitle": "Proceedings of the 2021 Conference on Empirical Methods in Natural "
+                                                 "Language Processing: Tutorial Abstracts"})
+    assert not is_major_conference({"booktitle": "Proceedings of the First Workshop on Something"})
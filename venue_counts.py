@@ -0,0 +1,134 @@
+import argparse
+import collections
+import concurrent
+import logging
+import os
+from concurrent import futures
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from anthology_io import iter_json_entries
+from venues import get_entry_venue
+
+logging.basicConfig(
+    format='%(asctime)s %(levelname)-8s %(message)s',
+    level=logging.INFO,
+    datefmt='%Y-%m-%d %H:%M:%S')
+
+EXPORT_FILE_EXTENSIONS = (".json", ".jsonl", ".json.gz", ".jsonl.gz", ".json.zst", ".jsonl.zst")
+# files the other tools write to data/ that are not snapshot exports, besides the anthology.bib.json bib caches
+NON_SNAPSHOT_NAMES = frozenset(["synthetic_anthology", "github_history"])
+
+
+def count_file_entries(file_path, keys_to_count, venues=None):
+    counts = collections.defaultdict(collections.Counter)
+    for entry in iter_json_entries(file_path):
+        venue = get_entry_venue(entry)
+        if venues is not None and venue not in venues:
+            continue
+        venue_year_count = counts[(venue, int(entry.get("year", 0)))]
+        venue_year_count["total"] += 1
+        for key in keys_to_count:
+            if key in entry:
+                venue_year_count[key] += 1
+    return file_path, dict(counts)
+
+
+def get_snapshot_name(file_path):
+    file_name = os.path.basename(file_path)
+    for extension in sorted(EXPORT_FILE_EXTENSIONS, key=len, reverse=True):
+        if file_name.endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+
+def is_snapshot_export(file_name):
+    if not file_name.endswith(EXPORT_FILE_EXTENSIONS):
+        return False
+    snapshot_name = get_snapshot_name(file_name)
+    return not snapshot_name.endswith(".bib") and snapshot_name not in NON_SNAPSHOT_NAMES
+
+
+def get_export_files(data_dir):
+    return sorted(os.path.join(data_dir, file_name) for file_name in os.listdir(data_dir)
+                  if is_snapshot_export(file_name))
+
+
+def count_venues(export_files, keys_to_count, venues=None, max_workers=None):
+    # one worker per export file, only the (snapshot, venue, year) counts come back to the parent
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        future_list = [executor.submit(count_file_entries, file_path, keys_to_count, venues)
+                       for file_path in export_files]
+        for future in concurrent.futures.as_completed(future_list):
+            file_path, counts = future.result()
+            logging.info("Counted {} venue-years in {}".format(len(counts), file_path))
+            for (venue, year), venue_year_count in counts.items():
+                row = {"snapshot": get_snapshot_name(file_path), "venue": venue, "year": year}
+                row.update({key: venue_year_count[key] for key in ["total"] + list(keys_to_count)})
+                rows.append(row)
+
+    counts_df = pd.DataFrame(rows, columns=["snapshot", "venue", "year", "total"] + list(keys_to_count))
+    for key in keys_to_count:
+        counts_df[key + "_ratio"] = counts_df[key] / counts_df["total"]
+    return counts_df.sort_values(["snapshot", "venue", "year"]).reset_index(drop=True)
+
+
+def plot_grouped_bars(counts_df, column, venue, ylabel, title, file_name):
+    plt.cla()
+    venue_df = counts_df[counts_df["venue"] == venue]
+    series_df = venue_df.pivot_table(index="year", columns="snapshot", values=column, aggfunc="sum")
+    x = np.arange(len(series_df))
+    width = 0.8 / max(len(series_df.columns), 1)
+
+    # plot data in grouped manner of bar type, one bar per snapshot
+    for i, snapshot in enumerate(series_df.columns):
+        plt.bar(x + (i - (len(series_df.columns) - 1) / 2) * width, series_df[snapshot].fillna(0), width)
+
+    plt.xticks(x, [str(year) for year in series_df.index])
+    plt.xlabel("Year")
+    plt.ylabel(ylabel)
+    plt.legend(list(series_df.columns))
+    plt.title(title)
+    plt.savefig(file_name)
+
+
+def plot_count(counts_df, key, venue, plot_dir):
+    plot_grouped_bars(counts_df, key, venue, "Count", "{} {} Submissions".format(venue, key),
+                      os.path.join(plot_dir, "{}_{}_count".format(venue.lower(), key.lower())))
+
+
+def plot_ratio(counts_df, key, venue, plot_dir):
+    plot_grouped_bars(counts_df, key + "_ratio", venue, "Ratio", "{} {} Submissions Ratio".format(venue, key),
+                      os.path.join(plot_dir, "{}_{}_ratio".format(venue.lower(), key.lower())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-venue and per-year counts over anthology export snapshots')
+    parser.add_argument("--data_dir", type=str, default="data",
+                        help="directory of the snapshot exports, bib caches (anthology.bib.json), "
+                             "synthetic_anthology.json and github_history.jsonl are skipped")
+    parser.add_argument("--keys", type=str, nargs="+", default=["Code"])
+    parser.add_argument("--venues", type=str, nargs="+", default=None)
+    parser.add_argument("--plot_venues", type=str, nargs="+", default=["EMNLP"])
+    parser.add_argument("--plot_dir", type=str, default="plots")
+    parser.add_argument("--max_workers", type=int, default=None)
+
+    args = parser.parse_args()
+    export_files = get_export_files(args.data_dir)
+    logging.info("Counting {} export files".format(len(export_files)))
+
+    venues = set(args.venues) if args.venues is not None else None
+    counts_df = count_venues(export_files, args.keys, venues=venues, max_workers=args.max_workers)
+    counts_df.to_csv(os.path.join(args.plot_dir, "venue_counts.csv"), index=False)
+
+    for venue in args.plot_venues:
+        for key in args.keys:
+            plot_count(counts_df, key, venue, args.plot_dir)
+            plot_ratio(counts_df, key, venue, args.plot_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+MAJOR_CONFERENCES_ABBREVIATION_DICT = {
+    "Annual Meeting of the Association for Computational Linguistics": "ACL",
+    "Conference on Empirical Methods in Natural Language Processing": "EMNLP",
+    # "European Chapter of the Association for Computational Linguistics": "EACL",
+    "North American Chapter of the Association for Computational Linguistics": "NAACL",
+    # "International Joint Conference on Natural Language Processing": "IJCNLP",
+    "International Conference on Computational Linguistics": "COLING",
+    "Language Resources and Evaluation": "LREC",
+    "Findings of the Association for Computational Linguistics: ACL": "ACL",
+    "Findings of the Association for Computational Linguistics: EMNLP": "EMNLP",
+}
+
+
+def newer_than(acl_entry_dict, year):
+    return acl_entry_dict["year"] > year
+
+
+def is_major_conference(acl_entry_dict):
+    # ACL, EMNLP, EACL, NAACL, IJCNLP, COLING
+    major_conferences_list = list(MAJOR_CONFERENCES_ABBREVIATION_DICT.keys())
+
+    is_workshop = "booktitle" in acl_entry_dict and "workshop" in acl_entry_dict["booktitle"].lower()
+    is_tutorial = "booktitle" in acl_entry_dict and "tutorial" in acl_entry_dict["booktitle"].lower()
+    is_major_conference = any([conference in acl_entry_dict["booktitle"]
+                               for conference in major_conferences_list
+                               if "booktitle" in acl_entry_dict])
+    # emnlp_title = "Proceedings of the 2021 Conference on Empirical Methods in Natural Language Processing"
+    # r = acl_entry_dict["booktitle"] == emnlp_title
+    return is_major_conference and not is_workshop and not is_tutorial
+
+
+def get_entry_venue(entry):
+    # the conference abbreviation of a processed entry, or the one its booktitle names
+    if "conference" in entry:
+        return entry["conference"]
+    booktitle = entry.get("booktitle", "").replace("{", "").replace("}", "")
+    lower_booktitle = booktitle.lower()
+    if "workshop" not in lower_booktitle and "tutorial" not in lower_booktitle:
+        for conference_full_name, conference in MAJOR_CONFERENCES_ABBREVIATION_DICT.items():
+            if conference_full_name in booktitle:
+                return conference
+    return booktitle